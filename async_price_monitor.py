@@ -0,0 +1,240 @@
+# async_price_monitor.py
+#
+# asyncio counterpart of price_monitor.py built on playwright.async_api.
+# Every wait yields to the event loop, so the network waits of several
+# bookings overlap in one process and one browser. The page flows
+# (selectors, pacing, fallbacks, failure classification) are the shared
+# *_steps generators in price_monitor; this module only awaits them through
+# page_steps.drive_async and supplies the async API bindings at the end.
+
+import asyncio
+import sys
+from playwright.async_api import async_playwright
+
+from browser_session import BrowserSession
+from config import SEARCH_TIMEOUT
+from har_harness import attach_har_async as attach_har
+from http_fast_path import fetch_prices_async as fetch_prices
+from memory_watchdog import sample_memory_async as sample_memory
+from page_steps import drive_async
+from retry import RetryScheduler
+from price_monitor import (
+    attempt_booking_steps,
+    check_age_checkbox_steps,
+    check_booking_steps,
+    click_search_and_capture_steps,
+    click_search_steps,
+    enter_date_steps,
+    enter_location_steps,
+    fill_search_form_steps,
+    human_pause_steps,
+    launch_browser_steps,
+    new_page_steps,
+    new_worker_stats,
+    prepare_run,
+    price_check_steps,
+    recycle_context_steps,
+    report_unfinished,
+    scrape_booking_steps,
+    set_times_steps,
+    wait_for_results_steps,
+    wait_for_stable_results_steps,
+    wait_until_steps,
+    worker_steps,
+)
+
+# The `api` this module passes to the shared flows
+_API = sys.modules[__name__]
+
+
+async def human_pause(page, low, high, pacing=None):
+    await drive_async(human_pause_steps(page, low, high, pacing))
+
+
+async def wait_until(page, expression, arg=None, timeout=None):
+    return await drive_async(wait_until_steps(page, expression, arg=arg, timeout=timeout))
+
+
+async def enter_location(page, location, pacing=None):
+    await drive_async(enter_location_steps(page, location, pacing=pacing))
+
+
+async def enter_date(page, field_id, date_value, max_retries=3, pacing=None):
+    return await drive_async(enter_date_steps(page, field_id, date_value, max_retries=max_retries, pacing=pacing))
+
+
+async def set_times(page, pickup_time, dropoff_time, pacing=None):
+    await drive_async(set_times_steps(page, pickup_time, dropoff_time, pacing=pacing))
+
+
+async def check_age_checkbox(page, pacing=None):
+    await drive_async(check_age_checkbox_steps(page, pacing=pacing))
+
+
+async def click_search(page, pacing=None):
+    await drive_async(click_search_steps(page, pacing=pacing))
+
+
+async def click_search_and_capture(page, timeout=SEARCH_TIMEOUT, pacing=None):
+    return await drive_async(click_search_and_capture_steps(_API, page, timeout=timeout, pacing=pacing))
+
+
+async def fill_search_form(page, booking, pacing=None, timer=None):
+    return await drive_async(fill_search_form_steps(_API, page, booking, pacing=pacing, timer=timer))
+
+
+async def wait_for_results(page, current_url, timeout=60, timer=None, booking=None):
+    return await drive_async(wait_for_results_steps(
+        page, current_url, timeout=timeout, timer=timer, booking=booking
+    ))
+
+
+async def wait_for_stable_results(page, quiet_ms=None, ceiling_ms=None, timer=None, booking=None):
+    return await drive_async(wait_for_stable_results_steps(
+        page, quiet_ms=quiet_ms, ceiling_ms=ceiling_ms, timer=timer, booking=booking
+    ))
+
+
+async def scrape_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None):
+    return await drive_async(scrape_booking_steps(
+        _API, page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots
+    ))
+
+
+async def attempt_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None,
+                          attempts=None):
+    return await drive_async(attempt_booking_steps(
+        _API, page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots,
+        attempts=attempts,
+    ))
+
+
+async def process_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None):
+    """Run a full price scrape for one booking, with retries. Returns price dict or None."""
+    prices, _ = await attempt_booking(
+        page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots
+    )
+    return prices
+
+
+async def check_booking(context, page, booking, blocker=None, timer=None):
+    return await drive_async(check_booking_steps(_API, context, page, booking, blocker=blocker, timer=timer))
+
+
+async def new_page(browser, blocker=None, session=None, storage_state=None, har_mode=None, har_path=None):
+    return await drive_async(new_page_steps(
+        _API, browser, blocker=blocker, session=session, storage_state=storage_state,
+        har_mode=har_mode, har_path=har_path,
+    ))
+
+
+async def recycle_context(browser, context, page, blocker=None):
+    return await drive_async(recycle_context_steps(_API, browser, context, page, blocker=blocker))
+
+
+async def launch_browser(playwright, headless=True, channel=None, attach=True):
+    return await drive_async(launch_browser_steps(playwright, headless=headless, channel=channel, attach=attach))
+
+
+async def setup_browser(headless=True, channel=None, blocker=None):
+    """Launch a Playwright browser with stealth settings (async API).
+
+    Returns (playwright, browser, context, page); the caller awaits
+    browser.close() and playwright.stop() when done.
+    """
+    playwright = await async_playwright().start()
+    browser = await launch_browser(playwright, headless=headless, channel=channel)
+    context, page = await new_page(browser, blocker=blocker)
+    return playwright, browser, context, page
+
+
+async def scrape_bookings(bookings, on_result, workers=1, channel=None, timer=None):
+    """Async counterpart of price_monitor.scrape_bookings.
+
+    All workers share one browser; each gets its own context. on_result runs
+    on the event loop thread, so it may touch the tracker directly.
+    """
+    scheduler = RetryScheduler(bookings)
+
+    workers = max(1, min(workers, len(bookings)))
+    worker_stats = new_worker_stats(workers)
+    reported = set()
+
+    def record(index, prices):
+        reported.add(index)
+        on_result(index, prices)
+
+    playwright = await async_playwright().start()
+    try:
+        browser = await launch_browser(playwright, channel=channel)
+        try:
+            await asyncio.gather(*(
+                drive_async(worker_steps(_API, stats["worker"], browser, scheduler, record, stats, timer))
+                for stats in worker_stats
+            ))
+        finally:
+            await browser.close()
+    finally:
+        await playwright.stop()
+
+    report_unfinished(bookings, reported, scheduler, on_result)
+    return worker_stats
+
+
+async def run_price_checks(tracker, active_bookings, workers=None):
+    """Async counterpart of price_monitor.run_price_checks."""
+    tracker, active_bookings, workers = prepare_run(tracker, active_bookings, workers)
+    return await drive_async(price_check_steps(_API, tracker, active_bookings, workers, engine="async"))
+
+
+# -- Async API bindings ------------------------------------------------------
+# attach_har, fetch_prices and sample_memory are the *_async imports above.
+
+async def extract_lowest_prices(page):
+    """Async version of price_extractor.extract_lowest_prices."""
+    from price_extractor import (
+        RESULT_ROWS_JS,
+        prices_from_rows,
+        save_prices_to_file,
+        summarize_result_rows,
+    )
+
+    print("\nExtracting lowest prices...")
+    rows = summarize_result_rows(await page.evaluate(RESULT_ROWS_JS))
+    lowest_prices = prices_from_rows(rows)
+    save_prices_to_file(lowest_prices)
+    return lowest_prices
+
+
+def capture_screenshot(screenshots, page, booking, ok):
+    return screenshots.capture_async(page, booking, ok=ok)
+
+
+def route_handler(blocker):
+    return blocker.handle_route_async
+
+
+def worker_session(worker_id):
+    session = BrowserSession.from_config(name=f"worker-{worker_id}")
+    if session is not None and session.mode == "profile":
+        print("Persistent profiles need the sync engine; using storage_state for async workers")
+        session = BrowserSession.from_config(name=f"worker-{worker_id}", mode="storage_state")
+    return session
+
+
+async def open_worker(browser, blocker, session):
+    """A worker's context on the shared browser: (None, browser, context, page)."""
+    context, page = await new_page(browser, blocker=blocker, session=session)
+    return None, browser, context, page
+
+
+def save_session(session, context, healthy):
+    return session.save_async(context, healthy=healthy)
+
+
+async def close_worker(playwright, browser, context):
+    # The shared browser outlives its workers; only the context is theirs
+    try:
+        await context.close()
+    except Exception:
+        pass
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# benchmark.py
+#
+# Time process_booking per booking under each pacing mode.
+# Run: python3 benchmark.py [--modes human fast] [--limit N] [--har FILE]
+#
+# --har replays a recording made with HAR_MODE=record (see har_harness.py),
+# so latencies measure the scraper itself rather than costcotravel.com.
+
+import argparse
+import statistics
+import time
+
+from booking_tracker import BookingTracker
+from price_monitor import (
+    PACING_MODES,
+    _is_expired,
+    browser_channel,
+    close_browser,
+    human_pause,
+    process_booking,
+    setup_browser,
+)
+from request_blocking import RequestBlocker
+
+
+def benchmark_pacing(bookings, modes=PACING_MODES, headless=True, channel=None, har_path=None):
+    """Scrape every booking once per pacing mode.
+
+    Returns {mode: [{"booking": booking, "seconds": float, "ok": bool}, ...]}.
+    Each mode gets a freshly launched browser (never the shared browser
+    host) so one mode's cache does not favour the next. With har_path every
+    request is answered from that HAR recording instead of the network.
+    """
+    results = {}
+    for mode in modes:
+        print(f"\n=== Pacing mode: {mode} ===")
+        blocker = RequestBlocker.from_config()
+        playwright, browser, context, page = setup_browser(
+            headless=headless, channel=channel, blocker=blocker, attach=False,
+            har_mode="replay" if har_path else "off", har_path=har_path,
+        )
+        timings = []
+        try:
+            for i, booking in enumerate(bookings):
+                started = time.monotonic()
+                prices = process_booking(page, booking, blocker=blocker, pacing=mode)
+                timings.append({
+                    "booking": booking,
+                    "seconds": time.monotonic() - started,
+                    "ok": bool(prices),
+                })
+                if i < len(bookings) - 1:
+                    human_pause(page, 2000, 4000, mode)
+        finally:
+            close_browser(playwright, browser, context)
+        results[mode] = timings
+    return results
+
+
+def print_benchmark_report(results):
+    """Print per-booking seconds for each mode plus mean/median per mode."""
+    modes = list(results)
+    if not modes:
+        return
+    print("\nPer-booking time (seconds):")
+    header = f"{'Booking':<32}" + "".join(f"{mode:>10} " for mode in modes)
+    print(header)
+    print("-" * len(header))
+    for i, first in enumerate(results[modes[0]]):
+        booking = first["booking"]
+        label = f"{booking['location']} {booking['pickup_date']}-{booking['dropoff_date']}"
+        cells = "".join(
+            f"{results[mode][i]['seconds']:>10.1f}{' ' if results[mode][i]['ok'] else '!'}"
+            for mode in modes
+        )
+        print(f"{label:<32}{cells}")
+    print("-" * len(header))
+    for name, fn in (("mean", statistics.mean), ("median", statistics.median)):
+        cells = "".join(
+            f"{fn([e['seconds'] for e in results[mode]]):>10.1f} " if results[mode] else f"{'-':>10} "
+            for mode in modes
+        )
+        print(f"{name:<32}{cells}")
+    print("(! = no prices returned)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper pacing modes")
+    parser.add_argument("--modes", nargs="+", choices=PACING_MODES, default=list(PACING_MODES),
+                        help="Pacing modes to compare (default: all)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Only benchmark the first N active bookings")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--har", default=None, metavar="FILE",
+                        help="Replay traffic from this HAR recording instead of the live site")
+    args = parser.parse_args()
+
+    tracker = BookingTracker.from_config()
+    bookings = [b for b in tracker.get_active_bookings() if not _is_expired(b)]
+    if args.limit:
+        bookings = bookings[:args.limit]
+    if not bookings:
+        print("📢 No active bookings to benchmark.")
+        return
+
+    results = benchmark_pacing(
+        bookings, modes=args.modes, headless=not args.headed, channel=browser_channel(),
+        har_path=args.har,
+    )
+    print_benchmark_report(results)
+
+
+if __name__ == "__main__":
+    main()
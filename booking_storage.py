@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# booking_storage.py
+#
+# SQLite backend for BookingTracker (STORAGE_BACKEND=sqlite). Same public
+# methods as the JSON tracker, but nothing is loaded up front: a price
+# update is one INSERT and trends are SQL aggregates over the focus
+# category's price points.
+#
+# Tables:
+#   bookings        one row per booking; fields the columns do not cover
+#                   (e.g. date_sweep) live in the "extra" JSON column
+#   price_snapshots one row per price check (timestamp + lowest price);
+#                   a rolled-up record (history_retention.py) keeps its
+#                   OHLC summary in the "rollup" JSON column
+#   price_points    one row per category per check (a rollup's close price)
+#
+# price_history.json stays the format the dashboard, the workflow and the
+# Supabase sync read, so compact() (called at the end of every run)
+# exports it from the database. One-shot conversion:
+#   python3 booking_storage.py import [--json price_history.json] [--db price_history.db]
+#   python3 booking_storage.py export [--json price_history.json] [--db price_history.db]
+
+import argparse
+import atexit
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from booking_tracker import BookingTracker, atomic_write_json
+from config import PRICE_RETENTION, STORAGE_DB_FILE
+from history_shards import is_sharded, lazy_bookings
+from history_codec import decode_file_data
+from history_retention import apply_tiers, backup_path, parse_tiers
+from price_stats import build_stats
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    location_full_name TEXT,
+    pickup_date TEXT NOT NULL,
+    dropoff_date TEXT NOT NULL,
+    pickup_time TEXT,
+    dropoff_time TEXT,
+    focus_category TEXT NOT NULL,
+    holding_price REAL,
+    created_at TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    position INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS price_snapshots (
+    id INTEGER PRIMARY KEY,
+    booking_id TEXT NOT NULL REFERENCES bookings(booking_id) ON DELETE CASCADE,
+    timestamp TEXT NOT NULL,
+    lowest_category TEXT,
+    lowest_price REAL,
+    rollup TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_booking_ts ON price_snapshots(booking_id, timestamp);
+CREATE TABLE IF NOT EXISTS price_points (
+    snapshot_id INTEGER NOT NULL REFERENCES price_snapshots(id) ON DELETE CASCADE,
+    booking_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    category TEXT NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_points_booking_category_ts ON price_points(booking_id, category, timestamp);
+"""
+
+# bookings columns that map one-to-one onto booking dict keys
+BOOKING_COLUMNS = (
+    "location", "location_full_name", "pickup_date", "dropoff_date", "pickup_time",
+    "dropoff_time", "focus_category", "holding_price", "created_at",
+)
+
+
+class SqliteBookingTracker(BookingTracker):
+    """BookingTracker stored in SQLite instead of price_history.json."""
+
+    def __init__(self, db_file: Optional[str] = None, export_file: Optional[str] = 'price_history.json'):
+        # No JSON load and no op log: every change is a committed SQL write
+        self._init_common(export_file, price_log=False)
+        self.db_file = db_file or STORAGE_DB_FILE
+        self.export_file = export_file
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.db_file)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+        self.dirty = False
+        # Booking dicts handed out by get_active_bookings(), kept in step with
+        # later updates like the JSON tracker's shared dicts are
+        self._loaded = {}
+        atexit.register(self._compact_at_exit)
+
+    def _migrate(self):
+        """Add columns that databases created by older versions lack"""
+        columns = {row["name"] for row in self.db.execute("PRAGMA table_info(price_snapshots)")}
+        if "rollup" not in columns:
+            self.db.execute("ALTER TABLE price_snapshots ADD COLUMN rollup TEXT")
+            self.db.commit()
+
+    def close(self):
+        self.compact()
+        self.db.close()
+
+    def _compact_at_exit(self):
+        try:
+            self.compact()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Could not export {self.export_file}: {str(e)}")
+
+    # -- storage hooks used by BookingTracker's public methods ---------------
+
+    def _has_booking(self, booking_id: str) -> bool:
+        row = self.db.execute("SELECT 1 FROM bookings WHERE booking_id = ?", (booking_id,)).fetchone()
+        return row is not None
+
+    def _commit(self, op: Dict):
+        """Run one change; it is committed now, or with the enclosing
+        transaction() block"""
+        booking_id = op["id"]
+        try:
+            if op["op"] == "add":
+                self._insert_booking(booking_id, op["booking"], active=True)
+            elif op["op"] == "delete":
+                self.db.execute("DELETE FROM bookings WHERE booking_id = ?", (booking_id,))
+                self._loaded.pop(booking_id, None)
+            elif op["op"] == "set":
+                self._set_fields(booking_id, op["fields"])
+                if booking_id in self._loaded:
+                    self._loaded[booking_id].update(op["fields"])
+            elif op["op"] == "prices":
+                self._insert_snapshot(booking_id, op["record"])
+                if booking_id in self._loaded:
+                    self._loaded[booking_id]["price_history"].append(op["record"])
+        except sqlite3.Error:
+            if not self._batch_depth:
+                self.db.rollback()
+            raise
+        self.dirty = True
+        if not self._batch_depth:
+            self.db.commit()
+
+    def _flush(self):
+        self.db.commit()
+
+    def _insert_booking(self, booking_id: str, booking: Dict, active: bool):
+        extra = {
+            key: value for key, value in booking.items()
+            if key not in BOOKING_COLUMNS and key not in ("price_history", "price_stats")
+        }
+        position = self.db.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM bookings").fetchone()[0]
+        self.db.execute(
+            f"INSERT INTO bookings (booking_id, {', '.join(BOOKING_COLUMNS)}, active, position, extra) "
+            f"VALUES (?, {', '.join('?' for _ in BOOKING_COLUMNS)}, ?, ?, ?)",
+            (booking_id, *(booking.get(column) for column in BOOKING_COLUMNS),
+             int(active), position, json.dumps(extra) if extra else None),
+        )
+
+    def _set_fields(self, booking_id: str, fields: Dict):
+        columns = {key: value for key, value in fields.items() if key in BOOKING_COLUMNS}
+        if columns:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            self.db.execute(
+                f"UPDATE bookings SET {assignments} WHERE booking_id = ?",
+                (*columns.values(), booking_id),
+            )
+        extra_fields = {key: value for key, value in fields.items() if key not in BOOKING_COLUMNS}
+        if extra_fields:
+            row = self.db.execute("SELECT extra FROM bookings WHERE booking_id = ?", (booking_id,)).fetchone()
+            extra = json.loads(row["extra"]) if row and row["extra"] else {}
+            extra.update(extra_fields)
+            self.db.execute(
+                "UPDATE bookings SET extra = ? WHERE booking_id = ?", (json.dumps(extra), booking_id)
+            )
+
+    def _insert_snapshot(self, booking_id: str, record: Dict):
+        lowest = record.get("lowest_price") or {}
+        rollup = record.get("rollup")
+        cursor = self.db.execute(
+            "INSERT INTO price_snapshots (booking_id, timestamp, lowest_category, lowest_price, rollup) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (booking_id, record["timestamp"], lowest.get("category"), lowest.get("price"),
+             json.dumps(rollup) if rollup else None),
+        )
+        self.db.executemany(
+            "INSERT INTO price_points (snapshot_id, booking_id, timestamp, category, price) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(cursor.lastrowid, booking_id, record["timestamp"], category, price)
+             for category, price in record["prices"].items() if price is not None],
+        )
+
+    def _row_to_booking(self, row) -> Dict:
+        booking = {column: row[column] for column in BOOKING_COLUMNS}
+        if row["extra"]:
+            booking.update(json.loads(row["extra"]))
+        booking["price_history"] = self._history(row["booking_id"])
+        return booking
+
+    def _history(self, booking_id: str) -> List[Dict]:
+        """price_history records for one booking, oldest first"""
+        history = []
+        snapshots = self.db.execute(
+            "SELECT id, timestamp, lowest_category, lowest_price, rollup FROM price_snapshots "
+            "WHERE booking_id = ? ORDER BY id",
+            (booking_id,),
+        ).fetchall()
+        points = {}
+        for point in self.db.execute(
+            "SELECT snapshot_id, category, price FROM price_points WHERE booking_id = ? ORDER BY rowid",
+            (booking_id,),
+        ):
+            points.setdefault(point["snapshot_id"], {})[point["category"]] = point["price"]
+        for snapshot in snapshots:
+            record = {"timestamp": snapshot["timestamp"], "prices": points.get(snapshot["id"], {})}
+            if snapshot["lowest_category"] is not None:
+                record["lowest_price"] = {
+                    "category": snapshot["lowest_category"],
+                    "price": snapshot["lowest_price"],
+                }
+            if snapshot["rollup"]:
+                record["rollup"] = json.loads(snapshot["rollup"])
+            history.append(record)
+        return history
+
+    def _active_items(self) -> List:
+        rows = self.db.execute(
+            "SELECT * FROM bookings WHERE active = 1 ORDER BY position"
+        ).fetchall()
+        items = []
+        for row in rows:
+            booking = self._row_to_booking(row)
+            self._loaded[row["booking_id"]] = booking
+            items.append((row["booking_id"], booking))
+        return items
+
+    # -- queries the JSON tracker answers from its in-memory dict -------------
+
+    def cleanup_expired_bookings(self) -> List[str]:
+        """Remove bookings whose dropoff date has passed"""
+        current_date = datetime.now()
+        deleted_bookings = []
+        for row in self.db.execute("SELECT booking_id, dropoff_date FROM bookings").fetchall():
+            if datetime.strptime(row["dropoff_date"], "%m/%d/%Y") < current_date:
+                self.delete_booking(row["booking_id"])
+                deleted_bookings.append(row["booking_id"])
+        return deleted_bookings
+
+    def get_price_trends(self, booking_id: str) -> Dict:
+        """Get price trends for a specific booking"""
+        row = self.db.execute(
+            "SELECT focus_category, holding_price FROM bookings WHERE booking_id = ?", (booking_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Booking {booking_id} not found")
+        focus_category = row["focus_category"]
+
+        latest = self.db.execute(
+            "SELECT id FROM price_snapshots WHERE booking_id = ? ORDER BY id DESC LIMIT 2",
+            (booking_id,),
+        ).fetchall()
+        if not latest:
+            return {}
+
+        def focus_price(snapshot_id):
+            point = self.db.execute(
+                "SELECT price FROM price_points WHERE snapshot_id = ? AND category = ?",
+                (snapshot_id, focus_category),
+            ).fetchone()
+            return point["price"] if point else None
+
+        # Raw checks aggregate in SQL; rolled-up records add their OHLC summary
+        stats = self.db.execute(
+            "SELECT MIN(p.price) AS lowest, MAX(p.price) AS highest, SUM(p.price) AS total, "
+            "COUNT(*) AS total_checks FROM price_points p JOIN price_snapshots s ON s.id = p.snapshot_id "
+            "WHERE p.booking_id = ? AND p.category = ? AND s.rollup IS NULL",
+            (booking_id, focus_category),
+        ).fetchone()
+        lowest, highest = stats["lowest"], stats["highest"]
+        total, total_checks = stats["total"] or 0.0, stats["total_checks"]
+        for snapshot in self.db.execute(
+            "SELECT rollup FROM price_snapshots WHERE booking_id = ? AND rollup IS NOT NULL",
+            (booking_id,),
+        ):
+            ohlc = json.loads(snapshot["rollup"])["categories"].get(focus_category)
+            if not ohlc:
+                continue
+            lowest = ohlc["low"] if lowest is None else min(lowest, ohlc["low"])
+            highest = ohlc["high"] if highest is None else max(highest, ohlc["high"])
+            total += ohlc["sum"]
+            total_checks += ohlc["count"]
+        return {
+            "focus_category": {
+                "current": focus_price(latest[0]["id"]),
+                "previous_price": focus_price(latest[1]["id"]) if len(latest) > 1 else None,
+                "holding_price": row["holding_price"],
+                "lowest": lowest if total_checks else float('inf'),
+                "highest": highest if total_checks else float('-inf'),
+                "average": total / total_checks if total_checks else 0,
+                "total_checks": total_checks,
+            }
+        }
+
+    def rebuild_price_stats(self) -> Optional[int]:
+        """None: there is nothing to rebuild, trends are aggregated from
+        the indexed price_points on every read"""
+        return None
+
+    def apply_retention(self, tiers: Optional[str] = None, save: bool = True,
+                        now: Optional[datetime] = None) -> int:
+        """Roll up old snapshots per PRICE_RETENTION tiers, like the JSON
+        tracker. A booking's snapshots and points are replaced by its
+        retained records in one transaction, or in the enclosing
+        transaction() block with the run's prices. Returns records removed."""
+        tier_list = parse_tiers(PRICE_RETENTION if tiers is None else tiers)
+        if not tier_list:
+            return 0
+        removed = 0
+        for row in self.db.execute("SELECT booking_id FROM bookings ORDER BY position").fetchall():
+            booking_id = row["booking_id"]
+            history = self._history(booking_id)
+            retained = apply_tiers(history, tier_list, now)
+            if retained is history:
+                continue
+            removed += len(history) - len(retained)
+            if not save:
+                continue
+            self._backup_before_retention()
+            try:
+                # price_points go with their snapshots (ON DELETE CASCADE)
+                self.db.execute("DELETE FROM price_snapshots WHERE booking_id = ?", (booking_id,))
+                for record in retained:
+                    self._insert_snapshot(booking_id, record)
+            except sqlite3.Error:
+                if not self._batch_depth:
+                    self.db.rollback()
+                raise
+            if not self._batch_depth:
+                self.db.commit()
+            if booking_id in self._loaded:
+                self._loaded[booking_id]["price_history"] = retained
+            self.dirty = True
+        return removed
+
+    def _backup_before_retention(self):
+        """Export the database, as JSON, before the first rollup"""
+        path = backup_path(self.db_file)
+        if not os.path.exists(path):
+            self.export_json(path)
+            print(f"Saved the price history before its first rollup to {path}")
+
+    # -- JSON import / export -------------------------------------------------
+
+    def import_json(self, history_file: str) -> int:
+        """Load a price_history.json into an empty database. Returns bookings imported."""
+        if self.db.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]:
+            raise ValueError(f"{self.db_file} already has bookings; import into a new database")
+        with open(history_file, 'r') as f:
+            data = decode_file_data(json.load(f))
+        if is_sharded(data):
+            data["bookings"] = lazy_bookings(history_file, data["bookings"])
+        bookings = data.get("bookings", {})
+        active = [booking_id for booking_id in data.get("metadata", {}).get("active_bookings", [])
+                  if booking_id in bookings]
+        ordered = active + [booking_id for booking_id in bookings if booking_id not in active]
+        with self.db:
+            for booking_id in ordered:
+                booking = bookings[booking_id]
+                self._insert_booking(booking_id, booking, active=booking_id in active)
+                for record in booking.get("price_history", []):
+                    self._insert_snapshot(booking_id, record)
+        return len(ordered)
+
+    def export_data(self) -> Dict:
+        """The database in price_history.json layout"""
+        data = {
+            "metadata": {"last_updated": datetime.now().isoformat(), "active_bookings": []},
+            "bookings": {},
+        }
+        for row in self.db.execute("SELECT * FROM bookings ORDER BY position").fetchall():
+            booking = self._row_to_booking(row)
+            if booking["price_history"]:
+                booking["price_stats"] = build_stats(booking["price_history"])
+            data["bookings"][row["booking_id"]] = booking
+            if row["active"]:
+                data["metadata"]["active_bookings"].append(row["booking_id"])
+        return data
+
+    def export_json(self, path: Optional[str] = None):
+        """Write the database out as price_history.json"""
+        atomic_write_json(path or self.export_file, self.export_data())
+
+    def save_bookings(self, bookings=None):
+        """Every change is already committed; kept so callers of the JSON
+        tracker keep working. Refreshes the JSON export."""
+        if self.export_file:
+            self.export_json()
+        self.dirty = False
+
+    def compact(self):
+        """Refresh the JSON export after a run if anything changed"""
+        if self.dirty:
+            self.save_bookings()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert booking history between JSON and SQLite")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("--json", default="price_history.json", help="JSON history file")
+    parser.add_argument("--db", default=None, help=f"SQLite database (default {STORAGE_DB_FILE})")
+    args = parser.parse_args()
+
+    tracker = SqliteBookingTracker(db_file=args.db, export_file=None)
+    try:
+        if args.command == "import":
+            count = tracker.import_json(args.json)
+            print(f"Imported {count} bookings from {args.json} into {tracker.db_file}")
+        else:
+            tracker.export_json(args.json)
+            print(f"Exported {tracker.db_file} to {args.json}")
+    finally:
+        tracker.close()
+
+
+if __name__ == "__main__":
+    main()
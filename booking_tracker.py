@@ -1,14 +1,111 @@
 # booking_tracker.py
+#
+# Changes are appended to a JSONL log next to the history file
+# (price_history.log.jsonl) as one small op per line, so a price update
+# costs one line of I/O instead of rewriting the whole history. The log is
+# replayed on load and compacted into price_history.json every
+# PRICE_LOG_COMPACT_EVERY ops, at the end of a price check run and at exit.
+# Each op carries a sequence number and the snapshot records the last one it
+# contains (metadata.log_seq), so a crash between writing the snapshot and
+# truncating the log never applies an op twice. PRICE_LOG=false writes the
+# whole file on every change, as before.
+#
+# Inside `with tracker.transaction():` changes are applied in memory and
+# persisted once when the block ends (one log append, or one rewrite). Full
+# rewrites go through atomic_write_json: temp file, fsync, rename, so a
+# crash mid-write leaves the previous file intact. HISTORY_FORMAT=columnar
+# writes each booking's history in history_codec's compact form; both
+# forms are read. HISTORY_LAYOUT=sharded keeps only an index in
+# price_history.json and loads each booking's history from its own shard
+# the first time it is used (history_shards.py); only shards that changed
+# are rewritten.
 
+import atexit
+from contextlib import contextmanager
 from datetime import datetime
 import json
 import os
 from typing import Dict, List, Optional
 
+from config import (HISTORY_FORMAT, HISTORY_LAYOUT, PRICE_LOG, PRICE_LOG_COMPACT_EVERY, PRICE_RETENTION,
+                    STORAGE_BACKEND)
+from history_codec import decode_file_data, encode_file_data
+from history_retention import apply_tiers, backup_path, parse_tiers
+from history_shards import history_loaded, is_sharded, lazy_bookings, save_sharded
+from price_stats import add_record, build_stats, category_trend, current_stats
+
+def atomic_write_json(path: str, data, indent: Optional[int] = 2):
+    """Write JSON to a temp file next to path, fsync it and rename it over path"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # Persist the rename itself; not every platform can open a directory
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def make_booking_id(location: str, pickup_date: str, dropoff_date: str, focus_category: str) -> str:
+    """Booking key used in price_history.json, e.g. KOA_04012025_04082025_EconomyCar"""
+    import re
+    category_slug = re.sub(r'[^a-zA-Z0-9]', '', focus_category)
+    return f"{location}_{pickup_date}_{dropoff_date}_{category_slug}".replace("/", "")
+
+
 class BookingTracker:
-    def __init__(self, history_file: str = 'price_history.json'):
-        self.history_file = history_file
+    @classmethod
+    def from_config(cls, backend: Optional[str] = None):
+        """Open the tracker for STORAGE_BACKEND ('json' or 'sqlite')"""
+        backend = (backend or STORAGE_BACKEND).lower()
+        if backend == 'sqlite':
+            from booking_storage import SqliteBookingTracker
+            return SqliteBookingTracker()
+        if backend != 'json':
+            raise ValueError(f"Unknown storage backend '{backend}'. Use 'json' or 'sqlite'")
+        return cls()
+
+    def __init__(self, history_file: str = 'price_history.json',
+                 price_log: Optional[bool] = None, compact_every: Optional[int] = None,
+                 history_format: Optional[str] = None, history_layout: Optional[str] = None):
+        self._init_common(history_file, price_log, compact_every, history_format, history_layout)
         self.bookings = self._load_bookings()
+        self.log_seq = self.bookings["metadata"].get("log_seq", 0)
+        if self.price_log:
+            self._replay_log()
+            atexit.register(self._compact_at_exit)
+
+    def _init_common(self, history_file: Optional[str], price_log: Optional[bool] = None,
+                     compact_every: Optional[int] = None, history_format: Optional[str] = None,
+                     history_layout: Optional[str] = None):
+        """Settings and write state every storage backend shares; loading
+        is left to the backend's __init__"""
+        self.history_file = history_file
+        self.history_format = history_format or HISTORY_FORMAT
+        self.history_layout = history_layout or HISTORY_LAYOUT
+        # Sharded layout: bookings whose shard needs writing / removing
+        self._dirty = set()
+        self._deleted = set()
+        self.price_log = PRICE_LOG if price_log is None else price_log
+        self.log_file = os.path.splitext(history_file)[0] + '.log.jsonl' if history_file else None
+        self.log_seq = 0
+        self.compact_every = PRICE_LOG_COMPACT_EVERY if compact_every is None else compact_every
+        self.pending_ops = 0
+        self._batch_depth = 0
+        self._batch = []
+        # apply_retention inside a transaction: rewrite the file on flush
+        self._rewrite_pending = False
 
     def _create_empty_structure(self) -> Dict:
         """Create empty booking history structure"""
@@ -39,6 +136,17 @@ class BookingTracker:
                 if 'bookings' not in data:
                     data['bookings'] = {}
                 
+                # Columnar histories (HISTORY_FORMAT=columnar) back to record dicts
+                data = decode_file_data(data)
+                if self.history_layout == "sharded" or is_sharded(data):
+                    data['bookings'] = lazy_bookings(self.history_file, data['bookings'])
+                if self.history_layout == "sharded" and not is_sharded(data):
+                    # Single-file history: every booking moves to a shard on the next save
+                    self._dirty.update(data['bookings'])
+                elif self.history_layout != "sharded" and is_sharded(data):
+                    # Back to one file: it has to hold every history again
+                    for booking in data['bookings'].values():
+                        booking["price_history"]
                 return data
         except json.JSONDecodeError:
             print(f"Error reading {self.history_file}. Creating new booking history.")
@@ -52,27 +160,148 @@ class BookingTracker:
             bookings = self.bookings
         
         bookings["metadata"]["last_updated"] = datetime.now().isoformat()
+        if self.log_seq:
+            bookings["metadata"]["log_seq"] = self.log_seq
         
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.history_file) if os.path.dirname(self.history_file) else '.', exist_ok=True)
-        
-        with open(self.history_file, 'w') as f:
-            json.dump(bookings, f, indent=2)
+        if self.history_layout == "sharded":
+            save_sharded(self.history_file, bookings, self._dirty, self._deleted,
+                         self.history_format, atomic_write_json)
+        else:
+            bookings["metadata"].pop("layout", None)
+            if self.history_format == "columnar":
+                atomic_write_json(self.history_file, encode_file_data(bookings), indent=None)
+            else:
+                atomic_write_json(self.history_file, bookings)
+        self._dirty.clear()
+        self._deleted.clear()
+
+        # Everything logged so far is now in the snapshot
+        if self.pending_ops:
+            open(self.log_file, 'w').close()
+            self.pending_ops = 0
+
+    def compact(self):
+        """Fold logged changes into the history file and empty the log"""
+        if self.pending_ops:
+            self.save_bookings()
+
+    def _compact_at_exit(self):
+        try:
+            self.compact()
+        except OSError as e:
+            print(f"Could not compact {self.log_file}: {str(e)}")
+
+    def _replay_log(self):
+        """Apply ops logged after the snapshot was written"""
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-append
+                    continue
+                if op.get("seq", 0) <= self.log_seq:
+                    continue
+                self._apply(op)
+                self.log_seq = op["seq"]
+                self.pending_ops += 1
+
+    def _apply(self, op: Dict):
+        """Apply one change op to the in-memory history"""
+        bookings = self.bookings["bookings"]
+        active = self.bookings["metadata"]["active_bookings"]
+        booking_id = op["id"]
+        if op["op"] == "add":
+            bookings[booking_id] = op["booking"]
+            if booking_id not in active:
+                active.append(booking_id)
+            self._dirty.add(booking_id)
+        elif booking_id not in bookings:
+            return
+        elif op["op"] == "prices":
+            booking = bookings[booking_id]
+            history = booking["price_history"]
+            if (self.history_layout == "sharded" and history
+                    and history[-1]["timestamp"] == op["record"]["timestamp"]):
+                # Already in a shard written just before a crash; the index
+                # and its log_seq were not, so the op is replayed
+                return
+            stats = current_stats(booking)
+            history.append(op["record"])
+            add_record(stats, op["record"]["prices"])
+            self._dirty.add(booking_id)
+        elif op["op"] == "set":
+            bookings[booking_id].update(op["fields"])
+        elif op["op"] == "delete":
+            if booking_id in active:
+                active.remove(booking_id)
+            del bookings[booking_id]
+            self._dirty.discard(booking_id)
+            self._deleted.add(booking_id)
+
+    @contextmanager
+    def transaction(self):
+        """Batch changes made inside the block and persist them once at the end.
+
+        Changes are visible in memory immediately. They are written when
+        the outermost block exits, also when it exits with an exception, so
+        prices already scraped are kept.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush()
+
+    def _commit(self, op: Dict):
+        """Apply a change and persist it, or queue it inside a transaction"""
+        self._apply(op)
+        self._batch.append(op)
+        if not self._batch_depth:
+            self._flush()
+
+    def _flush(self):
+        """Persist queued ops: appended log lines, or a full rewrite when
+        the price log is off"""
+        ops, self._batch = self._batch, []
+        if self._rewrite_pending:
+            # Retention rewrote histories; one full save covers the batch too
+            self._rewrite_pending = False
+            self.save_bookings()
+            return
+        if not ops:
+            return
+        if not self.price_log:
+            self.save_bookings()
+            return
+        lines = []
+        for op in ops:
+            self.log_seq += 1
+            op["seq"] = self.log_seq
+            lines.append(json.dumps(op) + "\n")
+        with open(self.log_file, 'a') as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self.pending_ops += len(ops)
+        if self.compact_every and self.pending_ops >= self.compact_every:
+            self.compact()
 
     def add_booking(self, location: str, pickup_date: str, dropoff_date: str,
                    focus_category: str, pickup_time: str = "12:00 PM",
                    dropoff_time: str = "12:00 PM", holding_price: float = None) -> str:
         """Add a new booking to track"""
-        # Create category slug (remove non-alphanumeric characters)
-        import re
-        category_slug = re.sub(r'[^a-zA-Z0-9]', '', focus_category)
-        booking_id = f"{location}_{pickup_date}_{dropoff_date}_{category_slug}".replace("/", "")
+        booking_id = make_booking_id(location, pickup_date, dropoff_date, focus_category)
         
-        if booking_id in self.bookings["bookings"]:
+        if self._has_booking(booking_id):
             print(f"Booking already exists for {location} from {pickup_date} to {dropoff_date}")
             return booking_id
 
-        self.bookings["bookings"][booking_id] = {
+        booking = {
             "location": location,
             "location_full_name": self._get_location_name(location),
             "pickup_date": pickup_date,
@@ -85,24 +314,16 @@ class BookingTracker:
             "created_at": datetime.now().isoformat()
         }
         
-        if booking_id not in self.bookings["metadata"]["active_bookings"]:
-            self.bookings["metadata"]["active_bookings"].append(booking_id)
-        
-        self.save_bookings()
+        self._commit({"op": "add", "id": booking_id, "booking": booking})
         return booking_id
 
     def delete_booking(self, booking_id: str) -> bool:
         """Delete a specific booking by ID"""
-        if booking_id not in self.bookings["bookings"]:
+        if not self._has_booking(booking_id):
             raise ValueError(f"Booking {booking_id} not found")
             
-        # Remove from active bookings
-        if booking_id in self.bookings["metadata"]["active_bookings"]:
-            self.bookings["metadata"]["active_bookings"].remove(booking_id)
-        
-        # Remove booking data
-        del self.bookings["bookings"][booking_id]
-        self.save_bookings()
+        # Removes it from active bookings and drops its data
+        self._commit({"op": "delete", "id": booking_id})
         return True
 
     def cleanup_expired_bookings(self) -> List[str]:
@@ -136,110 +357,157 @@ class BookingTracker:
                 choice = int(input("\nEnter booking number: ").strip())
                 if 1 <= choice <= len(active_bookings):
                     booking = active_bookings[choice - 1]
-                    import re
-                    category_slug = re.sub(r'[^a-zA-Z0-9]', '', booking['focus_category'])
-                    booking_id = f"{booking['location']}_{booking['pickup_date']}_{booking['dropoff_date']}_{category_slug}".replace("/", "")
-                    return booking_id
+                    return make_booking_id(booking['location'], booking['pickup_date'],
+                                           booking['dropoff_date'], booking['focus_category'])
             except ValueError:
                 pass
             print(f"❌ Please enter a number between 1 and {len(active_bookings)}")
 
     def update_holding_price(self, booking_id: str, holding_price: float):
         """Update the holding price for a booking"""
-        if booking_id not in self.bookings["bookings"]:
+        if not self._has_booking(booking_id):
             raise ValueError(f"Booking {booking_id} not found")
         
-        self.bookings["bookings"][booking_id]["holding_price"] = holding_price
-        self.save_bookings()
+        self._commit({"op": "set", "id": booking_id, "fields": {"holding_price": holding_price}})
         
     def update_booking_details(self, booking_id: str, holding_price: Optional[float] = None, focus_category: Optional[str] = None):
         """Update booking details including holding price and focus category"""
-        if booking_id not in self.bookings["bookings"]:
+        if not self._has_booking(booking_id):
             raise ValueError(f"Booking {booking_id} not found")
         
-        booking = self.bookings["bookings"][booking_id]
-        updates_made = False
+        fields = {}
         
         if holding_price is not None:
-            booking["holding_price"] = holding_price
-            updates_made = True
+            fields["holding_price"] = holding_price
         
         if focus_category is not None:
-            booking["focus_category"] = focus_category
-            updates_made = True
+            fields["focus_category"] = focus_category
             
-        if updates_made:
-            self.save_bookings()
+        if fields:
+            self._commit({"op": "set", "id": booking_id, "fields": fields})
         
+    def update_date_sweep(self, booking_id: str, sweep: Dict):
+        """Store the latest flexible-date sweep grid for a booking"""
+        if not self._has_booking(booking_id):
+            raise ValueError(f"Booking {booking_id} not found")
+
+        self._commit({"op": "set", "id": booking_id, "fields": {"date_sweep": sweep}})
+
     def get_active_bookings(self) -> List[Dict]:
         """Get all active bookings"""
-        active_bookings = []
-        for booking_id in self.bookings["metadata"]["active_bookings"]:
-            if booking_id in self.bookings["bookings"]:
-                booking = self.bookings["bookings"][booking_id]
-                active_bookings.append(booking)
-        return active_bookings
+        return [booking for _, booking in self._active_items()]
+
+    def _has_booking(self, booking_id: str) -> bool:
+        return booking_id in self.bookings["bookings"]
+
+    def _active_items(self) -> List:
+        """(booking_id, booking) for each active booking, in the order added"""
+        return [
+            (booking_id, self.bookings["bookings"][booking_id])
+            for booking_id in self.bookings["metadata"]["active_bookings"]
+            if booking_id in self.bookings["bookings"]
+        ]
 
     def update_prices(self, booking_id: str, prices: Dict[str, float]):
         """Update prices for a specific booking"""
-        if booking_id not in self.bookings["bookings"]:
+        if not self._has_booking(booking_id):
             raise ValueError(f"Booking {booking_id} not found")
             
-        self.bookings["bookings"][booking_id]["price_history"].append({
+        self._commit({"op": "prices", "id": booking_id, "record": {
             "timestamp": datetime.now().isoformat(),
             "prices": prices,
             "lowest_price": {
                 "category": min(prices.items(), key=lambda x: x[1])[0],
                 "price": min(prices.values())
             }
-        })
-        self.save_bookings()
+        }})
 
     def get_price_trends(self, booking_id: str) -> Dict:
-        """Get price trends for a specific booking"""
-        if booking_id not in self.bookings["bookings"]:
+        """Get price trends for a specific booking from its running aggregates"""
+        if not self._has_booking(booking_id):
             raise ValueError(f"Booking {booking_id} not found")
             
         booking = self.bookings["bookings"][booking_id]
-        history = booking["price_history"]
-        
-        if not history:
+        # An unread shard's aggregates are in the index; no need to load it
+        stats = None if history_loaded(booking) else booking.get("price_stats")
+        if stats is None:
+            if not booking["price_history"]:
+                return {}
+            stats = current_stats(booking)
+        elif not stats["checks"]:
             return {}
             
-        focus_category = booking["focus_category"]
-        latest_prices = history[-1]["prices"]
-        holding_price = booking.get("holding_price")
-        
-        # Get previous price if available
-        previous_price = None
-        if len(history) > 1:
-            previous_prices = history[-2]["prices"]
-            previous_price = previous_prices.get(focus_category)
-        
-        trends = {
+        trend = category_trend(stats, booking["focus_category"]) or {
+            "current": None,
+            "previous_price": None,
+            "lowest": float('inf'),
+            "highest": float('-inf'),
+            "average": 0,
+            "total_checks": 0
+        }
+        return {
             "focus_category": {
-                "current": latest_prices.get(focus_category),
-                "previous_price": previous_price,
-                "holding_price": holding_price,
-                "lowest": float('inf'),
-                "highest": float('-inf'),
-                "average": 0,
-                "total_checks": 0
+                "current": trend["current"],
+                "previous_price": trend["previous_price"],
+                "holding_price": booking.get("holding_price"),
+                "lowest": trend["lowest"],
+                "highest": trend["highest"],
+                "average": trend["average"],
+                "total_checks": trend["total_checks"]
             }
         }
-        
-        for record in history:
-            if focus_category in record["prices"]:
-                price = record["prices"][focus_category]
-                trends["focus_category"]["lowest"] = min(trends["focus_category"]["lowest"], price)
-                trends["focus_category"]["highest"] = max(trends["focus_category"]["highest"], price)
-                trends["focus_category"]["average"] += price
-                trends["focus_category"]["total_checks"] += 1
-        
-        if trends["focus_category"]["total_checks"] > 0:
-            trends["focus_category"]["average"] /= trends["focus_category"]["total_checks"]
-        
-        return trends
+
+    def rebuild_price_stats(self) -> int:
+        """Recompute every booking's price aggregates from its history"""
+        for booking in self.bookings["bookings"].values():
+            booking["price_stats"] = build_stats(booking.get("price_history", []))
+        self.save_bookings()
+        return len(self.bookings["bookings"])
+
+    def apply_retention(self, tiers: Optional[str] = None, save: bool = True,
+                        now: Optional[datetime] = None) -> int:
+        """Roll up old price records per PRICE_RETENTION tiers.
+
+        Only histories already in memory are considered, so with the
+        sharded layout this covers the bookings a run touched. Inside a
+        transaction() the rewrite waits for it to end, so a run's prices
+        and their rollup reach disk in one atomic save. Returns the
+        number of records removed.
+        """
+        tier_list = parse_tiers(PRICE_RETENTION if tiers is None else tiers)
+        loaded = [(booking_id, booking) for booking_id, booking in self.bookings["bookings"].items()
+                  if tier_list and history_loaded(booking)]
+        removed = 0
+        for booking_id, booking in loaded:
+            history = booking["price_history"]
+            retained = apply_tiers(history, tier_list, now)
+            if retained is history:
+                continue
+            removed += len(history) - len(retained)
+            if save:
+                self._backup_before_retention()
+                booking["price_history"] = retained
+                booking["price_stats"] = build_stats(retained)
+                self._dirty.add(booking_id)
+        if removed and save:
+            if self._batch_depth:
+                self._rewrite_pending = True
+            else:
+                self.save_bookings()
+        return removed
+
+    def _backup_before_retention(self):
+        """Save the full history, as a single file, before the first rollup"""
+        path = backup_path(self.history_file)
+        if os.path.exists(path):
+            return
+        bookings = {}
+        for booking_id, booking in self.bookings["bookings"].items():
+            booking["price_history"]  # sharded layout: read the shard
+            bookings[booking_id] = dict(booking)
+        metadata = {key: value for key, value in self.bookings["metadata"].items() if key != "layout"}
+        atomic_write_json(path, dict(self.bookings, metadata=metadata, bookings=bookings))
+        print(f"Saved the price history before its first rollup to {path}")
 
     def _get_location_name(self, code: str) -> str:
         """Get full name for airport code"""
@@ -253,8 +521,7 @@ class BookingTracker:
 
     def prompt_for_holding_prices(self):
         """Prompt user for holding prices for all active bookings"""
-        for booking_id in self.bookings["metadata"]["active_bookings"]:
-            booking = self.bookings["bookings"][booking_id]
+        for booking_id, booking in self._active_items():
             current_holding = booking.get("holding_price")
             
             print(f"\n📍 {booking['location']} ({booking['pickup_date']} - {booking['dropoff_date']})")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# browser_host.py
+#
+# Keeps one Chrome process running in the background with its DevTools
+# (CDP) port open, so price checks and admin actions attach to it with
+# connect_over_cdp instead of paying the Chrome startup cost every time.
+# Each attach still gets its own fresh browser context.
+#
+# Run: python3 browser_host.py start|stop|status [--headed] [--port N]
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import time
+import urllib.request
+from datetime import datetime
+
+from config import BROWSER_CDP_URL, BROWSER_HOST, BROWSER_HOST_FILE, BROWSER_HOST_PORT, SESSION_DIR
+
+STARTUP_TIMEOUT = 20
+
+
+def is_alive(endpoint, timeout=1.0):
+    """True if a CDP endpoint answers /json/version."""
+    try:
+        with urllib.request.urlopen(endpoint.rstrip("/") + "/json/version", timeout=timeout) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def read_host_file(host_file=None):
+    try:
+        with open(host_file or BROWSER_HOST_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_endpoint(mode=None, host_file=None):
+    """Return a live CDP endpoint to attach to, or None to launch a browser.
+
+    BROWSER_CDP_URL wins over the host file. Returns None when BROWSER_HOST
+    is 'off' or nothing answers at the endpoint.
+    """
+    mode = mode or BROWSER_HOST
+    if mode == "off":
+        return None
+    endpoint = BROWSER_CDP_URL
+    if not endpoint:
+        info = read_host_file(host_file)
+        endpoint = info.get("endpoint") if info else None
+    if endpoint and is_alive(endpoint):
+        return endpoint
+    return None
+
+
+def attach_allowed(channel=None, headless=True, host_file=None):
+    """Whether a check launching with channel/headless may use the host instead.
+
+    The host file records what the host was started with. A host running a
+    different channel is refused, so a check that needs Google Chrome's TLS
+    fingerprint (CI) never ends up on bundled Chromium. Launch args the
+    host cannot honour otherwise are named in a warning and ignored.
+    """
+    info = (None if BROWSER_CDP_URL else read_host_file(host_file)) or {}
+    host_channel = info.get("channel", "unknown")
+    if channel and "channel" in info and host_channel != channel:
+        print(f"Browser host runs {host_channel or 'bundled Chromium'}, not channel={channel}; launching a browser")
+        return False
+    ignored = []
+    if channel and "channel" not in info:
+        ignored.append(f"channel={channel} (host channel unknown)")
+    if info.get("headless", True) != headless:
+        ignored.append(f"headless={headless}")
+    if ignored:
+        print(f"Attaching to the browser host ignores {', '.join(ignored)}")
+    return True
+
+
+def start(headless=True, port=None, executable=None, host_file=None, channel=None):
+    """Start the host Chrome unless one is already answering. Returns the endpoint.
+
+    channel names what executable is (e.g. "chrome") for attach_allowed;
+    without executable the host is Playwright's bundled Chromium.
+    """
+    from price_monitor import BROWSER_ARGS
+
+    host_file = host_file or BROWSER_HOST_FILE
+    info = read_host_file(host_file)
+    if info and is_alive(info["endpoint"]):
+        print(f"Browser host already running at {info['endpoint']} (pid {info['pid']})")
+        return info["endpoint"]
+
+    port = port or BROWSER_HOST_PORT
+    custom_executable = executable is not None
+    if executable is None:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            executable = p.chromium.executable_path
+
+    args = [
+        executable,
+        *BROWSER_ARGS,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={os.path.abspath(os.path.join(SESSION_DIR, 'host-profile'))}",
+        "--no-first-run",
+        "--no-default-browser-check",
+    ]
+    if headless:
+        args.append("--headless=new")
+    process = subprocess.Popen(
+        args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+    endpoint = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not is_alive(endpoint):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Browser host did not open {endpoint} within {STARTUP_TIMEOUT}s")
+        time.sleep(0.25)
+
+    info = {"endpoint": endpoint, "pid": process.pid, "started_at": datetime.now().isoformat(),
+            "headless": headless}
+    if channel or not custom_executable:
+        info["channel"] = channel
+    os.makedirs(os.path.dirname(host_file) or ".", exist_ok=True)
+    with open(host_file, "w") as f:
+        json.dump(info, f)
+    print(f"Browser host started at {endpoint} (pid {process.pid})")
+    return endpoint
+
+
+def stop(host_file=None):
+    """Terminate the host Chrome and remove its endpoint file."""
+    host_file = host_file or BROWSER_HOST_FILE
+    info = read_host_file(host_file)
+    if not info:
+        print("No browser host running")
+        return False
+    try:
+        os.kill(info["pid"], signal.SIGTERM)
+        print(f"Stopped browser host (pid {info['pid']})")
+    except ProcessLookupError:
+        print("Browser host was already gone")
+    os.remove(host_file)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-lived Chrome that price checks attach to over CDP")
+    parser.add_argument("command", choices=("start", "stop", "status"))
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--port", type=int, default=None, help=f"DevTools port (default {BROWSER_HOST_PORT})")
+    parser.add_argument("--executable", default=None,
+                        help="Chrome binary (default: Playwright's bundled Chromium)")
+    parser.add_argument("--channel", default=None,
+                        help="Channel the --executable binary is, e.g. chrome (checked before attaching)")
+    args = parser.parse_args()
+
+    if args.command == "start":
+        start(headless=not args.headed, port=args.port, executable=args.executable, channel=args.channel)
+    elif args.command == "stop":
+        stop()
+    else:
+        info = read_host_file()
+        if info and is_alive(info["endpoint"]):
+            print(f"Browser host running at {info['endpoint']} (pid {info['pid']}, since {info['started_at']})")
+        else:
+            print("No browser host running")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# browser_session.py
+#
+# Warm-start state carried between scraper runs so each run does not pay
+# the cold-start cost of cookies, the site's JS/CSS cache and any bot-check
+# handshake. Two modes:
+#   storage_state - cookies + localStorage saved to JSON and restored into a
+#                   fresh context (works with any engine / worker count)
+#   profile       - a persistent Chrome user-data directory per worker, which
+#                   also keeps the HTTP disk cache
+# A session is invalidated (files deleted, next run starts cold) when it is
+# older than SESSION_MAX_AGE_HOURS, when its cookies have expired, or when
+# the run that saved it got no prices (likely blocked).
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+from config import SESSION_DIR, SESSION_MAX_AGE_HOURS, SESSION_MODE
+
+SESSION_MODES = ("off", "storage_state", "profile")
+
+
+class BrowserSession:
+    """Warm-start state for one worker's browser."""
+
+    def __init__(self, mode, name="default", session_dir=None, max_age_hours=None):
+        if mode not in SESSION_MODES:
+            raise ValueError(f"Unknown session mode '{mode}'. Use one of {SESSION_MODES}")
+        self.mode = mode
+        self.name = name
+        session_dir = session_dir or SESSION_DIR
+        self.state_file = os.path.join(session_dir, f"{name}.storage_state.json")
+        self.profile_dir = os.path.join(session_dir, "profiles", name)
+        self.meta_file = os.path.join(session_dir, f"{name}.meta.json")
+        self.max_age_hours = SESSION_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        self.warm = False
+
+    @classmethod
+    def from_config(cls, name="default", mode=None):
+        """Return a session for SESSION_MODE, or None when it is 'off'."""
+        mode = mode or SESSION_MODE
+        if mode == "off":
+            return None
+        return cls(mode, name=name)
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def stale_reason(self):
+        """Return why the saved session cannot be reused, or None if it can."""
+        meta = self._read_meta()
+        if meta is None:
+            return "no saved session"
+        if not meta.get("healthy", False):
+            return "last run got no prices"
+        try:
+            saved_at = datetime.fromisoformat(meta["saved_at"])
+        except (KeyError, ValueError):
+            return "unreadable session metadata"
+        age_hours = (datetime.now() - saved_at).total_seconds() / 3600
+        if age_hours > self.max_age_hours:
+            return f"session is {age_hours:.0f}h old"
+
+        if self.mode == "storage_state":
+            try:
+                with open(self.state_file, "r") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                return "storage state missing or unreadable"
+            now = time.time()
+            cookies = state.get("cookies", [])
+            # expires == -1 marks a session cookie, which is valid until the context closes
+            if cookies and all(0 < c.get("expires", -1) < now for c in cookies):
+                return "all cookies expired"
+        elif not os.path.isdir(self.profile_dir):
+            return "profile directory missing"
+        return None
+
+    def invalidate(self, reason):
+        """Delete the saved state so the next launch starts cold."""
+        print(f"Browser session '{self.name}' invalidated: {reason}")
+        for path in (self.state_file, self.meta_file):
+            if os.path.exists(path):
+                os.remove(path)
+        if self.mode == "profile" and os.path.isdir(self.profile_dir):
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def prepare(self):
+        """Check the saved state before launch. Sets and returns self.warm."""
+        reason = self.stale_reason()
+        if reason is None:
+            self.warm = True
+        else:
+            self.warm = False
+            if os.path.exists(self.meta_file):
+                self.invalidate(reason)
+        if self.mode == "profile":
+            os.makedirs(self.profile_dir, exist_ok=True)
+        return self.warm
+
+    def context_kwargs(self):
+        """Extra browser.new_context() kwargs (storage_state mode only)."""
+        if self.mode == "storage_state" and self.warm:
+            return {"storage_state": self.state_file}
+        return {}
+
+    def save(self, context, healthy):
+        """Persist the context's state after a run.
+
+        An unhealthy run (no prices) is recorded so the next launch discards
+        the session instead of reusing cookies the site may have flagged.
+        """
+        os.makedirs(os.path.dirname(self.meta_file) or ".", exist_ok=True)
+        if self.mode == "storage_state" and healthy:
+            try:
+                context.storage_state(path=self.state_file)
+            except Exception as e:
+                print(f"Could not save storage state: {str(e)}")
+                healthy = False
+        self._write_meta(healthy)
+
+    async def save_async(self, context, healthy):
+        """save() for an async_api BrowserContext."""
+        os.makedirs(os.path.dirname(self.meta_file) or ".", exist_ok=True)
+        if self.mode == "storage_state" and healthy:
+            try:
+                await context.storage_state(path=self.state_file)
+            except Exception as e:
+                print(f"Could not save storage state: {str(e)}")
+                healthy = False
+        self._write_meta(healthy)
+
+    def _write_meta(self, healthy):
+        with open(self.meta_file, "w") as f:
+            json.dump({"saved_at": datetime.now().isoformat(), "healthy": healthy}, f)
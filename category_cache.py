@@ -0,0 +1,65 @@
+# category_cache.py
+#
+# Which vehicle categories each location offers, remembered between runs so
+# adding a booking does not need a throwaway search just to list or validate
+# categories. Every successful price check refreshes its location for free.
+#
+# Stored per category with the time it was last seen:
+#   {"KOA": {"Economy Car": "2025-03-01T06:00:00", ...}, ...}
+# A category counts as available while it was seen within the TTL, so one
+# search where it happened to be sold out does not drop it.
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from config import CATEGORY_CACHE_FILE, CATEGORY_CACHE_TTL_HOURS
+
+
+class CategoryCache:
+    """Persistent, TTL-bound map of location -> available categories."""
+
+    def __init__(self, path=None, ttl_hours=None):
+        self.path = path or CATEGORY_CACHE_FILE
+        self.ttl = timedelta(hours=CATEGORY_CACHE_TTL_HOURS if ttl_hours is None else ttl_hours)
+        self.locations = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.locations, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def get(self, location, now=None):
+        """Sorted categories seen at location within the TTL, or None if none are fresh."""
+        cutoff = (now or datetime.now()) - self.ttl
+        fresh = []
+        for category, seen_at in self.locations.get(location.upper(), {}).items():
+            try:
+                if datetime.fromisoformat(seen_at) >= cutoff:
+                    fresh.append(category)
+            except ValueError:
+                continue
+        return sorted(fresh) or None
+
+    def update(self, location, categories, now=None):
+        """Mark categories as seen at location now and persist the cache."""
+        categories = [category for category in categories if category]
+        if not categories:
+            return
+        seen_at = (now or datetime.now()).isoformat(timespec="seconds")
+        entry = self.locations.setdefault(location.upper(), {})
+        for category in categories:
+            entry[category] = seen_at
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save category cache: {str(e)}")
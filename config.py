@@ -17,12 +17,139 @@ FOCUS_CATEGORY = os.getenv('FOCUS_CATEGORY', 'Economy Car')
 # File paths
 PRICES_FILE = os.getenv('PRICES_FILE', 'rental_prices.txt')
 SCREENSHOT_PATH = os.getenv('SCREENSHOT_PATH', 'screenshots/')
+# Categories seen per location (category_cache.py); a category stays valid
+# for this long after it last appeared in a search
+CATEGORY_CACHE_FILE = os.getenv('CATEGORY_CACHE_FILE', 'category_cache.json')
+CATEGORY_CACHE_TTL_HOURS = float(os.getenv('CATEGORY_CACHE_TTL_HOURS', '168'))
+
+# Screenshots: 'off', 'on-failure', 'sampled' (failures + a fraction of
+# successes) or 'all'. Format is 'jpeg', 'webp' (needs Pillow) or 'png';
+# SCREENSHOT_CLIP_SELECTOR captures one element instead of the viewport.
+SCREENSHOT_POLICY = os.getenv('SCREENSHOT_POLICY', 'on-failure')
+SCREENSHOT_SAMPLE_RATE = float(os.getenv('SCREENSHOT_SAMPLE_RATE', '0.1'))
+SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'jpeg')
+SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '70'))
+SCREENSHOT_CLIP_SELECTOR = os.getenv('SCREENSHOT_CLIP_SELECTOR', '')
+SCREENSHOT_MAX_AGE_DAYS = float(os.getenv('SCREENSHOT_MAX_AGE_DAYS', '7'))
+SCREENSHOT_MAX_TOTAL_MB = float(os.getenv('SCREENSHOT_MAX_TOTAL_MB', '200'))
+
+# Booking storage: 'json' (price_history.json) or 'sqlite' (booking_storage.py,
+# STORAGE_DB_FILE; price_history.json is still exported after each run)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json')
+STORAGE_DB_FILE = os.getenv('STORAGE_DB_FILE', 'price_history.db')
+
+# On-disk price_history layout: 'dict' (one dict per check, what the
+# dashboard and workflow read) or 'columnar' (history_codec.py, ~6x smaller)
+HISTORY_FORMAT = os.getenv('HISTORY_FORMAT', 'dict')
+# 'single' (every history inside price_history.json) or 'sharded' (the file
+# is an index; each booking's history is read from price_history.history/
+# only when used, see history_shards.py)
+HISTORY_LAYOUT = os.getenv('HISTORY_LAYOUT', 'single')
+# Price history retention tiers, newest first (history_retention.py), e.g.
+# 'full:30,day:180,week': every check for 30 days, then one record per day,
+# per week after 180 days. Off by default since a rollup cannot be undone;
+# the first one saves a .pre-retention.json copy of the history. Applies to
+# both storage backends; the sqlite backend collapses
+# price_snapshots/price_points into rollup rows.
+PRICE_RETENTION = os.getenv('PRICE_RETENTION', 'off')
+
+# Price history writes (booking_tracker.py): append each change to a JSONL
+# log next to price_history.json and fold it back in every N changes
+PRICE_LOG = os.getenv('PRICE_LOG', 'true').lower() == 'true'
+PRICE_LOG_COMPACT_EVERY = int(os.getenv('PRICE_LOG_COMPACT_EVERY', '100'))
 
 # Timeouts
 PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '60'))
 ELEMENT_TIMEOUT = int(os.getenv('ELEMENT_TIMEOUT', '10'))
 SEARCH_TIMEOUT = int(os.getenv('SEARCH_TIMEOUT', '60'))
 
+# Scraping concurrency (number of isolated browser contexts checking bookings)
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', '1'))
+# Scraping engine: 'sync' (thread per worker) or 'async' (one asyncio browser)
+SCRAPE_ENGINE = os.getenv('SCRAPE_ENGINE', 'sync')
+
+# Form pacing: 'human' (randomized think-time) or 'fast' (wait on page state)
+PACING_MODE = os.getenv('PACING_MODE', 'human')
+# Ceiling for each page-state wait in fast pacing, in milliseconds
+FAST_WAIT_TIMEOUT = int(os.getenv('FAST_WAIT_TIMEOUT', '5000'))
+# Pause between one booking and the next in fast pacing, in milliseconds
+# (human pacing waits 2-4 s). Keeps back-to-back searches from a worker
+# spaced out even when form think-time is skipped.
+FAST_BOOKING_GAP_MS = int(os.getenv('FAST_BOOKING_GAP_MS', '1000'))
+
+# Results are ready once the cards have not changed for RESULTS_QUIET_MS,
+# waiting at most RESULTS_STABLE_CEILING ms after the first card appears
+RESULTS_QUIET_MS = int(os.getenv('RESULTS_QUIET_MS', '400'))
+RESULTS_STABLE_CEILING = int(os.getenv('RESULTS_STABLE_CEILING', '5000'))
+
+# Flexible-date sweep (date_sweep.py, main.py --sweep): shift pickup and
+# dropoff by up to SWEEP_DAYS each way; SWEEP_TIMES lists extra pickup/dropoff
+# times to try (empty = the booking's own times)
+SWEEP_DAYS = int(os.getenv('SWEEP_DAYS', '2'))
+SWEEP_TIMES = [
+    time.strip() for time in
+    os.getenv('SWEEP_TIMES', '').split(',')
+    if time.strip()
+]
+
+# Memory watchdog (memory_watchdog.py): each worker swaps in a fresh browser
+# context after this many searches, or when the page's JS heap / the
+# browser's resident memory crosses these limits (0 disables a limit)
+MEMORY_RECYCLE_SEARCHES = int(os.getenv('MEMORY_RECYCLE_SEARCHES', '25'))
+MEMORY_MAX_HEAP_MB = float(os.getenv('MEMORY_MAX_HEAP_MB', '512'))
+MEMORY_MAX_RSS_MB = float(os.getenv('MEMORY_MAX_RSS_MB', '2048'))
+
+# Browser warm-start: 'off', 'storage_state' (cookies/localStorage JSON) or
+# 'profile' (persistent user-data dir with HTTP disk cache, sync engine only)
+SESSION_MODE = os.getenv('SESSION_MODE', 'off')
+SESSION_DIR = os.getenv('SESSION_DIR', '.browser_state')
+SESSION_MAX_AGE_HOURS = float(os.getenv('SESSION_MAX_AGE_HOURS', '72'))
+
+# Long-lived browser host (browser_host.py): 'auto' attaches over CDP when a
+# host is running and launches a browser otherwise, 'off' always launches.
+# BROWSER_CDP_URL points at an existing endpoint instead of the host file.
+BROWSER_HOST = os.getenv('BROWSER_HOST', 'auto')
+BROWSER_CDP_URL = os.getenv('BROWSER_CDP_URL', '')
+BROWSER_HOST_PORT = int(os.getenv('BROWSER_HOST_PORT', '9222'))
+BROWSER_HOST_FILE = os.getenv('BROWSER_HOST_FILE', os.path.join(SESSION_DIR, 'browser_host.json'))
+
+# HTTP fast path (http_fast_path.py): replay the last good rentalCarSearch
+# request with the booking's values instead of driving the search form
+HTTP_FAST_PATH = os.getenv('HTTP_FAST_PATH', 'false').lower() == 'true'
+SEARCH_TEMPLATE_FILE = os.getenv('SEARCH_TEMPLATE_FILE', os.path.join(SESSION_DIR, 'search_template.json'))
+
+# Per-stage timing spans are appended here as JSON lines ('' keeps them in memory only)
+TIMING_FILE = os.getenv('TIMING_FILE', 'timings.jsonl')
+
+# Offline harness (har_harness.py): 'off', 'record' (capture traffic to
+# HAR_FILE plus DOM fixtures) or 'replay' (serve everything from HAR_FILE)
+HAR_MODE = os.getenv('HAR_MODE', 'off')
+HAR_FILE = os.getenv('HAR_FILE', 'fixtures/costco.har')
+HAR_FIXTURE_DIR = os.getenv('HAR_FIXTURE_DIR', 'fixtures/dom')
+
+# Retries (retry.py): attempts per booking with exponential backoff between
+# them, one more try at the end of the run for bookings that still failed
+# (while inside RUN_TIME_BUDGET_MINUTES, 0 = no limit), and a circuit
+# breaker that stops the run after this many failed bookings in a row.
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', '3'))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '2'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '30'))
+RETRY_REQUEUE = os.getenv('RETRY_REQUEUE', 'true').lower() == 'true'
+RUN_TIME_BUDGET_MINUTES = float(os.getenv('RUN_TIME_BUDGET_MINUTES', '30'))
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', '3'))
+
+# Request blocking: 'off', 'standard' (images/media/fonts + third-party hosts)
+# or 'strict' (also stylesheets). Allowlisted hosts include their subdomains.
+# Off by default: 'standard' aborts every request, scripts and XHRs included,
+# to hosts not on the allowlist. Only enable it after a recorded run
+# (HAR_MODE=record) shows the bot check and search form still work with it.
+BLOCK_PROFILE = os.getenv('BLOCK_PROFILE', 'off')
+BLOCK_ALLOW_HOSTS = [
+    host.strip() for host in
+    os.getenv('BLOCK_ALLOW_HOSTS', 'costcotravel.com,costco.com').split(',')
+    if host.strip()
+]
+
 # Email Configuration
 SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
 SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
@@ -0,0 +1,176 @@
+# date_sweep.py
+#
+# Flexible-date sweep: price a matrix of variants around one booking to spot
+# cheaper adjacent dates. Variants shift pickup and dropoff by up to
+# SWEEP_DAYS each way and try every SWEEP_TIMES pickup/dropoff time, then
+# run through the normal worker pool (scrape_bookings), so retries, the
+# circuit breaker and the HTTP fast path all apply.
+#
+# The result is stored with the booking as a compact grid of focus-category
+# prices:
+#   "date_sweep": {
+#     "swept_at": "...", "category": "Economy Car", "days": 2,
+#     "columns": ["pickup_shift", "dropoff_shift", "pickup_time", "dropoff_time", "price"],
+#     "rows": [[-1, 0, "12:00 PM", "12:00 PM", 412.5], ...]
+#   }
+# price is null when the category was not offered or the search failed.
+
+from datetime import datetime, timedelta
+
+from booking_tracker import make_booking_id
+from config import SCRAPE_ENGINE, SCRAPE_WORKERS, SWEEP_DAYS, SWEEP_TIMES
+
+DATE_FORMAT = "%m/%d/%Y"
+GRID_COLUMNS = ["pickup_shift", "dropoff_shift", "pickup_time", "dropoff_time", "price"]
+
+
+def build_variants(booking, days=None, times=None, today=None):
+    """Return the sweep variants for booking as search-only booking dicts.
+
+    Each variant carries "pickup_shift"/"dropoff_shift" (days relative to
+    the booking). Times default to the booking's own; combinations whose
+    pickup is in the past or whose dropoff is not after pickup are skipped.
+    """
+    days = SWEEP_DAYS if days is None else days
+    times = list(times if times is not None else SWEEP_TIMES)
+    today = today or datetime.now().date()
+    pickup = datetime.strptime(booking["pickup_date"], DATE_FORMAT).date()
+    dropoff = datetime.strptime(booking["dropoff_date"], DATE_FORMAT).date()
+    pickup_times = times or [booking.get("pickup_time", "12:00 PM")]
+    dropoff_times = times or [booking.get("dropoff_time", "12:00 PM")]
+
+    variants = []
+    for pickup_shift in range(-days, days + 1):
+        new_pickup = pickup + timedelta(days=pickup_shift)
+        if new_pickup < today:
+            continue
+        for dropoff_shift in range(-days, days + 1):
+            new_dropoff = dropoff + timedelta(days=dropoff_shift)
+            if new_dropoff <= new_pickup:
+                continue
+            for pickup_time in pickup_times:
+                for dropoff_time in dropoff_times:
+                    variants.append(dict(
+                        location=booking["location"],
+                        focus_category=booking["focus_category"],
+                        pickup_date=new_pickup.strftime(DATE_FORMAT),
+                        dropoff_date=new_dropoff.strftime(DATE_FORMAT),
+                        pickup_time=pickup_time,
+                        dropoff_time=dropoff_time,
+                        pickup_shift=pickup_shift,
+                        dropoff_shift=dropoff_shift,
+                    ))
+    return variants
+
+
+def build_grid(booking, variants, results, days):
+    """Collapse per-variant prices ({index: prices or None}) into the stored grid."""
+    category = booking["focus_category"]
+    rows = []
+    for index, variant in enumerate(variants):
+        prices = results.get(index) or {}
+        rows.append([
+            variant["pickup_shift"],
+            variant["dropoff_shift"],
+            variant["pickup_time"],
+            variant["dropoff_time"],
+            prices.get(category),
+        ])
+    return {
+        "swept_at": datetime.now().isoformat(),
+        "category": category,
+        "days": days,
+        "columns": list(GRID_COLUMNS),
+        "rows": rows,
+    }
+
+
+def cheapest(grid):
+    """Return the grid row with the lowest price, or None if nothing priced."""
+    priced = [row for row in grid["rows"] if row[4] is not None]
+    return min(priced, key=lambda row: row[4]) if priced else None
+
+
+def print_grid(booking, grid):
+    """Print the sweep as pickup shift (rows) x dropoff shift (columns).
+
+    Each cell shows the cheapest price across the swept times; * marks the
+    overall cheapest variant and the booking's own dates are in brackets.
+    """
+    cells = {}
+    for pickup_shift, dropoff_shift, _, _, price in grid["rows"]:
+        key = (pickup_shift, dropoff_shift)
+        if price is not None and (cells.get(key) is None or price < cells[key]):
+            cells[key] = price
+        else:
+            cells.setdefault(key, None)
+    if not cells:
+        print("No sweep variants to show")
+        return
+    best = cheapest(grid)
+    shifts = range(-grid["days"], grid["days"] + 1)
+
+    print(f"\n📅 Date sweep for {booking['location']} {booking['pickup_date']} - "
+          f"{booking['dropoff_date']} ({grid['category']})")
+    print(f"{'pickup/dropoff':>16}" + "".join(f"{shift:>+10d}" for shift in shifts))
+    for pickup_shift in shifts:
+        line = f"{pickup_shift:>+16d}"
+        for dropoff_shift in shifts:
+            key = (pickup_shift, dropoff_shift)
+            price = cells.get(key)
+            if key not in cells:
+                text = ""
+            elif price is None:
+                text = "-"
+            else:
+                text = f"{price:.0f}"
+                if best is not None and (best[0], best[1]) == key:
+                    text += "*"
+            if key == (0, 0):
+                text = f"[{text}]"
+            line += f"{text:>10}"
+        print(line)
+    if best is not None:
+        pickup = datetime.strptime(booking["pickup_date"], DATE_FORMAT) + timedelta(days=best[0])
+        dropoff = datetime.strptime(booking["dropoff_date"], DATE_FORMAT) + timedelta(days=best[1])
+        print(f"Cheapest: ${best[4]:.2f} for {pickup.strftime(DATE_FORMAT)} {best[2]} - "
+              f"{dropoff.strftime(DATE_FORMAT)} {best[3]}")
+
+
+def sweep_booking(tracker, booking, days=None, times=None, workers=None, engine=None):
+    """Price every variant of booking, store the grid with it and return the grid."""
+    from price_monitor import browser_channel, print_worker_timings
+
+    days = SWEEP_DAYS if days is None else days
+    workers = SCRAPE_WORKERS if workers is None else workers
+    engine = engine or SCRAPE_ENGINE
+    variants = build_variants(booking, days=days, times=times)
+    if not variants:
+        print(f"No sweep variants for {booking['location']} (all dates are in the past)")
+        return None
+
+    results = {}
+
+    def on_result(index, prices):
+        results[index] = prices
+
+    print(f"\nSweeping {len(variants)} variants of {booking['location']} "
+          f"{booking['pickup_date']} - {booking['dropoff_date']} on {min(workers, len(variants))} "
+          f"{engine} worker(s)")
+    if engine == "async":
+        import asyncio
+        from async_price_monitor import scrape_bookings as scrape_bookings_async
+        worker_stats = asyncio.run(scrape_bookings_async(
+            variants, on_result, workers=workers, channel=browser_channel()
+        ))
+    else:
+        from price_monitor import scrape_bookings
+        worker_stats = scrape_bookings(variants, on_result, workers=workers, channel=browser_channel())
+    print_worker_timings(worker_stats)
+
+    grid = build_grid(booking, variants, results, days)
+    booking_id = make_booking_id(booking["location"], booking["pickup_date"],
+                                 booking["dropoff_date"], booking["focus_category"])
+    tracker.update_date_sweep(booking_id, grid)
+    print_grid(booking, grid)
+    return grid
@@ -6,6 +6,8 @@ import sys
 from datetime import datetime
 from typing import Dict, Optional
 
+from history_shards import is_sharded, shard_path
+
 class BookingManager:
     def __init__(self, price_history_file: str = 'price_history.json'):
         self.price_history_file = price_history_file
@@ -89,6 +91,11 @@ class BookingManager:
             
             # Save updated price history
             self._save_price_history()
+            if is_sharded(self.price_history):
+                # HISTORY_LAYOUT=sharded: the history lives in its own file
+                shard = shard_path(self.price_history_file, booking_id)
+                if os.path.exists(shard):
+                    os.remove(shard)
             
             # Display remaining bookings
             print("\n=== Remaining Bookings After Deletion ===")
@@ -0,0 +1,119 @@
+# har_harness.py
+#
+# Offline record/replay for the scraper. In record mode every browser
+# context records its traffic into HAR_FILE via route_from_har(update=True)
+# and process_booking saves the rendered results page per booking into
+# HAR_FIXTURE_DIR. In replay mode the same HAR answers every request and
+# anything it does not contain is aborted, so process_booking and
+# run_price_checks run without touching costcotravel.com. A replayed run
+# records its (stale) prices into a throwaway copy of the tracker and
+# sends no alert email, so price_history.json is never touched.
+#
+# Record:  HAR_MODE=record python3 main.py      (one worker)
+# Replay:  HAR_MODE=replay python3 main.py
+#          python3 benchmark.py --har fixtures/costco.har
+
+import atexit
+import json
+import os
+import re
+import shutil
+import tempfile
+
+from config import HAR_FILE, HAR_FIXTURE_DIR, HAR_MODE
+
+HAR_MODES = ("off", "record", "replay")
+
+
+def resolve_har_mode(mode=None):
+    mode = mode or HAR_MODE
+    if mode not in HAR_MODES:
+        raise ValueError(f"Unknown HAR mode '{mode}'. Use one of {HAR_MODES}")
+    return mode
+
+
+def route_from_har_kwargs(mode, path=None):
+    """Arguments for context.route_from_har(), or None when mode is 'off'."""
+    path = path or HAR_FILE
+    if mode == "record":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return {"har": path, "update": True, "update_content": "embed", "update_mode": "minimal"}
+    if mode == "replay":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No HAR recording at {path}; record one with HAR_MODE=record")
+        return {"har": path, "not_found": "abort"}
+    return None
+
+
+def attach_har(context, mode=None, path=None):
+    """Record into or replay from a HAR on a sync_api BrowserContext.
+
+    Register this after any other context.route() handlers: the most
+    recently added route wins, so replayed responses take precedence.
+    Returns the mode applied. A recording is written when the context closes.
+    """
+    mode = resolve_har_mode(mode)
+    kwargs = route_from_har_kwargs(mode, path)
+    if kwargs is not None:
+        context.route_from_har(**kwargs)
+        print(f"HAR {mode}: {kwargs['har']}")
+    return mode
+
+
+async def attach_har_async(context, mode=None, path=None):
+    """attach_har() for an async_api BrowserContext."""
+    mode = resolve_har_mode(mode)
+    kwargs = route_from_har_kwargs(mode, path)
+    if kwargs is not None:
+        await context.route_from_har(**kwargs)
+        print(f"HAR {mode}: {kwargs['har']}")
+    return mode
+
+
+def fixture_name(booking):
+    """File name for a booking's DOM fixture, e.g. KOA_04-01-2025_04-08-2025.html."""
+    raw = f"{booking['location']}_{booking['pickup_date']}_{booking['dropoff_date']}"
+    return re.sub(r"[^A-Za-z0-9_-]", "-", raw) + ".html"
+
+
+def save_dom_fixture(html, booking, directory=None):
+    """Write a results page captured in record mode. Returns the path."""
+    directory = directory or HAR_FIXTURE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, fixture_name(booking))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    print(f"DOM fixture saved: {path}")
+    return path
+
+
+def replay_tracker(tracker, active_bookings, mode=None):
+    """(tracker, active_bookings) for a price check run.
+
+    In replay mode both are swapped for a BookingTracker in a temporary
+    directory holding copies of active_bookings, so replayed prices never
+    reach the real history. Otherwise they are returned unchanged.
+    """
+    if resolve_har_mode(mode) != "replay" or getattr(tracker, "har_replay", False):
+        return tracker, active_bookings
+
+    from booking_tracker import BookingTracker, atomic_write_json, make_booking_id
+
+    directory = tempfile.mkdtemp(prefix="har_replay_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    data = {"metadata": {"active_bookings": []}, "bookings": {}}
+    for booking in active_bookings:
+        booking_id = make_booking_id(booking["location"], booking["pickup_date"],
+                                     booking["dropoff_date"], booking["focus_category"])
+        # JSON round trip: a deep copy, with any unread history shard loaded
+        data["bookings"][booking_id] = json.loads(json.dumps(
+            dict(booking, price_history=booking.get("price_history", []))
+        ))
+        data["metadata"]["active_bookings"].append(booking_id)
+    path = os.path.join(directory, "price_history.json")
+    atomic_write_json(path, data)
+
+    replay = BookingTracker(history_file=path, price_log=False, history_layout="single")
+    replay.har_replay = True
+    print(f"HAR replay: prices go to a throwaway copy of the history in {directory}")
+    return replay, replay.get_active_bookings()
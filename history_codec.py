@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# history_codec.py
+#
+# Compact columnar encoding for a booking's price_history. Instead of one
+# dict per check that repeats every category name and stores floats like
+# 414.17999999999995, a booking's history becomes
+#   {"format": "columnar", "v": 1,
+#    "categories": ["Economy Car", "Minivan", ...],   # first-seen order
+#    "timestamps": ["2025-03-01T06:00:00", ...],
+#    "prices": [[41418, 55000, null, ...], ...],       # cents, one row per check
+#    "lowest": [0, ...]}                              # category index per row, -1 if none
+# Prices are currency, so cents are the exact value; decode() returns
+# 414.18 where the old file had 414.17999999999995.
+#
+# BookingTracker writes this form when HISTORY_FORMAT=columnar and always
+# reads both, so callers only ever see the list-of-dicts shape. A booking
+# whose records do not survive encode -> decode (extra keys, odd
+# lowest_price) is left as a plain list.
+#
+#   python3 history_codec.py compare [price_history.json]   size / parse time
+#   python3 history_codec.py encode IN OUT                   convert a file
+#   python3 history_codec.py decode IN OUT
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List, Optional
+
+FORMAT = "columnar"
+VERSION = 1
+
+
+def is_encoded(history) -> bool:
+    return isinstance(history, dict) and history.get("format") == FORMAT
+
+
+def to_cents(price: float) -> int:
+    return int(round(price * 100))
+
+
+def normalize(records: List[Dict]) -> List[Dict]:
+    """records with every price rounded to cents, i.e. what decode() returns"""
+    normalized = []
+    for record in records:
+        out = dict(record)
+        out["prices"] = {
+            category: None if price is None else to_cents(price) / 100
+            for category, price in record["prices"].items()
+        }
+        if "lowest_price" in record:
+            lowest = dict(record["lowest_price"])
+            lowest["price"] = to_cents(lowest["price"]) / 100
+            out["lowest_price"] = lowest
+        normalized.append(out)
+    return normalized
+
+
+def encode(records: List[Dict]) -> Optional[Dict]:
+    """Encode a price_history list; None when it cannot round-trip."""
+    index = {}
+    rows, lowest, timestamps = [], [], []
+    try:
+        for record in records:
+            for category in record["prices"]:
+                index.setdefault(category, len(index))
+        for record in records:
+            if set(record) - {"timestamp", "prices", "lowest_price"}:
+                return None
+            row = [None] * len(index)
+            for category, price in record["prices"].items():
+                row[index[category]] = None if price is None else to_cents(price)
+            rows.append(row)
+            timestamps.append(record["timestamp"])
+            low = record.get("lowest_price")
+            lowest.append(index[low["category"]] if low else -1)
+    except (KeyError, TypeError, AttributeError):
+        return None
+    encoded = {
+        "format": FORMAT,
+        "v": VERSION,
+        "categories": list(index),
+        "timestamps": timestamps,
+        "prices": rows,
+        "lowest": lowest,
+    }
+    return encoded if decode(encoded) == normalize(records) else None
+
+
+def decode(encoded: Dict) -> List[Dict]:
+    """The list-of-dicts price_history for an encoded booking history."""
+    if encoded.get("v") != VERSION:
+        raise ValueError(f"Unsupported price history encoding v{encoded.get('v')}")
+    categories = encoded["categories"]
+    records = []
+    for timestamp, row, low in zip(encoded["timestamps"], encoded["prices"], encoded["lowest"]):
+        # Rows written before a new category appeared are shorter
+        prices = {
+            categories[i]: cents / 100
+            for i, cents in enumerate(row) if cents is not None
+        }
+        record = {"timestamp": timestamp, "prices": prices}
+        if low >= 0:
+            record["lowest_price"] = {"category": categories[low], "price": row[low] / 100}
+        records.append(record)
+    return records
+
+
+def encode_file_data(data: Dict) -> Dict:
+    """Copy of a price_history.json structure with histories encoded where possible"""
+    out = dict(data, bookings={})
+    for booking_id, booking in data.get("bookings", {}).items():
+        history = booking.get("price_history")
+        encoded = encode(history) if isinstance(history, list) and history else None
+        out["bookings"][booking_id] = dict(booking, price_history=encoded) if encoded else booking
+    return out
+
+
+def decode_file_data(data: Dict) -> Dict:
+    """data with every encoded history decoded in place; returns data"""
+    for booking in data.get("bookings", {}).values():
+        if is_encoded(booking.get("price_history")):
+            booking["price_history"] = decode(booking["price_history"])
+    return data
+
+
+def _median_seconds(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def compare(path: str, repeat: int = 20):
+    """Print file size and parse time of the dict and columnar forms of path"""
+    with open(path, "r") as f:
+        data = decode_file_data(json.load(f))
+    dict_text = json.dumps(data, indent=2)
+    columnar_text = json.dumps(encode_file_data(data), separators=(",", ":"))
+
+    dict_parse = _median_seconds(lambda: json.loads(dict_text), repeat)
+    columnar_parse = _median_seconds(lambda: json.loads(columnar_text), repeat)
+    columnar_load = _median_seconds(lambda: decode_file_data(json.loads(columnar_text)), repeat)
+
+    print(f"{'':<28}{'dict':>12}{'columnar':>12}")
+    print(f"{'size (KB)':<28}{len(dict_text) / 1024:>12.1f}{len(columnar_text) / 1024:>12.1f}")
+    print(f"{'json.loads (ms)':<28}{dict_parse * 1000:>12.2f}{columnar_parse * 1000:>12.2f}")
+    print(f"{'json.loads + decode (ms)':<28}{dict_parse * 1000:>12.2f}{columnar_load * 1000:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar price history encoding")
+    parser.add_argument("command", choices=("compare", "encode", "decode"))
+    parser.add_argument("source", nargs="?", default="price_history.json")
+    parser.add_argument("dest", nargs="?", default=None)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.source)
+        return
+    if not args.dest:
+        parser.error(f"{args.command} needs a destination file")
+    with open(args.source, "r") as f:
+        data = decode_file_data(json.load(f))
+    with open(args.dest, "w") as f:
+        if args.command == "encode":
+            json.dump(encode_file_data(data), f, separators=(",", ":"))
+        else:
+            json.dump(data, f, indent=2)
+    print(f"Wrote {args.dest}")
+
+
+if __name__ == "__main__":
+    main()
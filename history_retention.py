@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# history_retention.py
+#
+# Tiered retention for price_history. PRICE_RETENTION lists tiers from
+# newest to oldest as kind:max_age_days, the last one open-ended:
+#   full:30,day:180,week
+# keeps every check from the last 30 days, one record per day up to 180
+# days back and one per ISO week beyond that. A rolled-up record keeps the
+# shape readers expect (its prices are each category's closing price,
+# lowest_price the lowest price seen in the period) and adds
+#   "rollup": {"period": "day", "start": ..., "end": ..., "checks": 4,
+#              "categories": {"Economy Car": {"open": 310.0, "high": 320.0,
+#                  "low": 295.0, "close": 300.0, "sum": 1225.0, "count": 4}}}
+# Rolling up rollups (day -> week) merges these, so lows, highs, sums and
+# counts, and with them the all-time low/high, average and number of
+# checks, are exactly those of the raw checks (price_stats reads them).
+#
+# Rollups cannot be undone, so PRICE_RETENTION is off by default and the
+# first rollup a tracker makes saves the whole history to
+# backup_path(...) (price_history.pre-retention.json) beforehand.
+#
+# run_price_checks applies it at the end of every run, inside the run's
+# transaction so the new prices and the rollup are saved together; the
+# rest of the time:
+#   python3 history_retention.py [--tiers full:30,day:180,week] [--dry-run]
+
+import argparse
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+PERIODS = ("full", "day", "week")
+
+
+def parse_tiers(spec: str) -> List[Tuple[str, Optional[int]]]:
+    """[(kind, max_age_days), ...] for a PRICE_RETENTION value; [] when off"""
+    if not spec or spec.strip().lower() in ("off", "none"):
+        return []
+    tiers = []
+    for part in spec.split(","):
+        kind, _, age = part.strip().partition(":")
+        if kind not in PERIODS:
+            raise ValueError(f"Unknown retention tier '{kind}'. Use one of {', '.join(PERIODS)}")
+        tiers.append((kind, int(age) if age else None))
+    ages = [age for _, age in tiers[:-1]]
+    if None in ages or tiers[-1][1] is not None:
+        raise ValueError(f"Only the last retention tier may be open-ended: '{spec}'")
+    if ages != sorted(set(ages)):
+        raise ValueError(f"Retention tier ages must increase: '{spec}'")
+    return tiers
+
+
+def backup_path(path: str) -> str:
+    """Where the history is copied before its first rollup"""
+    return os.path.splitext(path)[0] + '.pre-retention.json'
+
+
+def _tier_for(age: timedelta, tiers: List[Tuple[str, Optional[int]]]) -> str:
+    for kind, max_age in tiers:
+        if max_age is None or age < timedelta(days=max_age):
+            return kind
+    return tiers[-1][0]
+
+
+def _bucket(kind: str, when: datetime) -> Tuple:
+    if kind == "day":
+        return (kind, when.date())
+    year, week, _ = when.isocalendar()
+    return (kind, year, week)
+
+
+def _as_rollup(record: Dict) -> Dict:
+    """The rollup of one record (a raw check is a rollup of itself)"""
+    if "rollup" in record:
+        return record["rollup"]
+    return {
+        "start": record["timestamp"],
+        "end": record["timestamp"],
+        "checks": 1,
+        "categories": {
+            category: {"open": price, "high": price, "low": price, "close": price,
+                       "sum": price, "count": 1}
+            for category, price in record["prices"].items() if price is not None
+        },
+    }
+
+
+def rollup(records: List[Dict], period: str) -> Dict:
+    """One record summarising records (raw checks or rollups, oldest first)"""
+    categories = {}
+    for part in map(_as_rollup, records):
+        for category, ohlc in part["categories"].items():
+            entry = categories.get(category)
+            if entry is None:
+                categories[category] = dict(ohlc)
+                continue
+            entry["high"] = max(entry["high"], ohlc["high"])
+            entry["low"] = min(entry["low"], ohlc["low"])
+            entry["close"] = ohlc["close"]
+            entry["sum"] += ohlc["sum"]
+            entry["count"] += ohlc["count"]
+    lows = [record["lowest_price"] for record in records if record.get("lowest_price")]
+    record = {
+        "timestamp": records[-1]["timestamp"],
+        "prices": {category: entry["close"] for category, entry in categories.items()},
+        "rollup": {
+            "period": period,
+            "start": _as_rollup(records[0])["start"],
+            "end": records[-1]["timestamp"],
+            "checks": sum(_as_rollup(r)["checks"] for r in records),
+            "categories": categories,
+        },
+    }
+    if lows:
+        record["lowest_price"] = dict(min(lows, key=lambda low: low["price"]))
+    return record
+
+
+def apply_tiers(records: List[Dict], tiers: List[Tuple[str, Optional[int]]],
+                now: Optional[datetime] = None) -> List[Dict]:
+    """records with everything past the full tier rolled up per day/week.
+
+    Returns records itself when nothing changes, including when a
+    timestamp cannot be parsed (histories converted from older formats).
+    """
+    if not tiers or not records:
+        return records
+    now = now or datetime.now()
+    try:
+        stamps = [datetime.fromisoformat(record["timestamp"]) for record in records]
+    except (KeyError, TypeError, ValueError):
+        return records
+
+    kept = []
+    groups = {}
+    for record, when in sorted(zip(records, stamps), key=lambda pair: pair[1]):
+        kind = _tier_for(now - when, tiers)
+        if kind == "full":
+            kept.append(record)
+        else:
+            # A rollup is bucketed by the period it started in
+            start = datetime.fromisoformat(_as_rollup(record)["start"])
+            groups.setdefault(_bucket(kind, start), []).append(record)
+
+    rolled = []
+    for key, group in groups.items():
+        period = key[0]
+        if len(group) == 1 and group[0].get("rollup", {}).get("period") == period:
+            rolled.append(group[0])
+        else:
+            rolled.append(rollup(group, period))
+    result = sorted(rolled, key=lambda r: r["timestamp"]) + kept
+    return records if result == records else result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up old price history into daily/weekly records")
+    parser.add_argument("--tiers", default=None, help="Retention tiers (default: PRICE_RETENTION)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without saving")
+    args = parser.parse_args()
+
+    from booking_tracker import BookingTracker
+
+    tracker = BookingTracker.from_config()
+    removed = tracker.apply_retention(args.tiers, save=not args.dry_run)
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {removed} price record(s)")
+
+
+if __name__ == "__main__":
+    main()
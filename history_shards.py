@@ -0,0 +1,131 @@
+# history_shards.py
+#
+# Sharded layout for price_history.json (HISTORY_LAYOUT=sharded). The file
+# itself becomes a small index with every booking's metadata, holding
+# price and price_stats but no price_history; each booking's history lives
+# in its own shard next to it:
+#   price_history.json                       index
+#   price_history.history/<booking_id>.json  one booking's records
+# Shards use HISTORY_FORMAT like the single-file layout (history_codec).
+#
+# Bookings load as LazyBooking dicts that read their shard the first time
+# price_history is touched, so opening the tracker costs the index plus
+# the shards of bookings a caller actually works on. Tools that read the
+# raw file (delete_booking_cli.py) see the index, which has every field
+# they use.
+
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from history_codec import decode, encode, is_encoded
+from price_stats import current_stats
+
+
+def shard_dir(history_file: str) -> str:
+    return os.path.splitext(history_file)[0] + '.history'
+
+
+def shard_path(history_file: str, booking_id: str) -> str:
+    safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', booking_id)
+    return os.path.join(shard_dir(history_file), f"{safe_id}.json")
+
+
+def read_shard(path: str) -> List[Dict]:
+    """A booking's price_history from its shard ([] when there is none yet)"""
+    try:
+        with open(path, 'r') as f:
+            history = json.load(f)
+    except FileNotFoundError:
+        return []
+    return decode(history) if is_encoded(history) else history
+
+
+def shard_data(history: List[Dict], history_format: str):
+    """What goes into a shard file for history"""
+    if history_format == "columnar" and history:
+        return encode(history) or history
+    return history
+
+
+class LazyBooking(dict):
+    """Booking dict whose price_history is read from its shard on first use.
+
+    booking["price_history"], booking.get("price_history") and
+    "price_history" in booking all load it; iterating items() before
+    that does not include it.
+    """
+
+    def __init__(self, fields: Dict, loader):
+        super().__init__(fields)
+        self._loader = loader
+
+    @property
+    def history_loaded(self) -> bool:
+        return dict.__contains__(self, "price_history")
+
+    def __missing__(self, key):
+        if key != "price_history":
+            raise KeyError(key)
+        history = self._loader()
+        dict.__setitem__(self, "price_history", history)
+        return history
+
+    def get(self, key, default=None):
+        if key == "price_history":
+            return self["price_history"]
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return key == "price_history" or dict.__contains__(self, key)
+
+
+def history_loaded(booking: Dict) -> bool:
+    """False for a LazyBooking whose shard has not been read yet"""
+    return not isinstance(booking, LazyBooking) or booking.history_loaded
+
+
+def lazy_bookings(history_file: str, bookings: Dict) -> Dict:
+    """Wrap the index's bookings so each loads its shard on demand.
+
+    Bookings that still carry an embedded price_history (a single-file
+    history opened with the sharded layout) keep it and never read a shard.
+    """
+    return {
+        booking_id: LazyBooking(booking, lambda path=shard_path(history_file, booking_id): read_shard(path))
+        for booking_id, booking in bookings.items()
+    }
+
+
+def save_sharded(history_file: str, data: Dict, dirty: set, deleted: set,
+                 history_format: str, write_json):
+    """Write shards for the dirty bookings, delete removed ones, then the index.
+
+    write_json(path, data, indent) does the atomic write. Shards go first,
+    so the index never names history that is not on disk yet.
+    """
+    os.makedirs(shard_dir(history_file), exist_ok=True)
+    index = dict(data, bookings={})
+    for booking_id, booking in data["bookings"].items():
+        if booking_id in dirty and history_loaded(booking):
+            # The index keeps the aggregates so trends need no shard
+            current_stats(booking)
+            write_json(shard_path(history_file, booking_id),
+                       shard_data(dict.get(booking, "price_history", []), history_format),
+                       None)
+        index["bookings"][booking_id] = {
+            key: value for key, value in dict.items(booking) if key != "price_history"
+        }
+    for booking_id in deleted:
+        if booking_id not in data["bookings"]:
+            try:
+                os.remove(shard_path(history_file, booking_id))
+            except FileNotFoundError:
+                pass
+    index["metadata"] = dict(data["metadata"], layout="sharded")
+    write_json(history_file, index, 2)
+
+
+def is_sharded(data: Optional[Dict]) -> bool:
+    return bool(data) and data.get("metadata", {}).get("layout") == "sharded"
@@ -0,0 +1,167 @@
+# http_fast_path.py
+#
+# Browserless price checks. A browser search that yields parseable prices
+# saves its rentalCarSearch request (URL, method, headers, body) as a
+# template. Later bookings replay that request through the context's
+# APIRequestContext, which shares the browser's cookie jar, with the
+# booking's location/dates/times swapped into the body, and parse the
+# response directly. Anything unexpected, including a response without
+# the booking's focus category, returns no prices so the caller falls back
+# to the normal browser flow, which also refreshes the template.
+
+import json
+import re
+import threading
+from datetime import datetime
+from urllib.parse import quote, quote_plus
+
+from booking_tracker import atomic_write_json
+from config import HTTP_FAST_PATH, SEARCH_TEMPLATE_FILE
+
+TEMPLATE_FIELDS = ("location", "pickup_date", "dropoff_date", "pickup_time", "dropoff_time")
+
+# Hop-by-hop and browser-managed headers; the request context fills these in
+SKIP_HEADERS = {"content-length", "host", "cookie", "connection", "accept-encoding"}
+
+FAST_PATH_TIMEOUT = 30000
+
+# Sync workers are threads and atomic_write_json stages through one .tmp
+_template_lock = threading.Lock()
+
+
+def fast_path_enabled():
+    return HTTP_FAST_PATH
+
+
+def save_template(request, booking, path=None):
+    """Store the rentalCarSearch request captured for booking."""
+    if not request or not request.get("url"):
+        return
+    path = path or SEARCH_TEMPLATE_FILE
+    template = {
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "url": request["url"],
+        "method": request.get("method", "POST"),
+        "headers": {
+            name: value for name, value in (request.get("headers") or {}).items()
+            if name.lower() not in SKIP_HEADERS and not name.startswith(":")
+        },
+        "post_data": request.get("post_data"),
+        "booking": {field: booking.get(field) for field in TEMPLATE_FIELDS},
+    }
+    with _template_lock:
+        atomic_write_json(path, template)
+
+
+def load_template(path=None):
+    try:
+        with open(path or SEARCH_TEMPLATE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _encodings(value):
+    """The raw, percent-encoded and form-encoded spellings of a value."""
+    return {
+        "raw": value,
+        "quote": quote(value, safe=""),
+        "quote_plus": quote_plus(value, safe=""),
+    }
+
+
+def build_request(template, booking):
+    """Return (url, method, headers, post_data) for booking, or None if the
+    template cannot be adapted safely (a field not found, or one template
+    value that would have to become two different values)."""
+    replacements = {}
+    url, post_data = template["url"], template.get("post_data") or ""
+    for field in TEMPLATE_FIELDS:
+        old, new = template["booking"].get(field), booking.get(field)
+        if not old or not new:
+            return None
+        old_forms, new_forms = _encodings(old), _encodings(new)
+        found = False
+        for encoding, old_form in old_forms.items():
+            pattern = re.compile(r"(?<![A-Za-z0-9])" + re.escape(old_form) + r"(?![A-Za-z0-9])")
+            if pattern.search(post_data) or pattern.search(url):
+                found = True
+                if replacements.get(old_form, new_forms[encoding]) != new_forms[encoding]:
+                    return None
+                replacements[old_form] = new_forms[encoding]
+        if not found:
+            return None
+
+    # One pass, so a new value that equals another field's old value is not
+    # replaced a second time
+    pattern = re.compile(
+        r"(?<![A-Za-z0-9])("
+        + "|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True))
+        + r")(?![A-Za-z0-9])"
+    )
+
+    def substitute(text):
+        return pattern.sub(lambda match: replacements[match.group(1)], text)
+
+    return substitute(url), template["method"], dict(template["headers"]), substitute(post_data) or None
+
+
+def _validated_prices(status, body, focus_category=None):
+    from price_extractor import parse_search_response
+
+    if status != 200:
+        return {}
+    prices = parse_search_response(body)
+    if not prices or any(price <= 0 for price in prices.values()):
+        return {}
+    if focus_category and focus_category not in prices:
+        return {}
+    return prices
+
+
+def fetch_prices(request_context, booking, template=None):
+    """Replay the search for booking via a sync APIRequestContext.
+
+    Returns {category: price}, or {} when the fast path cannot be trusted.
+    """
+    template = template or load_template()
+    spec = build_request(template, booking) if template else None
+    if spec is None:
+        return {}
+    url, method, headers, data = spec
+    try:
+        response = request_context.fetch(
+            url, method=method, headers=headers, data=data, timeout=FAST_PATH_TIMEOUT
+        )
+        prices = _validated_prices(response.status, response.text(), booking.get("focus_category"))
+    except Exception as e:
+        print(f"HTTP fast path failed: {str(e)}")
+        return {}
+    _report(booking, prices)
+    return prices
+
+
+async def fetch_prices_async(request_context, booking, template=None):
+    """fetch_prices() for an async_api APIRequestContext."""
+    template = template or load_template()
+    spec = build_request(template, booking) if template else None
+    if spec is None:
+        return {}
+    url, method, headers, data = spec
+    try:
+        response = await request_context.fetch(
+            url, method=method, headers=headers, data=data, timeout=FAST_PATH_TIMEOUT
+        )
+        prices = _validated_prices(response.status, await response.text(), booking.get("focus_category"))
+    except Exception as e:
+        print(f"HTTP fast path failed: {str(e)}")
+        return {}
+    _report(booking, prices)
+    return prices
+
+
+def _report(booking, prices):
+    if prices:
+        print(f"\nPrices for {booking['location']} read via HTTP fast path ({len(prices)} categories)")
+    else:
+        print(f"\nHTTP fast path gave no valid prices for {booking['location']}; using the browser")
@@ -3,8 +3,10 @@
 import argparse
 import os
 from booking_tracker import BookingTracker
+from category_cache import CategoryCache
 from price_monitor import (
     setup_browser,
+    close_browser,
     enter_location,
     enter_date,
     set_times,
@@ -41,28 +43,34 @@ def get_new_booking_info(page):
         except ValueError:
             print("❌ Invalid date format. Please use MM/DD/YYYY format.")
 
-    print(f"\nFetching available categories for {location}...")
+    category_cache = CategoryCache()
     try:
-        page.goto("https://www.costcotravel.com/Rental-Cars")
-        page.wait_for_timeout(2000)
-
-        if not fill_search_form(page, {
-            "location": location,
-            "pickup_date": pickup_date,
-            "dropoff_date": dropoff_date,
-            "pickup_time": "12:00 PM",
-            "dropoff_time": "12:00 PM",
-        }):
-            raise Exception("Failed to fill search form")
-
-        current_url = page.url
-        click_search(page)
-        if not wait_for_results(page, current_url):
-            raise Exception("Failed to load results")
-
-        available_categories = sorted(get_available_categories(page))
-        if not available_categories:
-            raise Exception("No categories found")
+        available_categories = category_cache.get(location)
+        if available_categories:
+            print(f"\nUsing categories seen at {location} in recent searches")
+        else:
+            print(f"\nFetching available categories for {location}...")
+            page.goto("https://www.costcotravel.com/Rental-Cars")
+            page.wait_for_timeout(2000)
+
+            if not fill_search_form(page, {
+                "location": location,
+                "pickup_date": pickup_date,
+                "dropoff_date": dropoff_date,
+                "pickup_time": "12:00 PM",
+                "dropoff_time": "12:00 PM",
+            }):
+                raise Exception("Failed to fill search form")
+
+            current_url = page.url
+            click_search(page)
+            if not wait_for_results(page, current_url):
+                raise Exception("Failed to load results")
+
+            available_categories = sorted(get_available_categories(page))
+            if not available_categories:
+                raise Exception("No categories found")
+            category_cache.update(location, available_categories)
 
         print("\n📋 Available categories:")
         for i, cat in enumerate(available_categories, 1):
@@ -109,12 +117,12 @@ def get_new_booking_info(page):
     }
 
 
-def interactive_mode():
+def interactive_mode(workers=None, engine=None):
     """Run the price checker in interactive mode with user input."""
     print("\n🚗 Costco Travel Car Rental Price Tracker")
     print("=" * 50)
 
-    tracker = BookingTracker()
+    tracker = BookingTracker.from_config()
     active_bookings = tracker.get_active_bookings()
 
     if not active_bookings:
@@ -146,8 +154,7 @@ def interactive_mode():
             else:
                 print("\n❌ Failed to add booking: Invalid category for location")
         finally:
-            browser.close()
-            playwright.stop()
+            close_browser(playwright, browser, context)
     elif choice == "3":
         try:
             booking_id = tracker.get_booking_choice()
@@ -164,16 +171,16 @@ def interactive_mode():
         return
 
     if active_bookings:
-        run_price_checks(tracker, active_bookings)
+        run_price_checks(tracker, active_bookings, workers=workers, engine=engine)
 
 
-def automated_mode():
+def automated_mode(workers=None, engine=None):
     """Run the price checker in automated mode without user interaction."""
     import sys
     print("\n🤖 Running in automated mode")
     print("=" * 50)
 
-    tracker = BookingTracker()
+    tracker = BookingTracker.from_config()
     active_bookings = tracker.get_active_bookings()
 
     if not active_bookings:
@@ -181,32 +188,67 @@ def automated_mode():
         return
 
     print(f"📋 Found {len(active_bookings)} active bookings")
-    success = run_price_checks(tracker, active_bookings)
+    success = run_price_checks(tracker, active_bookings, workers=workers, engine=engine)
     if not success:
         print("\n❌ Price check failed — no prices obtained for any booking")
         sys.exit(1)
 
 
+def sweep_mode(number=0, days=None, workers=None, engine=None):
+    """Run a flexible-date sweep for one active booking (1-based number)
+    or for all of them when number is 0."""
+    from date_sweep import sweep_booking
+    from price_monitor import _is_expired
+
+    tracker = BookingTracker.from_config()
+    active_bookings = [b for b in tracker.get_active_bookings() if not _is_expired(b)]
+    if not active_bookings:
+        print("📢 No active bookings found.")
+        return
+    if number:
+        if not 1 <= number <= len(active_bookings):
+            print(f"❌ Please choose a booking between 1 and {len(active_bookings)}")
+            return
+        active_bookings = [active_bookings[number - 1]]
+
+    try:
+        for booking in active_bookings:
+            sweep_booking(tracker, booking, days=days, workers=workers, engine=engine)
+    finally:
+        tracker.compact()
+
+
 def main():
     """Main function that handles command line arguments and execution mode."""
     try:
         parser = argparse.ArgumentParser(description="Costco Travel Car Rental Price Tracker")
         parser.add_argument("-i", "--interactive", action="store_true",
                             help="Run in interactive mode")
+        parser.add_argument("-w", "--workers", type=int, default=None,
+                            help="Number of parallel browser contexts (default: SCRAPE_WORKERS)")
+        parser.add_argument("--engine", choices=["sync", "async"], default=None,
+                            help="Scraping engine (default: SCRAPE_ENGINE)")
+        parser.add_argument("--sweep", type=int, nargs="?", const=0, default=None, metavar="N",
+                            help="Price nearby dates/times for active booking N (default: all)")
+        parser.add_argument("--sweep-days", type=int, default=None,
+                            help="Days to shift pickup/dropoff each way in a sweep (default: SWEEP_DAYS)")
         args = parser.parse_args()
 
         is_ci = os.environ.get("CI") == "true"
 
-        if args.interactive:
+        if args.sweep is not None:
+            print("\n📅 Running flexible-date sweep...")
+            sweep_mode(args.sweep, days=args.sweep_days, workers=args.workers, engine=args.engine)
+        elif args.interactive:
             print("\n🔄 Running in interactive mode...")
-            interactive_mode()
+            interactive_mode(workers=args.workers, engine=args.engine)
         elif is_ci:
             print("\n🤖 Running in CI automated mode...")
-            automated_mode()
+            automated_mode(workers=args.workers, engine=args.engine)
         else:
             print("\n🤖 Running in automated mode...")
             print("Tip: Use -i or --interactive flag for interactive mode")
-            automated_mode()
+            automated_mode(workers=args.workers, engine=args.engine)
 
     except KeyboardInterrupt:
         print("\n\n⚠️ Process interrupted by user")
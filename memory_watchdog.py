@@ -0,0 +1,158 @@
+# memory_watchdog.py
+#
+# Chrome's memory grows with every SPA search a page runs, so long price
+# check runs slow down and sometimes crash near the end. Between bookings
+# each worker samples its browser and asks the watchdog whether to recycle:
+#   - after MEMORY_RECYCLE_SEARCHES searches on the same context
+#   - when the page's JS heap exceeds MEMORY_MAX_HEAP_MB
+#   - when the browser's processes (browser + renderers + GPU ...) exceed
+#     MEMORY_MAX_RSS_MB resident
+# Recycling swaps in a fresh context (price_monitor.recycle_context) with
+# the old cookies/localStorage, so the run keeps its session and progress.
+#
+# JS heap comes from CDP Performance.getMetrics on the page. RSS comes from
+# CDP SystemInfo.getProcessInfo, which lists the browser's process ids, and
+# /proc/<pid>/status, so it is Linux-only and needs the browser on this
+# machine. Either sample is None when it cannot be taken, and a None sample
+# never triggers a recycle.
+
+from config import MEMORY_MAX_HEAP_MB, MEMORY_MAX_RSS_MB, MEMORY_RECYCLE_SEARCHES
+
+MB = 1024 * 1024
+
+
+def process_rss_mb(pid):
+    """Resident memory of one process in MB, or None if it cannot be read."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def rss_by_type(process_info):
+    """Sum RSS per Chrome process type from a SystemInfo.getProcessInfo result.
+
+    Returns {"browser": MB, "renderer": MB, ...}, or None when no process
+    could be read (not Linux, or the browser runs on another machine).
+    """
+    totals = {}
+    for process in process_info.get("processInfo", []):
+        rss = process_rss_mb(process.get("id"))
+        if rss is None:
+            continue
+        kind = process.get("type", "other")
+        totals[kind] = totals.get(kind, 0.0) + rss
+    return totals or None
+
+
+def heap_mb(metrics):
+    """JSHeapUsedSize in MB from a Performance.getMetrics result, or None."""
+    for metric in metrics.get("metrics", []):
+        if metric.get("name") == "JSHeapUsedSize":
+            return metric["value"] / MB
+    return None
+
+
+def sample_memory(browser, context, page):
+    """Return {"heap_mb": float|None, "rss_mb": {type: MB}|None} for a sync page."""
+    sample = {"heap_mb": None, "rss_mb": None}
+    try:
+        cdp = context.new_cdp_session(page)
+        try:
+            cdp.send("Performance.enable")
+            sample["heap_mb"] = heap_mb(cdp.send("Performance.getMetrics"))
+        finally:
+            cdp.detach()
+    except Exception:
+        pass
+    if browser is not None:
+        try:
+            cdp = browser.new_browser_cdp_session()
+            try:
+                sample["rss_mb"] = rss_by_type(cdp.send("SystemInfo.getProcessInfo"))
+            finally:
+                cdp.detach()
+        except Exception:
+            pass
+    return sample
+
+
+async def sample_memory_async(browser, context, page):
+    """sample_memory() for async_api objects."""
+    sample = {"heap_mb": None, "rss_mb": None}
+    try:
+        cdp = await context.new_cdp_session(page)
+        try:
+            await cdp.send("Performance.enable")
+            sample["heap_mb"] = heap_mb(await cdp.send("Performance.getMetrics"))
+        finally:
+            await cdp.detach()
+    except Exception:
+        pass
+    if browser is not None:
+        try:
+            cdp = await browser.new_browser_cdp_session()
+            try:
+                sample["rss_mb"] = rss_by_type(await cdp.send("SystemInfo.getProcessInfo"))
+            finally:
+                await cdp.detach()
+        except Exception:
+            pass
+    return sample
+
+
+class MemoryWatchdog:
+    """Decides when a worker should recycle its context. One per worker."""
+
+    def __init__(self, max_searches=None, max_heap_mb=None, max_rss_mb=None):
+        self.max_searches = MEMORY_RECYCLE_SEARCHES if max_searches is None else max_searches
+        self.max_heap_mb = MEMORY_MAX_HEAP_MB if max_heap_mb is None else max_heap_mb
+        self.max_rss_mb = MEMORY_MAX_RSS_MB if max_rss_mb is None else max_rss_mb
+        self.searches = 0
+        self.recycles = 0
+        self.peak_heap_mb = 0.0
+        self.peak_rss_mb = 0.0
+
+    @property
+    def samples_memory(self):
+        """False when both memory limits are off, so sampling can be skipped."""
+        return self.max_heap_mb > 0 or self.max_rss_mb > 0
+
+    def check(self, sample=None):
+        """Count one search and return why to recycle now, or None.
+
+        sample is a sample_memory() result (None when not sampled).
+        """
+        self.searches += 1
+        sample = sample or {}
+        heap = sample.get("heap_mb")
+        rss = sum(sample["rss_mb"].values()) if sample.get("rss_mb") else None
+        if heap is not None:
+            self.peak_heap_mb = max(self.peak_heap_mb, heap)
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+        if self.max_searches > 0 and self.searches >= self.max_searches:
+            return f"{self.searches} searches on this context"
+        if self.max_heap_mb > 0 and heap is not None and heap > self.max_heap_mb:
+            return f"JS heap {heap:.0f} MB > {self.max_heap_mb:.0f} MB"
+        if self.max_rss_mb > 0 and rss is not None and rss > self.max_rss_mb:
+            return f"browser RSS {rss:.0f} MB > {self.max_rss_mb:.0f} MB"
+        return None
+
+    def recycled(self):
+        """Reset the search count after the worker swapped in a fresh context."""
+        self.searches = 0
+        self.recycles += 1
+
+    def stats(self):
+        """Figures merged into the worker's timing stats."""
+        return {
+            "recycles": self.recycles,
+            "peak_heap_mb": self.peak_heap_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+        }
@@ -0,0 +1,96 @@
+# page_steps.py
+#
+# Lets the sync (price_monitor.py) and async (async_price_monitor.py)
+# engines share one implementation of every page flow. A flow is a
+# generator that yields each Playwright call it makes and is sent back
+# the result:
+#
+#     value = yield locator.input_value()
+#
+# On the sync API the call has already run, so drive() sends the value
+# straight back; on the async API it is a coroutine that drive_async()
+# awaits. An exception is thrown back into the flow at the same yield, so
+# flows use plain try/except. The two things that differ by more than an
+# await are yielded as ops: Sleep (time.sleep / asyncio.sleep) and
+# ExpectResponse (with / async with page.expect_response).
+#
+# Selectors, timings and decisions live in the flows; each engine keeps
+# wrappers that are only drive(flow) or await drive_async(flow).
+
+import asyncio
+import inspect
+import time
+
+
+class Sleep:
+    """Pause without a page (when the page itself may be unusable)."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+
+class ExpectResponse:
+    """Run flow inside page.expect_response(predicate, timeout=timeout).
+
+    The flow is sent back the event info; yield its .value for the response.
+    """
+
+    def __init__(self, page, predicate, timeout, flow):
+        self.page = page
+        self.predicate = predicate
+        self.timeout = timeout
+        self.flow = flow
+
+
+def _advance(flow, value, error):
+    """Resume flow. Returns (True, result) once it returns, else (False, op)."""
+    try:
+        if error is not None:
+            return False, flow.throw(error)
+        return False, flow.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+def drive(flow):
+    """Run a flow against the sync API and return its result."""
+    value = error = None
+    while True:
+        done, op = _advance(flow, value, error)
+        if done:
+            return op
+        value = error = None
+        try:
+            if isinstance(op, Sleep):
+                time.sleep(op.seconds)
+            elif isinstance(op, ExpectResponse):
+                with op.page.expect_response(op.predicate, timeout=op.timeout) as info:
+                    drive(op.flow)
+                value = info
+            else:
+                value = op
+        except BaseException as e:
+            error = e
+
+
+async def drive_async(flow):
+    """Run a flow against the async API and return its result."""
+    value = error = None
+    while True:
+        done, op = _advance(flow, value, error)
+        if done:
+            return op
+        value = error = None
+        try:
+            if isinstance(op, Sleep):
+                await asyncio.sleep(op.seconds)
+            elif isinstance(op, ExpectResponse):
+                async with op.page.expect_response(op.predicate, timeout=op.timeout) as info:
+                    await drive_async(op.flow)
+                value = info
+            elif inspect.isawaitable(op):
+                value = await op
+            else:
+                value = op
+        except BaseException as e:
+            error = e
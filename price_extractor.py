@@ -1,8 +1,68 @@
 # price_extractor.py
+#
+# Prices come from the Costco Travel results markup: one div[role="row"]
+# per category, named by div.inner.text-center.h3-tag-style, whose
+# a.card.car-result-card.lowest-price card carries the price in
+# data-price. The rendered page (extract_lowest_prices) and the body of
+# the rentalCarSearch.act response (parse_search_response) are read with
+# exactly these selectors; any other body yields no prices and the caller
+# reads the rendered page instead.
 
 from datetime import datetime
+from bs4 import BeautifulSoup
 from config import PRICES_FILE, PICKUP_LOCATION, PICKUP_DATE, DROPOFF_DATE
 
+# Reads every results row in one round-trip: category name, lowest price
+# (data-price of the card flagged lowest-price) and how many cards it has.
+RESULT_ROWS_JS = """() => Array.from(document.querySelectorAll('div[role="row"]')).map(row => {
+    const name = row.querySelector('div.inner.text-center.h3-tag-style');
+    const lowest = row.querySelector('a.card.car-result-card.lowest-price');
+    return {
+        category: name ? name.textContent : null,
+        lowest_price: lowest ? lowest.getAttribute('data-price') : null,
+        card_count: row.querySelectorAll('a.card.car-result-card').length,
+    };
+})"""
+
+
+def summarize_result_rows(raw_rows):
+    """Normalize RESULT_ROWS_JS output.
+
+    Returns a list of {"category": str, "lowest_price": float or None,
+    "card_count": int}; rows without a category name are dropped.
+    """
+    rows = []
+    for raw in raw_rows or []:
+        category = (raw.get("category") or "").strip()
+        if not category:
+            continue
+        try:
+            lowest_price = float(raw.get("lowest_price"))
+        except (TypeError, ValueError):
+            lowest_price = None
+        rows.append({
+            "category": category,
+            "lowest_price": lowest_price,
+            "card_count": int(raw.get("card_count") or 0),
+        })
+    return rows
+
+
+def scan_result_rows(page):
+    """Read all result rows from the page with a single page.evaluate call."""
+    return summarize_result_rows(page.evaluate(RESULT_ROWS_JS))
+
+
+def prices_from_rows(rows):
+    """Build {category_name: float_price} from scan_result_rows output."""
+    lowest_prices = {}
+    for row in rows:
+        if row["lowest_price"] is None:
+            continue
+        lowest_prices[row["category"]] = row["lowest_price"]
+        print(f"Found {row['category']}: ${row['lowest_price']} ({row['card_count']} cars)")
+    return lowest_prices
+
 
 def extract_lowest_prices(page):
     """Extract lowest prices for each car category from the Costco Travel results page.
@@ -14,31 +74,63 @@ def extract_lowest_prices(page):
         dict: {category_name: float_price} for each category found.
     """
     print("\nExtracting lowest prices...")
-    lowest_prices = {}
+    lowest_prices = prices_from_rows(scan_result_rows(page))
+    save_prices_to_file(lowest_prices)
+    return lowest_prices
 
-    category_rows = page.locator('div[role="row"]').all()
 
-    for row in category_rows:
+def _parse_results_html(html):
+    """Read {category: lowest price} from a results HTML fragment.
+
+    Uses the same selectors as extract_lowest_prices so the payload and the
+    rendered page agree on what a category row is.
+    """
+    prices = {}
+    soup = BeautifulSoup(html, "html.parser")
+    for row in soup.select('div[role="row"]'):
+        name = row.select_one("div.inner.text-center.h3-tag-style")
+        card = row.select_one("a.card.car-result-card.lowest-price")
+        if name is None or card is None:
+            continue
         try:
-            category_name = row.locator(
-                "div.inner.text-center.h3-tag-style"
-            ).text_content()
-            if not category_name:
-                continue
-            category_name = category_name.strip()
+            price = float(card.get("data-price"))
+        except (TypeError, ValueError):
+            continue
+        category = name.get_text().strip()
+        if category:
+            prices[category] = price
+    return prices
 
-            price_str = row.locator(
-                "a.card.car-result-card.lowest-price"
-            ).get_attribute("data-price")
 
-            lowest_prices[category_name] = float(price_str)
-            print(f"Found {category_name}: ${price_str}")
+def parse_search_response(body):
+    """Build {category_name: float_price} from a rentalCarSearch response body.
 
-        except Exception:
-            continue
+    The body is the results fragment the page renders, so it is read with
+    the same selectors as the DOM. Anything else (JSON, error pages, an
+    empty body) returns an empty dict, so callers fall back to reading the
+    rendered DOM.
+    """
+    if not isinstance(body, str) or not body.strip():
+        return {}
+    return _parse_results_html(body)
 
-    save_prices_to_file(lowest_prices)
-    return lowest_prices
+
+def extract_prices_from_response(body, focus_category=None):
+    """Parse prices from an intercepted search response and log them like the DOM path.
+
+    A response without a price for focus_category is not trusted: it
+    returns {} so the caller waits for the rendered results instead.
+    """
+    prices = parse_search_response(body)
+    if prices and focus_category and focus_category not in prices:
+        print(f"\nrentalCarSearch response has no {focus_category} price, reading the results page")
+        return {}
+    if prices:
+        print(f"\nParsed {len(prices)} categories from rentalCarSearch response")
+        for category, price in prices.items():
+            print(f"Found {category}: ${price}")
+        save_prices_to_file(prices)
+    return prices
 
 
 def save_prices_to_file(prices):
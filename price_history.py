@@ -5,6 +5,8 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from price_stats import add_record, category_trend, current_stats
+
 class PriceHistory:
     def __init__(self, history_file: str = "price_history.json"):
         self.history_file = history_file
@@ -33,7 +35,9 @@ class PriceHistory:
             }
             if 'price_records' not in booking:
                 booking['price_records'] = []
+            stats = current_stats(booking, 'price_records')
             booking['price_records'].append(price_record)
+            add_record(stats, price_record['prices'])
             
             # Add to price history with the focus category price
             if focus_category in prices:
@@ -69,47 +73,21 @@ class PriceHistory:
                 raise ValueError(f"Booking {booking_id} not found")
             
             booking = self.history[booking_id]
-            records = booking.get('price_records', [])
-            price_history = booking.get('price_history', [])
-            
-            print(f"\nGetting price trends for booking {booking_id}")
-            print(f"Number of price records: {len(records)}")
-            print(f"Number of price history records: {len(price_history)}")
-            
-            if not records:
+            if not booking.get('price_records'):
                 return {}
             
-            focus_category = booking['focus_category']
-            latest_prices = records[-1]['prices']
-            holding_price = booking.get('holding_price')
-            
-            # Get previous price if available
-            previous_price = None
-            if len(records) > 1:
-                previous_prices = records[-2]['prices']
-                previous_price = previous_prices.get(focus_category)
-            
-            # Calculate statistics for focus category
-            focus_prices = [record['prices'].get(focus_category) for record in records 
-                          if focus_category in record['prices']]
-            
-            trends = {
-                "focus_category": {
-                    "current": latest_prices.get(focus_category),
-                    "previous_price": previous_price,
-                    "holding_price": holding_price,
-                    "lowest": min(focus_prices) if focus_prices else None,
-                    "highest": max(focus_prices) if focus_prices else None,
-                    "average": sum(focus_prices) / len(focus_prices) if focus_prices else None,
-                    "total_checks": len(focus_prices),
-                    "price_history": price_history
-                }
+            # Running aggregates instead of a pass over every record
+            trend = category_trend(current_stats(booking, 'price_records'), booking['focus_category']) or {
+                "current": None,
+                "previous_price": None,
+                "lowest": None,
+                "highest": None,
+                "average": None,
+                "total_checks": 0
             }
-            
-            print("\nGenerated trends:")
-            print(json.dumps(trends, indent=2))
-            
-            return trends
+            trend["holding_price"] = booking.get('holding_price')
+            trend["price_history"] = booking.get('price_history', [])
+            return {"focus_category": trend}
             
         except Exception as e:
             print(f"Error getting price trends: {str(e)}")
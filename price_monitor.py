@@ -2,15 +2,53 @@
 #
 # Playwright-based browser automation for Costco Travel scraping.
 # Replaces the old Selenium driver_setup.py + human_simulation.py.
+#
+# Page flows are written once as *_steps generators (see page_steps.py)
+# and shared with async_price_monitor.py; the plain-named functions here
+# drive them on the sync API.
 
+import queue
 import random
-import re
+import sys
+import threading
 import time
 import traceback
 import os
 from datetime import datetime
 from playwright.sync_api import sync_playwright
 
+from booking_tracker import make_booking_id
+from browser_host import attach_allowed, find_endpoint
+from category_cache import CategoryCache
+from config import (
+    FAST_BOOKING_GAP_MS,
+    FAST_WAIT_TIMEOUT,
+    HAR_MODE,
+    PACING_MODE,
+    RESULTS_QUIET_MS,
+    RESULTS_STABLE_CEILING,
+    RETRY_ATTEMPTS,
+    SCRAPE_ENGINE,
+    SCRAPE_WORKERS,
+    SEARCH_TIMEOUT,
+)
+from har_harness import attach_har, replay_tracker, save_dom_fixture
+from http_fast_path import fast_path_enabled, fetch_prices, save_template
+from page_steps import ExpectResponse, Sleep, drive
+from retry import (
+    BlockedError,
+    ExtractionError,
+    FormError,
+    NavigationError,
+    ResultsTimeoutError,
+    RetryScheduler,
+    backoff_delay,
+    error_kind,
+    is_retryable,
+)
+from screenshots import default_screenshotter
+from timing import RunTimer, timed
+
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -21,8 +59,122 @@ WEBDRIVER_STEALTH_SCRIPT = (
     "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
 )
 
+RENTAL_CARS_URL = "https://www.costcotravel.com/Rental-Cars"
+
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-infobars",
+    "--window-size=1920,1080",
+]
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+# The `api` this module passes to the shared flows (see the bindings at the end)
+_API = sys.modules[__name__]
+
+
+# Pacing modes: "human" keeps the randomized think-time between actions;
+# "fast" replaces it with waits on the page state each step depends on.
+PACING_MODES = ("human", "fast")
+
+AUTOCOMPLETE_SELECTOR = ".ui-autocomplete li, [role='listbox'] [role='option']"
+
+HIDDEN_LOCATION_SET_JS = """() => {
+    const el = document.querySelector('#pickupLocationWidget');
+    return !el || el.value !== '';
+}"""
+
+INPUT_VALUE_IS_JS = "([id, value]) => document.getElementById(id)?.value === value"
+
+CHECKBOX_CHECKED_JS = "() => document.querySelector('#driversAgeWidget')?.checked === true"
+
+RESULT_CARD_SELECTOR = "a.card.car-result-card"
+
+# Resolves once the result cards have stopped changing for quietMs (no card
+# added/removed and no mutation inside a card), or after ceilingMs at most.
+# Runs in the page so the whole wait is a single round trip.
+RESULTS_STABLE_JS = """([selector, quietMs, ceilingMs]) => new Promise(resolve => {
+    const started = performance.now();
+    const count = () => document.querySelectorAll(selector).length;
+    let lastCount = count();
+    let quietTimer = null;
+    let ceilingTimer = null;
+    const observer = new MutationObserver(mutations => {
+        const current = count();
+        const touchesCard = mutations.some(m => {
+            const node = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+            return node && node.closest(selector);
+        });
+        if (current !== lastCount || touchesCard) {
+            lastCount = current;
+            arm();
+        }
+    });
+    const finish = stable => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(ceilingTimer);
+        resolve({stable, count: count(), elapsed: Math.round(performance.now() - started)});
+    };
+    const arm = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    };
+    observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+    ceilingTimer = setTimeout(() => finish(false), ceilingMs);
+    arm();
+})"""
+
+
+def resolve_pacing(pacing=None):
+    """Return the pacing mode to use, defaulting to PACING_MODE."""
+    pacing = pacing or PACING_MODE
+    if pacing not in PACING_MODES:
+        raise ValueError(f"Unknown pacing mode '{pacing}'. Use one of {PACING_MODES}")
+    return pacing
+
+
+def human_pause_steps(page, low, high, pacing=None):
+    """Randomized think-time between actions; skipped in fast pacing."""
+    if resolve_pacing(pacing) == "human":
+        yield page.wait_for_timeout(random.randint(low, high))
+
+
+def human_pause(page, low, high, pacing=None):
+    drive(human_pause_steps(page, low, high, pacing))
+
+
+def booking_gap(pacing=None):
+    """Milliseconds a worker waits before its next booking.
+
+    Fast pacing skips think-time inside a search but still spaces the
+    searches themselves by FAST_BOOKING_GAP_MS.
+    """
+    if resolve_pacing(pacing) == "human":
+        return random.randint(2000, 4000)
+    return FAST_BOOKING_GAP_MS
+
+
+def wait_until_steps(page, expression, arg=None, timeout=None):
+    """Wait for a JS predicate to become truthy. Returns False on timeout.
+
+    Used by fast pacing, where a missed condition should degrade into the
+    verification the caller already does rather than abort the booking.
+    """
+    try:
+        yield page.wait_for_function(expression, arg=arg, timeout=timeout or FAST_WAIT_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+
+def wait_until(page, expression, arg=None, timeout=None):
+    return drive(wait_until_steps(page, expression, arg=arg, timeout=timeout))
+
 
-def enter_location(page, location):
+def enter_location_steps(page, location, pacing=None):
     """Type location code into the pickup field and select from autocomplete.
 
     Uses keyboard ArrowDown+Enter instead of a DOM click on the autocomplete
@@ -30,43 +182,66 @@ def enter_location(page, location):
     navigation mega-menu items like "San Diego" for location "SAN", opening
     the nav overlay and leaving the location field unfilled.
     """
+    fast = resolve_pacing(pacing) == "fast"
     locator = page.locator("#pickupLocationTextWidget")
-    locator.wait_for(state="visible")
-    locator.focus()
-    page.wait_for_timeout(random.randint(500, 1000))
-    locator.type(location, delay=150)
-    page.wait_for_timeout(random.randint(1500, 2500))
-    print(f"Location field value after typing: '{locator.input_value()}'")
+    yield locator.wait_for(state="visible")
+    yield locator.focus()
+    yield from human_pause_steps(page, 500, 1000, pacing)
+    yield locator.type(location, delay=50 if fast else 150)
+    if fast:
+        try:
+            yield page.wait_for_selector(AUTOCOMPLETE_SELECTOR, state="visible", timeout=FAST_WAIT_TIMEOUT)
+        except Exception:
+            print("Autocomplete list did not appear; selecting anyway")
+    else:
+        yield page.wait_for_timeout(random.randint(1500, 2500))
+    typed = yield locator.input_value()
+    print(f"Location field value after typing: '{typed}'")
     # Keyboard-select first autocomplete suggestion: avoids matching nav items
-    page.keyboard.press("ArrowDown")
-    page.wait_for_timeout(random.randint(300, 500))
-    page.keyboard.press("Enter")
-    page.wait_for_timeout(random.randint(1000, 2000))
-    print(f"Location field value after autocomplete select: '{locator.input_value()}'")
+    yield page.keyboard.press("ArrowDown")
+    yield from human_pause_steps(page, 300, 500, pacing)
+    yield page.keyboard.press("Enter")
+    if fast:
+        yield from wait_until_steps(page, HIDDEN_LOCATION_SET_JS)
+    else:
+        yield page.wait_for_timeout(random.randint(1000, 2000))
+    selected = yield locator.input_value()
+    print(f"Location field value after autocomplete select: '{selected}'")
     # Check for the hidden location code input that the form actually submits
-    hidden_val = page.eval_on_selector("#pickupLocationWidget", "el => el.value") if page.locator("#pickupLocationWidget").count() > 0 else "N/A"
+    hidden_val = "N/A"
+    if (yield page.locator("#pickupLocationWidget").count()) > 0:
+        hidden_val = yield page.eval_on_selector("#pickupLocationWidget", "el => el.value")
     print(f"Hidden location widget value: '{hidden_val}'")
 
 
-def enter_date(page, field_id, date_value, max_retries=3):
+def enter_location(page, location, pacing=None):
+    drive(enter_location_steps(page, location, pacing=pacing))
+
+
+def enter_date_steps(page, field_id, date_value, max_retries=3, pacing=None):
     """
     Clear a date field, type the value with delay, Tab to blur, verify.
 
     Returns True if the entered value matches date_value, False after
     max_retries unsuccessful attempts.
     """
+    fast = resolve_pacing(pacing) == "fast"
     for attempt in range(max_retries):
         locator = page.locator(f"#{field_id}")
-        locator.wait_for(state="attached")
-        locator.focus()
-        page.wait_for_timeout(random.randint(300, 700))
+        yield locator.wait_for(state="attached")
+        yield locator.focus()
+        yield from human_pause_steps(page, 300, 700, pacing)
         # Clear via JS to avoid stale value issues
-        page.eval_on_selector(f"#{field_id}", "el => el.value = ''")
-        locator.focus()
-        locator.type(date_value, delay=150)
-        page.keyboard.press("Tab")
-        page.wait_for_timeout(random.randint(1000, 1500))
-        entered = locator.input_value()
+        yield page.eval_on_selector(f"#{field_id}", "el => el.value = ''")
+        yield locator.focus()
+        yield locator.type(date_value, delay=50 if fast else 150)
+        yield page.keyboard.press("Tab")
+        if fast:
+            # The datepicker may reformat the value on blur; wait for it to settle
+            yield from wait_until_steps(page, INPUT_VALUE_IS_JS, arg=[field_id, date_value])
+        else:
+            yield page.wait_for_timeout(random.randint(1000, 1500))
+        entered = yield locator.input_value()
         print(f"Entered date for {field_id}: {entered}")
         if entered == date_value:
             return True
@@ -75,24 +250,39 @@ def enter_date(page, field_id, date_value, max_retries=3):
     return False
 
 
-def set_times(page, pickup_time, dropoff_time):
+def enter_date(page, field_id, date_value, max_retries=3, pacing=None):
+    return drive(enter_date_steps(page, field_id, date_value, max_retries=max_retries, pacing=pacing))
+
+
+def set_times_steps(page, pickup_time, dropoff_time, pacing=None):
     """Select pickup and dropoff times from the dropdown selects."""
-    page.select_option("#pickupTimeWidget", pickup_time)
-    page.wait_for_timeout(random.randint(500, 1000))
-    page.select_option("#dropoffTimeWidget", dropoff_time)
-    page.wait_for_timeout(random.randint(500, 1000))
+    yield page.select_option("#pickupTimeWidget", pickup_time)
+    yield from human_pause_steps(page, 500, 1000, pacing)
+    yield page.select_option("#dropoffTimeWidget", dropoff_time)
+    yield from human_pause_steps(page, 500, 1000, pacing)
 
 
-def check_age_checkbox(page):
+def set_times(page, pickup_time, dropoff_time, pacing=None):
+    drive(set_times_steps(page, pickup_time, dropoff_time, pacing=pacing))
+
+
+def check_age_checkbox_steps(page, pacing=None):
     """Ensure the 25+ age checkbox is checked."""
     checkbox = page.locator("#driversAgeWidget")
-    if not checkbox.is_checked():
-        page.wait_for_timeout(random.randint(500, 1000))
-        checkbox.click()
-        page.wait_for_timeout(random.randint(500, 1000))
+    if not (yield checkbox.is_checked()):
+        yield from human_pause_steps(page, 500, 1000, pacing)
+        yield checkbox.click()
+        if resolve_pacing(pacing) == "fast":
+            yield from wait_until_steps(page, CHECKBOX_CHECKED_JS)
+        else:
+            yield page.wait_for_timeout(random.randint(500, 1000))
+
 
+def check_age_checkbox(page, pacing=None):
+    drive(check_age_checkbox_steps(page, pacing=pacing))
 
-def click_search(page):
+
+def click_search_steps(page, pacing=None):
     """Activate the search button.
 
     The button is type="button" (not type="submit"), so keyboard Enter on a
@@ -101,29 +291,86 @@ def click_search(page):
     via scroll=False to avoid the sticky-header repositioning issue.
     """
     search_btn = page.locator("#findMyCarButton")
-    search_btn.wait_for(state="visible")
-    page.wait_for_timeout(random.randint(500, 1000))
-    print(f"Clicking search button (visible={search_btn.is_visible()}, enabled={search_btn.is_enabled()})")
-    search_btn.click(force=True)
+    yield search_btn.wait_for(state="visible")
+    yield from human_pause_steps(page, 500, 1000, pacing)
+    visible = yield search_btn.is_visible()
+    enabled = yield search_btn.is_enabled()
+    print(f"Clicking search button (visible={visible}, enabled={enabled})")
+    yield search_btn.click(force=True)
+
+
+def click_search(page, pacing=None):
+    drive(click_search_steps(page, pacing=pacing))
 
 
-def fill_search_form(page, booking):
+def is_search_response(response):
+    """Match the XHR that carries the search results (rentalCarSearch.act)."""
+    return "rentalCarSearch" in response.url
+
+
+def click_search_and_capture_steps(api, page, timeout=SEARCH_TIMEOUT, pacing=None):
+    """Click search and capture the rentalCarSearch response.
+
+    Returns {"status": int, "request": {...}, "body": str}, or an empty dict
+    when the response did not arrive within timeout seconds. "request" holds
+    the URL, method, headers and post data the HTTP fast path replays. Errors from the click itself
+    propagate to the caller.
+    """
+    captured = {}
+    clicked = []
+
+    def click():
+        yield api.click_search(page, pacing=pacing)
+        clicked.append(True)
+
+    try:
+        response_info = yield ExpectResponse(page, is_search_response, timeout * 1000, click())
+        response = yield response_info.value
+        captured["status"] = response.status
+        captured["request"] = {
+            "url": response.request.url,
+            "method": response.request.method,
+            "headers": response.request.headers,
+            "post_data": response.request.post_data,
+        }
+        captured["body"] = yield response.text()
+    except Exception as e:
+        if not clicked:
+            raise
+        if "status" in captured:
+            captured["body"] = f"(could not read body: {e})"
+        else:
+            print(f"rentalCarSearch response not captured: {str(e)}")
+    return captured
+
+
+def click_search_and_capture(page, timeout=SEARCH_TIMEOUT, pacing=None):
+    return drive(click_search_and_capture_steps(_API, page, timeout=timeout, pacing=pacing))
+
+
+def fill_search_form_steps(api, page, booking, pacing=None, timer=None):
     """Fill the complete Costco Travel search form for a booking.
 
+    Each field is timed as a form.* stage when a timing.RunTimer is passed.
     Returns True on success, False on failure.
     """
     try:
         print(f"\nFilling form for {booking['location']}...")
-        enter_location(page, booking["location"])
+        with timed(timer, "form.location", booking):
+            yield api.enter_location(page, booking["location"], pacing=pacing)
 
-        pickup_ok = enter_date(page, "pickUpDateWidget", booking["pickup_date"])
-        dropoff_ok = enter_date(page, "dropOffDateWidget", booking["dropoff_date"])
+        with timed(timer, "form.pickup_date", booking):
+            pickup_ok = yield api.enter_date(page, "pickUpDateWidget", booking["pickup_date"], pacing=pacing)
+        with timed(timer, "form.dropoff_date", booking):
+            dropoff_ok = yield api.enter_date(page, "dropOffDateWidget", booking["dropoff_date"], pacing=pacing)
         if not (pickup_ok and dropoff_ok):
             print("Date entry failed after retries")
             return False
 
-        set_times(page, booking["pickup_time"], booking["dropoff_time"])
-        check_age_checkbox(page)
+        with timed(timer, "form.times", booking):
+            yield api.set_times(page, booking["pickup_time"], booking["dropoff_time"], pacing=pacing)
+        with timed(timer, "form.age", booking):
+            yield api.check_age_checkbox(page, pacing=pacing)
         return True
     except Exception as e:
         print(f"Error filling form: {str(e)}")
@@ -131,53 +378,106 @@ def fill_search_form(page, booking):
         return False
 
 
-def wait_for_results(page, current_url, timeout=60):
-    """Wait for car result cards to appear in the DOM.
+def fill_search_form(page, booking, pacing=None, timer=None):
+    return drive(fill_search_form_steps(_API, page, booking, pacing=pacing, timer=timer))
+
+
+def wait_for_results_steps(page, current_url, timeout=60, timer=None, booking=None):
+    """Wait for car result cards to appear in the DOM and stop changing.
 
     Costco Travel previously navigated to /Rental-Cars/h=XXXX for results but
     now loads results in-place (SPA behavior) without changing the URL. We wait
-    for the result card DOM element instead of a URL change.
+    for the result card DOM element instead of a URL change, then for the
+    cards to settle (see wait_for_stable_results).
     """
     try:
         print(f"Current URL before waiting: {page.url}")
-        page.wait_for_selector(
-            "a.card.car-result-card",
+        yield page.wait_for_selector(
+            RESULT_CARD_SELECTOR,
             state="attached",
             timeout=timeout * 1000,
         )
-        page.wait_for_timeout(2000)  # Let all cards render
+        yield from wait_for_stable_results_steps(page, timer=timer, booking=booking)
         print(f"Result cards loaded. URL: {page.url}")
         return True
     except Exception as e:
         print(f"Error waiting for results: {str(e)}")
         print(f"URL at timeout: {page.url}")
-        print(f"Page title at timeout: {page.title()}")
+        title = yield page.title()
+        print(f"Page title at timeout: {title}")
         return False
 
 
+def wait_for_results(page, current_url, timeout=60, timer=None, booking=None):
+    return drive(wait_for_results_steps(page, current_url, timeout=timeout, timer=timer, booking=booking))
+
+
+def log_results_stability(outcome, timer=None, booking=None):
+    """Print (and time, as results_stable) how long the cards took to settle."""
+    if not isinstance(outcome, dict):
+        return
+    elapsed = outcome.get("elapsed", 0) / 1000
+    if outcome.get("stable"):
+        print(f"Results stable after {elapsed:.2f} s ({outcome.get('count')} cards)")
+    else:
+        print(f"Results still changing at the {RESULTS_STABLE_CEILING} ms ceiling ({outcome.get('count')} cards)")
+    if timer is not None:
+        timer.record("results_stable", elapsed, booking, ok=bool(outcome.get("stable")))
+
+
+def wait_for_stable_results_steps(page, quiet_ms=None, ceiling_ms=None, timer=None, booking=None):
+    """Return once the result cards have been unchanged for quiet_ms.
+
+    Replaces the fixed 2 s sleep after the first card appears: a
+    MutationObserver in the page resets a quiet timer whenever a card is
+    added, removed or edited, and ceiling_ms bounds the wait. Returns the
+    {"stable", "count", "elapsed"} outcome, or None if the check could not run.
+    """
+    quiet_ms = RESULTS_QUIET_MS if quiet_ms is None else quiet_ms
+    ceiling_ms = RESULTS_STABLE_CEILING if ceiling_ms is None else ceiling_ms
+    try:
+        outcome = yield page.evaluate(RESULTS_STABLE_JS, [RESULT_CARD_SELECTOR, quiet_ms, ceiling_ms])
+    except Exception as e:
+        print(f"Results stability check failed ({str(e)}); continuing")
+        return None
+    log_results_stability(outcome, timer, booking)
+    return outcome
+
+
+def wait_for_stable_results(page, quiet_ms=None, ceiling_ms=None, timer=None, booking=None):
+    return drive(wait_for_stable_results_steps(
+        page, quiet_ms=quiet_ms, ceiling_ms=ceiling_ms, timer=timer, booking=booking
+    ))
+
+
 def get_available_categories(page):
     """Extract available vehicle category names from the results page."""
-    categories = set()
+    from price_extractor import scan_result_rows
+
     try:
-        rows = page.locator('div[role="row"]').all()
-        for row in rows:
-            try:
-                name = row.locator("div.inner.text-center.h3-tag-style").text_content()
-                if name:
-                    categories.add(name.strip())
-            except Exception:
-                continue
+        return {row["category"] for row in scan_result_rows(page)}
     except Exception as e:
         print(f"Error getting categories: {str(e)}")
-    return categories
+        return set()
 
 
-def validate_category(page, category, location):
-    """Navigate and verify that a category exists for the given location."""
+def validate_category(page, category, location, cache=None):
+    """Verify that a category exists for the given location.
+
+    Answers from the category cache when the location was searched within
+    CATEGORY_CACHE_TTL_HOURS; otherwise runs a search with tomorrow's dates
+    and refreshes the cache from it.
+    """
     from datetime import timedelta
 
+    cache = cache or CategoryCache()
+    cached = cache.get(location)
+    if cached and category in cached:
+        print(f"'{category}' is available at {location} (cached)")
+        return True
+
     try:
-        page.goto("https://www.costcotravel.com/Rental-Cars")
+        page.goto(RENTAL_CARS_URL)
         page.wait_for_timeout(random.randint(2000, 4000))
 
         tomorrow = (datetime.now() + timedelta(days=1)).strftime("%m/%d/%Y")
@@ -196,6 +496,7 @@ def validate_category(page, category, location):
             return False
 
         available = get_available_categories(page)
+        cache.update(location, available)
         if category not in available:
             print(f"\nCategory '{category}' not available at {location}")
             print("Available categories:")
@@ -208,175 +509,662 @@ def validate_category(page, category, location):
         return False
 
 
-def process_booking(page, booking):
-    """Run a full price scrape for one booking. Returns price dict or None."""
-    from price_extractor import extract_lowest_prices
+def print_booking_header(booking):
+    print(f"\nChecking prices for {booking['location']}")
+    print(f"{booking['pickup_date']} to {booking['dropoff_date']}")
+    print(f"Focus category: {booking['focus_category']}")
 
-    try:
-        print(f"\nChecking prices for {booking['location']}")
-        print(f"{booking['pickup_date']} to {booking['dropoff_date']}")
-        print(f"Focus category: {booking['focus_category']}")
 
+def prices_from_search_response(search_response, booking, timer=None):
+    """Prices parsed from the captured rentalCarSearch response ({} or None
+    when it had none, or none for the booking's focus category). Saves the
+    fast-path template when they parse."""
+    from price_extractor import extract_prices_from_response
+
+    with timed(timer, "parse_response", booking):
+        prices = extract_prices_from_response(search_response.get("body"), booking["focus_category"])
+    if prices:
+        print("Prices read from rentalCarSearch response")
+        if fast_path_enabled():
+            save_template(search_response.get("request"), booking)
+    return prices
+
+
+def raise_results_failure(search_response):
+    """Print what rentalCarSearch.act returned and raise the matching
+    retry.ScrapeError for results that never loaded."""
+    if search_response:
+        print(f"rentalCarSearch.act response status: {search_response.get('status')}")
+        print(f"rentalCarSearch.act response body:\n{str(search_response.get('body'))[:2000]}")
+    else:
+        print("rentalCarSearch.act was never called.")
+    if search_response.get("status") in (403, 429):
+        raise BlockedError(f"rentalCarSearch.act answered {search_response['status']}")
+    raise ResultsTimeoutError("Failed to load results")
+
+
+def scrape_booking_steps(api, page, booking, blocker=None, pacing=None, timer=None, screenshots=None):
+    """Run one price scrape attempt for a booking and return its price dict.
+
+    Prices come from the intercepted rentalCarSearch response when it can be
+    parsed, and from the rendered result cards otherwise. Raises a
+    retry.ScrapeError subclass naming the stage that failed.
+    """
+    screenshots = screenshots or default_screenshotter()
+
+    if blocker is not None:
+        blocker.start_search()
+
+    print_booking_header(booking)
+
+    with timed(timer, "navigate", booking):
+        try:
+            yield page.goto(RENTAL_CARS_URL)
+        except Exception as e:
+            raise NavigationError(f"Could not load {RENTAL_CARS_URL}: {str(e)}") from e
+
+    with timed(timer, "settle", booking):
+        yield from human_pause_steps(page, 2000, 4000, pacing)
+
+    if not (yield api.fill_search_form(page, booking, pacing=pacing, timer=timer)):
+        raise FormError("Failed to fill search form")
+
+    # Dismiss any navigation menus opened by keyboard focus during form fill
+    yield page.keyboard.press("Escape")
+    yield from human_pause_steps(page, 300, 300, pacing)
+
+    current_url = page.url
+    with timed(timer, "search", booking):
         try:
-            page.goto("https://www.costcotravel.com/Rental-Cars")
+            search_response = yield api.click_search_and_capture(page, pacing=pacing)
+        except Exception as e:
+            raise FormError(f"Search button failed: {str(e)}") from e
+
+    # The search payload already carries every category's lowest price;
+    # only wait for the cards to render when it cannot be parsed.
+    prices = prices_from_search_response(search_response, booking, timer=timer)
+    if not prices:
+        with timed(timer, "wait_results", booking):
+            results_loaded = yield api.wait_for_results(page, current_url, timer=timer, booking=booking)
+        if not results_loaded:
+            raise_results_failure(search_response)
+        print("Results loaded successfully")
+        with timed(timer, "extract_dom", booking):
+            prices = yield api.extract_lowest_prices(page)
+        if not prices:
+            raise ExtractionError("Results loaded but no prices could be read")
+
+    if HAR_MODE == "record":
+        # Fixtures need the rendered cards even when the response had the prices
+        yield api.wait_for_results(page, current_url)
+        save_dom_fixture((yield page.content()), booking)
+
+    if screenshots.should_capture(ok=True):
+        with timed(timer, "screenshot", booking):
+            yield api.capture_screenshot(screenshots, page, booking, ok=True)
+
+    if booking["focus_category"] not in prices:
+        print(f"\nWarning: '{booking['focus_category']}' not in results!")
+        print("Available:", sorted(prices.keys()))
+
+    if blocker is not None:
+        blocker.report()
+
+    return prices
+
+
+def scrape_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None):
+    return drive(scrape_booking_steps(
+        _API, page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots
+    ))
+
+
+def attempt_booking_steps(api, page, booking, blocker=None, pacing=None, timer=None, screenshots=None,
+                          attempts=None):
+    """scrape_booking() with up to `attempts` tries (default RETRY_ATTEMPTS).
+
+    Retryable failures wait an exponential, jittered backoff before the next
+    try; extraction errors and 403/429 answers are not retried in place.
+    Returns (prices, None) on success or (None, last_error) on failure.
+    """
+    attempts = attempts or RETRY_ATTEMPTS
+    error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            return (yield api.scrape_booking(
+                page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots
+            )), None
+        except Exception as e:
+            error = e
+        if attempt == attempts or not is_retryable(error):
+            break
+        delay = backoff_delay(attempt)
+        print(f"Attempt {attempt}/{attempts} failed ({error_kind(error)}: {str(error)}) — retrying in {delay:.1f} s")
+        try:
+            yield page.wait_for_timeout(delay * 1000)
         except Exception:
-            print("Navigation timed out — retrying once after 5 s...")
-            page.wait_for_timeout(5000)
-            page.goto("https://www.costcotravel.com/Rental-Cars")  # may raise → caught by outer except
+            yield Sleep(delay)
 
-        page.wait_for_timeout(random.randint(2000, 4000))
+    print(f"Error processing booking ({error_kind(error)}): {str(error)}")
+    traceback.print_exception(type(error), error, error.__traceback__)
 
-        if not fill_search_form(page, booking):
-            raise Exception("Failed to fill search form")
-
-        # Dismiss any navigation menus opened by keyboard focus during form fill
-        page.keyboard.press("Escape")
-        page.wait_for_timeout(300)
-
-        # Intercept rentalCarSearch.act response to diagnose server-side failure
-        search_response_info = {}
-        def handle_response(response):
-            if "rentalCarSearch" in response.url:
-                try:
-                    body = response.text()
-                    search_response_info["status"] = response.status
-                    search_response_info["body"] = body[:2000]
-                except Exception as e:
-                    search_response_info["status"] = response.status
-                    search_response_info["body"] = f"(could not read body: {e})"
-        page.on("response", handle_response)
+    screenshots = screenshots or default_screenshotter()
+    if screenshots.should_capture(ok=False):
+        yield api.capture_screenshot(screenshots, page, booking, ok=False)
+    return None, error
 
-        current_url = page.url
-        click_search(page)
 
-        if not wait_for_results(page, current_url):
-            if search_response_info:
-                print(f"rentalCarSearch.act response status: {search_response_info.get('status')}")
-                print(f"rentalCarSearch.act response body:\n{search_response_info.get('body')}")
-            else:
-                print("rentalCarSearch.act was never called.")
-            raise Exception("Failed to load results")
+def attempt_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None,
+                    attempts=None):
+    return drive(attempt_booking_steps(
+        _API, page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots,
+        attempts=attempts,
+    ))
 
-        print("Results loaded successfully")
 
-        os.makedirs("screenshots", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        screenshot_name = f"results_{booking['location']}_{timestamp}.png"
-        page.screenshot(path=f"screenshots/{screenshot_name}")
-        print(f"Screenshot saved: {screenshot_name}")
+def process_booking(page, booking, blocker=None, pacing=None, timer=None, screenshots=None):
+    """Run a full price scrape for one booking, with retries. Returns price dict or None.
+
+    Pass a timing.RunTimer to record how long each stage takes. Screenshots
+    follow SCREENSHOT_POLICY unless another screenshots.Screenshotter is passed.
+    """
+    prices, _ = attempt_booking(
+        page, booking, blocker=blocker, pacing=pacing, timer=timer, screenshots=screenshots
+    )
+    return prices
+
+
+def check_booking_steps(api, context, page, booking, blocker=None, timer=None):
+    """Price one booking: HTTP fast path first when enabled, browser otherwise.
+
+    The browser flow (attempt_booking) only runs when the fast path is off
+    or its response fails validation. Returns (prices, error).
+    """
+    if fast_path_enabled():
+        with timed(timer, "fast_path", booking):
+            prices = yield api.fetch_prices(context.request, booking)
+        if prices:
+            return prices, None
+    return (yield api.attempt_booking(page, booking, blocker=blocker, timer=timer))
 
-        prices = extract_lowest_prices(page)
 
-        if booking["focus_category"] not in prices:
-            print(f"\nWarning: '{booking['focus_category']}' not in results!")
-            print("Available:", sorted(prices.keys()))
+def check_booking(context, page, booking, blocker=None, timer=None):
+    return drive(check_booking_steps(_API, context, page, booking, blocker=blocker, timer=timer))
 
-        return prices
 
+def worker_steps(api, worker_id, target, scheduler, report, stats, timer=None):
+    """Scrape bookings handed out by scheduler in one isolated browser context.
+
+    api.open_worker(target, blocker, session) opens the context (target is
+    the channel for the sync engine, the shared browser for the async one)
+    and api.close_worker() tears it down. Final results go to
+    report(index, prices).
+    """
+    from memory_watchdog import MemoryWatchdog
+    from request_blocking import RequestBlocker
+
+    started = time.monotonic()
+    handle = browser = context = None
+    blocker = RequestBlocker.from_config()
+    session = api.worker_session(worker_id)
+    watchdog = MemoryWatchdog()
+    try:
+        handle, browser, context, page = yield api.open_worker(target, blocker, session)
+        stats["startup"] = time.monotonic() - started
+        stats["warm"] = bool(session and session.warm)
+        while True:
+            item = scheduler.next()
+            if item is None:
+                break
+            index, booking = item
+            booking_started = time.monotonic()
+            prices, error = yield api.check_booking(context, page, booking, blocker=blocker, timer=timer)
+            elapsed = time.monotonic() - booking_started
+            stats["busy"] += elapsed
+            if timer is not None:
+                timer.record("booking", elapsed, booking, ok=bool(prices))
+            stats["bookings"] += 1
+            if prices:
+                stats["succeeded"] += 1
+            if scheduler.record(index, booking, prices, error):
+                report(index, prices)
+            if scheduler.has_work():
+                sample = None
+                if watchdog.samples_memory:
+                    # On the async engine the browser is shared, so RSS covers every worker's contexts
+                    sample = yield api.sample_memory(browser, context, page)
+                reason = watchdog.check(sample)
+                if reason:
+                    print(f"Worker {worker_id}: recycling browser context ({reason})")
+                    try:
+                        context, page = yield api.recycle_context(browser, context, page, blocker=blocker)
+                        watchdog.recycled()
+                    except Exception as e:
+                        print(f"Worker {worker_id}: recycle failed, keeping current context: {str(e)}")
+                yield page.wait_for_timeout(booking_gap())
     except Exception as e:
-        print(f"Error processing booking: {str(e)}")
+        print(f"Worker {worker_id} stopped: {str(e)}")
         traceback.print_exc()
+    finally:
+        stats["wall"] = time.monotonic() - started
+        stats.update(watchdog.stats())
+        if blocker is not None:
+            stats["blocked"] = blocker.totals["blocked"]
+            stats["bytes_saved"] = blocker.totals["bytes_saved"]
+        if session is not None and context is not None:
+            yield api.save_session(session, context, healthy=stats["succeeded"] > 0 or stats["bookings"] == 0)
+        if context is not None:
+            yield api.close_worker(handle, browser, context)
+
+
+def _worker_loop(worker_id, scheduler, result_queue, channel, stats, timer=None):
+    """Run worker_steps on a thread with its own Playwright instance.
+
+    The sync API is bound to the thread that started it, so contexts cannot
+    be shared across threads. Final results are posted to result_queue as
+    (index, prices); a final (None, worker_id) entry signals that the worker
+    has exited.
+    """
+    try:
+        drive(worker_steps(
+            _API, worker_id, channel, scheduler,
+            lambda index, prices: result_queue.put((index, prices)), stats, timer,
+        ))
+    finally:
+        result_queue.put((None, worker_id))
 
-        os.makedirs("screenshots", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        error_name = f"error_{booking['location']}_{timestamp}.png"
-        try:
-            page.screenshot(path=f"screenshots/{error_name}")
-            print(f"Error screenshot saved: {error_name}")
-        except Exception:
-            print("Error screenshot failed (page already closed)")
 
-        return None
+def new_worker_stats(workers):
+    """One empty timing dict per worker, numbered from 1."""
+    return [
+        {"worker": worker_id, "bookings": 0, "succeeded": 0,
+         "startup": 0.0, "busy": 0.0, "wall": 0.0}
+        for worker_id in range(1, workers + 1)
+    ]
 
 
-def run_price_checks(tracker, active_bookings):
-    """Launch Playwright browser and run price checks for all active bookings."""
-    from services.price_alert_service import PriceAlertService
-    from email_module import send_price_alert
+def report_unfinished(bookings, reported, scheduler, on_result):
+    """Report every booking no worker finished with prices=None."""
+    if scheduler.breaker.open:
+        print(f"Circuit breaker skipped {len(bookings) - len(reported)} booking(s)")
+    for index in range(len(bookings)):
+        if index not in reported:
+            on_result(index, None)
 
-    # Use real Google Chrome in CI for proper TLS fingerprint (Playwright's
-    # bundled Chromium is blocked by Costco Travel's bot-detection on GH Actions)
-    channel = "chrome" if os.environ.get("CI") == "true" else None
-    playwright, browser, context, page = setup_browser(headless=True, channel=channel)
-    alert_service = PriceAlertService(price_threshold=10.0)
 
-    deleted_bookings = tracker.cleanup_expired_bookings()
-    if deleted_bookings:
-        print("\nCleaned up expired bookings:")
-        for booking_id in deleted_bookings:
-            print(f"  - {booking_id}")
+def scrape_bookings(bookings, on_result, workers=1, channel=None, timer=None):
+    """Scrape bookings with `workers` browser contexts pulling from a shared scheduler.
 
+    on_result(index, prices) is called on the calling thread as each booking
+    finishes, so callers can update shared state (the tracker) without locks.
+    Failed bookings get one more try at the end of the run (retry.RetryScheduler);
+    bookings never finished, because a worker crashed or the circuit breaker
+    stopped the run, are reported with prices=None.
+    Stage spans go to timer (a timing.RunTimer) when one is passed.
+
+    Returns a list of per-worker timing dicts.
+    """
+    scheduler = RetryScheduler(bookings)
+    result_queue = queue.Queue()
+
+    workers = max(1, min(workers, len(bookings)))
+    worker_stats = new_worker_stats(workers)
+    for stats in worker_stats:
+        threading.Thread(
+            target=_worker_loop,
+            args=(stats["worker"], scheduler, result_queue, channel, stats, timer),
+            name=f"scrape-worker-{stats['worker']}",
+            daemon=True,
+        ).start()
+
+    reported = set()
+    running = workers
+    while running:
+        index, payload = result_queue.get()
+        if index is None:
+            running -= 1
+            continue
+        reported.add(index)
+        on_result(index, payload)
+
+    report_unfinished(bookings, reported, scheduler, on_result)
+    return worker_stats
+
+
+def print_worker_timings(worker_stats):
+    """Print a per-worker timing summary for a scrape run."""
+    print("\nWorker timings:")
+    for stats in worker_stats:
+        average = stats["busy"] / stats["bookings"] if stats["bookings"] else 0.0
+        print(
+            f"  Worker {stats['worker']}: {stats['succeeded']}/{stats['bookings']} bookings "
+            f"in {stats['wall']:.1f}s (startup {stats['startup']:.1f}s"
+            f"{' warm' if stats.get('warm') else ''}, "
+            f"avg {average:.1f}s/booking)"
+        )
+        if stats.get("blocked"):
+            print(
+                f"    blocked {stats['blocked']} requests, "
+                f"~{stats['bytes_saved'] / (1024 * 1024):.1f} MB saved"
+            )
+        if stats.get("peak_heap_mb") or stats.get("peak_rss_mb") or stats.get("recycles"):
+            print(
+                f"    peak JS heap {stats.get('peak_heap_mb', 0):.0f} MB, "
+                f"peak browser RSS {stats.get('peak_rss_mb', 0):.0f} MB, "
+                f"{stats.get('recycles', 0)} context recycle(s)"
+            )
+
+
+def _is_expired(booking):
+    """Return True if the booking should be skipped (past or unparseable dropoff)."""
     try:
-        bookings_data = []
+        dropoff_date = datetime.strptime(booking["dropoff_date"], "%m/%d/%Y").date()
+    except ValueError:
+        print(f"Error parsing date for booking: {booking['location']}")
+        return True
+    if dropoff_date < datetime.now().date():
+        print(f"Skipping expired: {booking['location']} - {booking['dropoff_date']}")
+        return True
+    return False
 
-        for booking in active_bookings:
-            try:
-                from datetime import datetime as _dt
-                dropoff_date = _dt.strptime(booking["dropoff_date"], "%m/%d/%Y").date()
-                if dropoff_date < _dt.now().date():
-                    print(f"Skipping expired: {booking['location']} - {booking['dropoff_date']}")
-                    continue
-            except ValueError:
-                print(f"Error parsing date for booking: {booking['location']}")
-                continue
 
-            prices = process_booking(page, booking)
+def record_booking_prices(tracker, alert_service, booking, prices):
+    """Store scraped prices for a booking and build its email entry."""
+    booking_id = make_booking_id(booking["location"], booking["pickup_date"],
+                                 booking["dropoff_date"], booking["focus_category"])
+
+    tracker.update_prices(booking_id, prices)
+    trends = tracker.get_price_trends(booking_id)
+
+    current_price = prices.get(booking["focus_category"])
+    previous_price = None
+    if booking.get("price_history"):
+        prev = booking["price_history"][-2] if len(booking["price_history"]) > 1 else None
+        if prev and "prices" in prev:
+            previous_price = prev["prices"].get(booking["focus_category"])
+
+    has_significant_drop = False
+    if current_price is not None and previous_price is not None:
+        drop = previous_price - current_price
+        if drop >= alert_service.price_threshold:
+            has_significant_drop = True
+            print(f"Significant drop for {booking['location']}: ${drop:.2f}")
+
+    return {
+        "booking": booking,
+        "prices": prices,
+        "trends": trends,
+        "has_significant_drop": has_significant_drop,
+    }
+
+
+def browser_channel():
+    """Return the browser channel to launch for this environment.
+
+    Use real Google Chrome in CI for proper TLS fingerprint (Playwright's
+    bundled Chromium is blocked by Costco Travel's bot-detection on GH Actions).
+    """
+    return "chrome" if os.environ.get("CI") == "true" else None
+
+
+def search_key(booking):
+    """Identify the Costco search a booking needs.
+
+    Every search returns prices for all categories, so bookings that differ
+    only in focus category can share one.
+    """
+    return (
+        booking["location"],
+        booking["pickup_date"],
+        booking["dropoff_date"],
+        booking.get("pickup_time", "12:00 PM"),
+        booking.get("dropoff_time", "12:00 PM"),
+    )
+
+
+def plan_searches(bookings):
+    """Group bookings by search_key. Returns lists of indices into bookings,
+    ordered by each group's first booking."""
+    groups = {}
+    for index, booking in enumerate(bookings):
+        groups.setdefault(search_key(booking), []).append(index)
+    return list(groups.values())
+
+
+def retain_history(tracker):
+    """Apply PRICE_RETENTION at the end of a run.
+
+    A failing rollup is reported and left for the next run; it must not
+    cost the run the prices it already scraped.
+    """
+    try:
+        tracker.apply_retention()
+    except Exception as e:
+        print(f"\nCould not apply price retention: {str(e)}")
+        traceback.print_exc()
 
+
+def compact_history(tracker):
+    """Compact the history after a run without masking the run's own outcome"""
+    try:
+        tracker.compact()
+    except Exception as e:
+        print(f"\nCould not compact the price history: {str(e)}")
+        traceback.print_exc()
+
+
+class PriceCheckRun:
+    """Engine-independent bookkeeping for one price check run.
+
+    Cleans up expired bookings, plans one search per distinct
+    location/date/time, fans each search's prices out to every booking that
+    shares it, and sends the alert email in the original booking order.
+    A HAR replay run neither sends the email nor updates the category cache.
+    """
+
+    def __init__(self, tracker, active_bookings):
+        from services.price_alert_service import PriceAlertService
+
+        self.tracker = tracker
+        self.alert_service = PriceAlertService(price_threshold=10.0)
+        self.categories = CategoryCache()
+        self.entries = {}
+
+        deleted_bookings = tracker.cleanup_expired_bookings()
+        if deleted_bookings:
+            print("\nCleaned up expired bookings:")
+            for booking_id in deleted_bookings:
+                print(f"  - {booking_id}")
+
+        self.pending = [booking for booking in active_bookings if not _is_expired(booking)]
+        self.groups = plan_searches(self.pending)
+        # One representative booking per search; its focus category is only
+        # used for logging inside process_booking.
+        self.searches = [self.pending[group[0]] for group in self.groups]
+
+    def describe(self, workers, engine="sync"):
+        """Print the run plan."""
+        print(
+            f"\nChecking {len(self.pending)} bookings with {len(self.searches)} "
+            f"search(es) on {min(workers, len(self.searches))} {engine} worker(s)"
+        )
+
+    def on_result(self, index, prices):
+        """Record the prices scraped for searches[index] (None on failure)
+        against every booking in that search group.
+
+        The categories in a successful search also refresh the category
+        cache, so adding a booking at this location needs no extra search.
+        """
+        if prices and HAR_MODE != "replay":
+            self.categories.update(self.searches[index]["location"], prices.keys())
+        for booking_index in self.groups[index]:
+            booking = self.pending[booking_index]
             if prices:
-                category_slug = re.sub(r"[^a-zA-Z0-9]", "", booking["focus_category"])
-                booking_id = (
-                    f"{booking['location']}_{booking['pickup_date']}_"
-                    f"{booking['dropoff_date']}_{category_slug}"
-                ).replace("/", "")
-
-                tracker.update_prices(booking_id, prices)
-                trends = tracker.get_price_trends(booking_id)
-
-                current_price = prices.get(booking["focus_category"])
-                previous_price = None
-                if booking.get("price_history"):
-                    prev = booking["price_history"][-2] if len(booking["price_history"]) > 1 else None
-                    if prev and "prices" in prev:
-                        previous_price = prev["prices"].get(booking["focus_category"])
-
-                has_significant_drop = False
-                if current_price is not None and previous_price is not None:
-                    drop = previous_price - current_price
-                    if drop >= alert_service.price_threshold:
-                        has_significant_drop = True
-                        print(f"Significant drop for {booking['location']}: ${drop:.2f}")
-
-                bookings_data.append({
-                    "booking": booking,
-                    "prices": prices,
-                    "trends": trends,
-                    "has_significant_drop": has_significant_drop,
-                })
-                print(f"\nPrices updated for {booking['location']}")
+                if booking["focus_category"] not in prices:
+                    print(f"\nWarning: '{booking['focus_category']}' not in results for {booking['location']}")
+                self.entries[booking_index] = record_booking_prices(
+                    self.tracker, self.alert_service, booking, prices
+                )
+                print(f"\nPrices updated for {booking['location']} ({booking['focus_category']})")
             else:
-                print(f"\nFailed to get prices for {booking['location']}")
+                print(f"\nFailed to get prices for {booking['location']} ({booking['focus_category']})")
 
-            page.wait_for_timeout(random.randint(2000, 4000))
+    def finish(self):
+        """Send the alert email. Returns True if any booking got prices."""
+        from email_module import send_price_alert
 
-        if bookings_data:
+        bookings_data = [self.entries[index] for index in sorted(self.entries)]
+        if bookings_data and HAR_MODE == "replay":
+            print(f"\nHAR replay: not sending the email for {len(bookings_data)} bookings")
+        elif bookings_data:
             print(f"\nSending email for {len(bookings_data)} bookings")
             send_price_alert(bookings_data)
         else:
             print("\nNo bookings data to send")
+        return bool(bookings_data)
+
+
+def prepare_run(tracker, active_bookings, workers=None):
+    """(tracker, active_bookings, workers) for a price check run.
+
+    workers defaults to SCRAPE_WORKERS and drops to one while recording a
+    HAR; in HAR replay the tracker is swapped for a throwaway one.
+    """
+    if workers is None:
+        workers = SCRAPE_WORKERS
+    if HAR_MODE == "record" and workers > 1:
+        print("HAR recording uses a single worker so contexts do not overwrite one HAR file")
+        workers = 1
+    # Replayed prices are stale; keep them out of the real history
+    tracker, active_bookings = replay_tracker(tracker, active_bookings)
+    return tracker, active_bookings, workers
+
 
+def price_check_steps(api, tracker, active_bookings, workers, engine="sync"):
+    """Scrape every active booking via api.scrape_bookings and send the alert.
+
+    Returns True if any booking got prices.
+    """
+    timer = RunTimer()
+    try:
+        # One flush for the whole run instead of a write per booking
+        with tracker.transaction():
+            run = PriceCheckRun(tracker, active_bookings)
+            if run.searches:
+                run.describe(workers, engine=engine)
+                worker_stats = yield api.scrape_bookings(
+                    run.searches, run.on_result, workers=workers, channel=browser_channel(), timer=timer
+                )
+                print_worker_timings(worker_stats)
+                timer.print_summary()
+                default_screenshotter().flush()
+            # Rolled up in the same batch, so the run is one write
+            retain_history(tracker)
+        return run.finish()
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
         traceback.print_exc()
         return False
     finally:
-        print("\nClosing browser...")
-        browser.close()
-        playwright.stop()
+        compact_history(tracker)
 
-    return bool(bookings_data)
 
+def run_price_checks(tracker, active_bookings, workers=None, engine=None):
+    """Launch Playwright browsers and run price checks for all active bookings.
 
-def setup_browser(headless=True, channel=None):
+    workers sets how many isolated browser contexts scrape in parallel
+    (defaults to SCRAPE_WORKERS). engine="async" runs the same pipeline on
+    the asyncio engine in async_price_monitor (defaults to SCRAPE_ENGINE).
+    """
+    if engine is None:
+        engine = SCRAPE_ENGINE
+    tracker, active_bookings, workers = prepare_run(tracker, active_bookings, workers)
+
+    if engine == "async":
+        import asyncio
+        from async_price_monitor import run_price_checks as run_price_checks_async
+        return asyncio.run(run_price_checks_async(tracker, active_bookings, workers=workers))
+
+    return drive(price_check_steps(_API, tracker, active_bookings, workers))
+
+
+def launch_options(headless=True, channel=None):
+    """chromium.launch() arguments: the stealth flags, plus channel if given."""
+    options = {"headless": headless, "args": list(BROWSER_ARGS)}
+    if channel:
+        options["channel"] = channel
+    return options
+
+
+def context_options(session=None, storage_state=None):
+    """new_context() arguments for a stealth context, seeded from a
+    browser_session.BrowserSession or a storage_state dict."""
+    options = {"user_agent": USER_AGENT, "viewport": VIEWPORT}
+    if session is not None:
+        options.update(session.context_kwargs())
+    if storage_state is not None:
+        options["storage_state"] = storage_state
+    return options
+
+
+def launch_browser_steps(playwright, headless=True, channel=None, attach=True):
+    """Launch Chromium with the stealth flags.
+
+    When a browser_host.py Chrome is running (or BROWSER_CDP_URL is set) and
+    attach is True, attach to it over CDP instead, unless the host runs a
+    different channel (see browser_host.attach_allowed). A host that refuses
+    the connection falls back to a launch.
+    """
+    endpoint = find_endpoint() if attach else None
+    if endpoint and attach_allowed(channel, headless):
+        try:
+            browser = yield playwright.chromium.connect_over_cdp(endpoint)
+            print(f"Attached to browser host at {endpoint}")
+            return browser
+        except Exception as e:
+            print(f"Could not attach to browser host ({str(e)}), launching a browser")
+    return (yield playwright.chromium.launch(**launch_options(headless, channel)))
+
+
+def launch_browser(playwright, headless=True, channel=None, attach=True):
+    return drive(launch_browser_steps(playwright, headless=headless, channel=channel, attach=attach))
+
+
+def prepare_context_steps(api, context, blocker=None, har_mode=None, har_path=None):
+    """Apply the stealth script, request blocking and HAR routing to a new context."""
+    yield context.add_init_script(WEBDRIVER_STEALTH_SCRIPT)
+    if blocker is not None:
+        yield context.route("**/*", api.route_handler(blocker))
+    yield api.attach_har(context, har_mode, har_path)
+
+
+def new_page_steps(api, browser, blocker=None, session=None, storage_state=None,
+                   har_mode=None, har_path=None):
+    """Open an isolated stealth context + page on an already running browser.
+
+    A browser_session.BrowserSession restores saved cookies/localStorage;
+    storage_state (a dict) seeds the context directly, which is how
+    recycle_context carries a session over. Returns (context, page).
+    """
+    if session is not None:
+        session.prepare()
+    context = yield browser.new_context(**context_options(session, storage_state))
+    yield from prepare_context_steps(api, context, blocker, har_mode, har_path)
+    page = yield context.new_page()
+    page.set_default_navigation_timeout(60000)
+    return context, page
+
+
+def new_page(browser, blocker=None, session=None, storage_state=None, har_mode=None, har_path=None):
+    return drive(new_page_steps(
+        _API, browser, blocker=blocker, session=session, storage_state=storage_state,
+        har_mode=har_mode, har_path=har_path,
+    ))
+
+
+def setup_browser(headless=True, channel=None, blocker=None, session=None, attach=True,
+                  har_mode=None, har_path=None):
     """
     Launch a Playwright browser with stealth settings.
 
@@ -384,30 +1172,121 @@ def setup_browser(headless=True, channel=None):
     of Playwright's bundled Chromium (required in CI to match the TLS
     fingerprint that Costco Travel's bot-detection expects).
 
-    Returns (playwright, browser, context, page). The caller is responsible
-    for teardown:
-        browser.close()
-        playwright.stop()
+    Pass a request_blocking.RequestBlocker to route every request of the
+    context through it, and a browser_session.BrowserSession to warm-start
+    from saved cookies (storage_state) or a persistent profile directory.
+
+    When a browser_host.py Chrome is running (or BROWSER_CDP_URL is set) and
+    attach is True, a fresh context is opened on it over CDP instead of
+    launching a browser, unless the host runs a different channel (see
+    browser_host.attach_allowed); persistent profiles always launch their own.
+
+    har_mode ('off', 'record' or 'replay'; default HAR_MODE) records the
+    context's traffic into har_path or replays it offline, see har_harness.
+
+    Returns (playwright, browser, context, page). browser is None for a
+    persistent profile, so tear down with close_browser(playwright, browser,
+    context) rather than browser.close().
     """
     playwright = sync_playwright().start()
-    launch_kwargs = {
-        "headless": headless,
-        "args": [
-            "--disable-blink-features=AutomationControlled",
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-infobars",
-            "--window-size=1920,1080",
-        ],
-    }
-    if channel:
-        launch_kwargs["channel"] = channel
-    browser = playwright.chromium.launch(**launch_kwargs)
-    context = browser.new_context(
-        user_agent=USER_AGENT,
-        viewport={"width": 1920, "height": 1080},
+    if session is None or session.mode != "profile":
+        browser = launch_browser(playwright, headless=headless, channel=channel, attach=attach)
+        context, page = new_page(browser, blocker=blocker, session=session, har_mode=har_mode, har_path=har_path)
+        return playwright, browser, context, page
+
+    session.prepare()
+    context = playwright.chromium.launch_persistent_context(
+        session.profile_dir, **launch_options(headless, channel), **context_options()
     )
-    context.add_init_script(WEBDRIVER_STEALTH_SCRIPT)
-    page = context.new_page()
+    drive(prepare_context_steps(_API, context, blocker, har_mode, har_path))
+    page = context.pages[0] if context.pages else context.new_page()
     page.set_default_navigation_timeout(60000)
-    return playwright, browser, context, page
+    return playwright, context.browser, context, page
+
+
+def recycle_context_steps(api, browser, context, page, blocker=None):
+    """Swap in a fresh context and page to release the renderer's memory.
+
+    Cookies and localStorage are copied into the new context, so the site
+    session survives. A persistent profile (browser is None) or a HAR
+    recording cannot replace its context, so only the page is replaced.
+    Returns (context, page).
+    """
+    if browser is None or HAR_MODE == "record":
+        fresh = yield context.new_page()
+        fresh.set_default_navigation_timeout(60000)
+        yield page.close()
+        return context, fresh
+
+    state = yield context.storage_state()
+    fresh_context, fresh = yield from new_page_steps(api, browser, blocker=blocker, storage_state=state)
+    try:
+        yield context.close()
+    except Exception:
+        pass
+    return fresh_context, fresh
+
+
+def recycle_context(browser, context, page, blocker=None):
+    return drive(recycle_context_steps(_API, browser, context, page, blocker=blocker))
+
+
+def close_browser(playwright, browser, context=None):
+    """Tear down what setup_browser() returned, ignoring already-closed objects.
+
+    The context is closed first so a HAR recording is flushed to disk. For a
+    browser attached over CDP, browser.close() only disconnects and leaves
+    the host Chrome running.
+    """
+    for target in (context, browser):
+        if target is None:
+            continue
+        try:
+            target.close()
+        except Exception:
+            pass
+    playwright.stop()
+
+
+# -- Sync API bindings -------------------------------------------------------
+# The *_steps flows reach the engine through `api` (this module here,
+# async_price_monitor there) for the calls that differ by more than an
+# await; both modules define these names.
+
+def extract_lowest_prices(page):
+    from price_extractor import extract_lowest_prices
+
+    return extract_lowest_prices(page)
+
+
+def capture_screenshot(screenshots, page, booking, ok):
+    return screenshots.capture(page, booking, ok=ok)
+
+
+def route_handler(blocker):
+    return blocker.handle_route
+
+
+def worker_session(worker_id):
+    from browser_session import BrowserSession
+
+    return BrowserSession.from_config(name=f"worker-{worker_id}")
+
+
+def open_worker(channel, blocker, session):
+    """A worker's own browser: (playwright, browser, context, page)."""
+    return setup_browser(headless=True, channel=channel, blocker=blocker, session=session)
+
+
+def sample_memory(browser, context, page):
+    from memory_watchdog import sample_memory
+
+    return sample_memory(browser, context, page)
+
+
+def save_session(session, context, healthy):
+    session.save(context, healthy=healthy)
+
+
+def close_worker(playwright, browser, context):
+    close_browser(playwright, browser, context)
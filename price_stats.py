@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# price_stats.py
+#
+# Running per-category price aggregates, kept next to each booking's
+# price_history so trend queries do not rescan the history:
+#   "price_stats": {
+#     "checks": 42,                       # price records folded in
+#     "categories": {
+#       "Economy Car": {"min": 280.0, "max": 340.0, "sum": 12600.0, "count": 42,
+#                       "last": 300.0, "previous": 295.0},
+#       ...
+#     }
+#   }
+# last/previous are the category's price in the latest and second-latest
+# record (None when it was missing there), which is what trends report as
+# current and previous price. "checks" lets readers spot stats that fell
+# behind price_history (e.g. records appended by another script) and
+# rebuild them. Rolled-up records (history_retention.py) are folded in
+# from their per-category low/high/sum/count, so retention keeps these
+# exact.
+#
+#   python3 price_stats.py rebuild     recompute every booking's aggregates
+
+import argparse
+from typing import Dict, List, Optional
+
+
+def empty_stats() -> Dict:
+    return {"checks": 0, "categories": {}}
+
+
+def add_record(stats: Dict, prices: Dict[str, float]):
+    """Fold one price record into stats in place."""
+    categories = stats["categories"]
+    for category, entry in categories.items():
+        entry["previous"] = entry["last"]
+        entry["last"] = None
+    for category, price in prices.items():
+        if price is None:
+            continue
+        entry = categories.get(category)
+        if entry is None:
+            # First sighting: missing from every earlier record, so no previous price
+            entry = categories[category] = {
+                "min": price, "max": price, "sum": 0.0, "count": 0, "last": None,
+                "previous": None,
+            }
+        entry["min"] = min(entry["min"], price)
+        entry["max"] = max(entry["max"], price)
+        entry["sum"] += price
+        entry["count"] += 1
+        entry["last"] = price
+    stats["checks"] += 1
+
+
+def add_rollup(stats: Dict, rollup: Dict):
+    """Fold a rolled-up record's OHLC summary into stats in place."""
+    categories = stats["categories"]
+    for entry in categories.values():
+        entry["previous"] = entry["last"]
+        entry["last"] = None
+    for category, ohlc in rollup["categories"].items():
+        entry = categories.get(category)
+        if entry is None:
+            entry = categories[category] = {
+                "min": ohlc["low"], "max": ohlc["high"], "sum": 0.0, "count": 0, "last": None,
+                "previous": None,
+            }
+        entry["min"] = min(entry["min"], ohlc["low"])
+        entry["max"] = max(entry["max"], ohlc["high"])
+        entry["sum"] += ohlc["sum"]
+        entry["count"] += ohlc["count"]
+        entry["last"] = ohlc["close"]
+    stats["checks"] += 1
+
+
+def build_stats(records: List[Dict]) -> Dict:
+    """Aggregate a full price_history list."""
+    stats = empty_stats()
+    for record in records:
+        if "rollup" in record:
+            add_rollup(stats, record["rollup"])
+        else:
+            add_record(stats, record.get("prices", {}))
+    return stats
+
+
+def current_stats(booking: Dict, records_key: str = "price_history") -> Dict:
+    """The booking's stats, rebuilt first if missing or behind its history."""
+    records = booking.get(records_key, [])
+    stats = booking.get("price_stats")
+    if not stats or stats.get("checks") != len(records):
+        stats = booking["price_stats"] = build_stats(records)
+    return stats
+
+
+def category_trend(stats: Dict, category: str) -> Optional[Dict]:
+    """{"current", "previous_price", "lowest", "highest", "average",
+    "total_checks"} for one category, or None if it was never priced."""
+    entry = stats["categories"].get(category)
+    if entry is None or not entry["count"]:
+        return None
+    return {
+        "current": entry["last"],
+        "previous_price": entry["previous"],
+        "lowest": entry["min"],
+        "highest": entry["max"],
+        "average": entry["sum"] / entry["count"],
+        "total_checks": entry["count"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain per-booking price aggregates")
+    parser.add_argument("command", choices=("rebuild",))
+    parser.add_argument("--backend", default=None, help="Storage backend (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+
+    from booking_tracker import BookingTracker
+
+    tracker = BookingTracker.from_config(args.backend)
+    count = tracker.rebuild_price_stats()
+    if count is None:
+        print("Nothing to rebuild: the sqlite backend aggregates prices in SQL on every read")
+    else:
+        print(f"Rebuilt price aggregates for {count} booking(s)")
+
+
+if __name__ == "__main__":
+    main()
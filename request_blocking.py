@@ -0,0 +1,116 @@
+# request_blocking.py
+#
+# context.route() policy that drops page weight the scraper never reads:
+# images, media, fonts and requests to third-party hosts (ads, analytics,
+# beacons). Hosts on the allowlist are only subject to the resource-type
+# rules, so the search form and its XHRs keep working.
+
+from urllib.parse import urlparse
+
+from config import BLOCK_ALLOW_HOSTS, BLOCK_PROFILE
+
+# Resource types dropped by each profile. Third-party hosts are blocked by
+# every profile except "off".
+BLOCK_PROFILES = {
+    "off": None,
+    "standard": {"image", "media", "font"},
+    "strict": {"image", "media", "font", "stylesheet"},
+}
+
+# Typical transfer sizes used to estimate bytes saved. Aborted requests never
+# report a size, so these are rough per-type averages, not measurements.
+ESTIMATED_BYTES = {
+    "image": 25_000,
+    "media": 250_000,
+    "font": 40_000,
+    "stylesheet": 20_000,
+    "script": 40_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+# URLs that are never blocked, whatever the profile says
+ALWAYS_ALLOW = ("rentalCarSearch",)
+
+
+class RequestBlocker:
+    """Route handler that aborts non-essential requests and counts the savings."""
+
+    def __init__(self, blocked_types, allowed_hosts):
+        self.blocked_types = set(blocked_types)
+        self.allowed_hosts = [host.lower().lstrip(".") for host in allowed_hosts]
+        self.search = self._empty_counters()
+        self.totals = self._empty_counters()
+
+    @classmethod
+    def from_config(cls, profile=None):
+        """Build the blocker for BLOCK_PROFILE, or return None when it is 'off'."""
+        profile = (profile or BLOCK_PROFILE).lower()
+        if profile not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown block profile '{profile}'. Use one of {sorted(BLOCK_PROFILES)}")
+        blocked_types = BLOCK_PROFILES[profile]
+        if blocked_types is None:
+            return None
+        return cls(blocked_types, BLOCK_ALLOW_HOSTS)
+
+    @staticmethod
+    def _empty_counters():
+        return {"allowed": 0, "blocked": 0, "bytes_saved": 0, "by_type": {}}
+
+    def is_allowed_host(self, host):
+        host = (host or "").lower()
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts)
+
+    def should_block(self, url, resource_type):
+        """Decide whether a request should be aborted."""
+        if any(marker in url for marker in ALWAYS_ALLOW):
+            return False
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            return False
+        if not self.is_allowed_host(parsed.hostname):
+            return True
+        return resource_type in self.blocked_types
+
+    def _count(self, blocked, resource_type):
+        for counters in (self.search, self.totals):
+            if blocked:
+                counters["blocked"] += 1
+                counters["bytes_saved"] += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+                counters["by_type"][resource_type] = counters["by_type"].get(resource_type, 0) + 1
+            else:
+                counters["allowed"] += 1
+
+    def handle_route(self, route):
+        """Sync API route handler: context.route("**/*", blocker.handle_route)."""
+        request = route.request
+        blocked = self.should_block(request.url, request.resource_type)
+        self._count(blocked, request.resource_type)
+        if blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_route_async(self, route):
+        """Async API route handler for async_price_monitor."""
+        request = route.request
+        blocked = self.should_block(request.url, request.resource_type)
+        self._count(blocked, request.resource_type)
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def start_search(self):
+        """Reset the per-search counters; call before each booking."""
+        self.search = self._empty_counters()
+
+    def report(self):
+        """Print what the current search saved."""
+        counters = self.search
+        by_type = ", ".join(f"{name}={count}" for name, count in sorted(counters["by_type"].items()))
+        print(
+            f"Request blocking: {counters['blocked']} blocked / {counters['allowed']} allowed, "
+            f"~{counters['bytes_saved'] / 1024:.0f} KB saved" + (f" ({by_type})" if by_type else "")
+        )
@@ -0,0 +1,174 @@
+# retry.py
+#
+# Failure handling for price checks:
+#   - typed errors so a failed booking says *what* failed
+#   - exponential backoff with jitter between in-place attempts
+#   - RetryScheduler, which hands bookings to workers and gives failed ones
+#     one more try at the end of the run while there is time left
+#   - CircuitBreaker, which stops the run after several bookings in a row
+#     fail, since by then the site is almost certainly blocking us
+
+import random
+import threading
+import time
+from collections import deque
+
+from config import (
+    CIRCUIT_BREAKER_THRESHOLD,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_REQUEUE,
+    RUN_TIME_BUDGET_MINUTES,
+)
+
+
+class ScrapeError(Exception):
+    """A booking scrape failed. kind names the stage; retryable says whether
+    trying the same booking again can help."""
+
+    kind = "unexpected"
+    retryable = True
+
+
+class NavigationError(ScrapeError):
+    kind = "navigation"
+
+
+class FormError(ScrapeError):
+    kind = "form"
+
+
+class ResultsTimeoutError(ScrapeError):
+    kind = "results_timeout"
+
+
+class ExtractionError(ScrapeError):
+    """Results rendered but no prices could be read; the page layout is the
+    likely cause, so retrying right away will not help."""
+
+    kind = "extraction"
+    retryable = False
+
+
+class BlockedError(ScrapeError):
+    """The search endpoint answered 403/429."""
+
+    kind = "blocked"
+    retryable = False
+
+
+def error_kind(error):
+    """Classification used in logs and by the circuit breaker."""
+    if error is None:
+        return None
+    return error.kind if isinstance(error, ScrapeError) else "unexpected"
+
+
+def is_retryable(error):
+    return error.retryable if isinstance(error, ScrapeError) else True
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Seconds to wait before retry number `attempt` (1-based).
+
+    Exponential with "equal jitter": half the step is fixed, half random, so
+    workers that failed together do not retry in lockstep.
+    """
+    base = RETRY_BASE_DELAY if base is None else base
+    cap = RETRY_MAX_DELAY if cap is None else cap
+    step = min(cap, base * 2 ** (attempt - 1))
+    return step / 2 + random.uniform(0, step / 2)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failed bookings; a success resets it."""
+
+    def __init__(self, threshold=None):
+        self.threshold = CIRCUIT_BREAKER_THRESHOLD if threshold is None else threshold
+        self.consecutive = 0
+        self.open = False
+        self.last_kinds = []
+
+    def record_success(self):
+        self.consecutive = 0
+        self.last_kinds = []
+
+    def record_failure(self, kind):
+        """Count a failed booking. Returns True if this opened the breaker."""
+        self.consecutive += 1
+        self.last_kinds.append(kind)
+        if self.threshold and self.consecutive >= self.threshold and not self.open:
+            self.open = True
+            print(
+                f"\nCircuit breaker open: {self.consecutive} bookings failed in a row "
+                f"({', '.join(self.last_kinds[-self.consecutive:])}) — stopping the run"
+            )
+            return True
+        return False
+
+
+class RetryScheduler:
+    """Hands (index, booking) pairs to workers.
+
+    Every booking is handed out once. A booking whose retries all failed with a
+    retryable error goes to the back of the run and is handed out one more
+    time, if the run is still inside its time budget. Nothing more is handed
+    out once the circuit breaker opens. Safe to share across worker threads.
+    """
+
+    def __init__(self, bookings, breaker=None, budget_seconds=None, requeue=None):
+        self._pending = deque(enumerate(bookings))
+        self._requeued = deque()
+        self._requeued_indices = set()
+        self._lock = threading.Lock()
+        self.breaker = breaker or CircuitBreaker()
+        if budget_seconds is None:
+            budget_seconds = RUN_TIME_BUDGET_MINUTES * 60
+        self.deadline = time.monotonic() + budget_seconds if budget_seconds else None
+        self.requeue = RETRY_REQUEUE if requeue is None else requeue
+
+    def time_left(self):
+        return self.deadline is None or time.monotonic() < self.deadline
+
+    def next(self):
+        """Return the next (index, booking), or None when the worker should stop."""
+        with self._lock:
+            if self.breaker.open:
+                return None
+            if self._pending:
+                return self._pending.popleft()
+            if self._requeued and self.time_left():
+                index, booking = self._requeued.popleft()
+                print(f"\nRetrying {booking['location']} {booking['pickup_date']} at the end of the run")
+                return index, booking
+            return None
+
+    def has_work(self):
+        with self._lock:
+            return not self.breaker.open and bool(self._pending or (self._requeued and self.time_left()))
+
+    def record(self, index, booking, prices, error=None):
+        """Record a booking's outcome. Returns True if it is final (report it),
+        False if it was requeued for the end of the run."""
+        with self._lock:
+            if prices:
+                self.breaker.record_success()
+                return True
+            self.breaker.record_failure(error_kind(error) or "no_prices")
+            if (
+                self.requeue
+                and not self.breaker.open
+                and is_retryable(error)
+                and index not in self._requeued_indices
+                and self.time_left()
+            ):
+                self._requeued_indices.add(index)
+                self._requeued.append((index, booking))
+                return False
+            return True
+
+    def remaining(self):
+        """Bookings never finished (left over when the breaker opened)."""
+        with self._lock:
+            return len(self._pending) + len(self._requeued)
@@ -0,0 +1,229 @@
+# screenshots.py
+#
+# Screenshot policy for price checks. The browser still has to render the
+# capture, but encoding conversions, file writes and directory rotation run
+# on a background thread so they stay off the booking's critical path.
+#
+# SCREENSHOT_POLICY:
+#   off        - never capture
+#   on-failure - capture only when a booking fails
+#   sampled    - failures plus SCREENSHOT_SAMPLE_RATE of successful bookings
+#   all        - every booking (the old behaviour)
+# Captures older than SCREENSHOT_MAX_AGE_DAYS are deleted, then the oldest
+# are deleted until the directory fits in SCREENSHOT_MAX_TOTAL_MB.
+
+import atexit
+import io
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+from config import (
+    SCREENSHOT_CLIP_SELECTOR,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_MAX_AGE_DAYS,
+    SCREENSHOT_MAX_TOTAL_MB,
+    SCREENSHOT_PATH,
+    SCREENSHOT_POLICY,
+    SCREENSHOT_QUALITY,
+    SCREENSHOT_SAMPLE_RATE,
+)
+
+SCREENSHOT_POLICIES = ("off", "on-failure", "sampled", "all")
+SCREENSHOT_FORMATS = ("jpeg", "webp", "png")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+CLIP_TIMEOUT = 2000
+
+
+def webp_supported():
+    try:
+        from PIL import Image  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class Screenshotter:
+    """Decides which bookings get a screenshot and writes them in the background."""
+
+    def __init__(self, policy="on-failure", fmt="jpeg", quality=70, clip_selector="",
+                 directory="screenshots", sample_rate=0.1, max_age_days=7, max_total_mb=200):
+        if policy not in SCREENSHOT_POLICIES:
+            raise ValueError(f"Unknown screenshot policy '{policy}'. Use one of {SCREENSHOT_POLICIES}")
+        if fmt not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Unknown screenshot format '{fmt}'. Use one of {SCREENSHOT_FORMATS}")
+        if fmt == "webp" and not webp_supported():
+            print("WebP screenshots need Pillow (pip install Pillow); using JPEG")
+            fmt = "jpeg"
+        self.policy = policy
+        self.fmt = fmt
+        self.quality = quality
+        self.clip_selector = clip_selector
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_age_days = max_age_days
+        self.max_total_bytes = int(max_total_mb * 1024 * 1024)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        return cls(
+            policy=SCREENSHOT_POLICY,
+            fmt=SCREENSHOT_FORMAT,
+            quality=SCREENSHOT_QUALITY,
+            clip_selector=SCREENSHOT_CLIP_SELECTOR,
+            directory=SCREENSHOT_PATH.rstrip("/") or "screenshots",
+            sample_rate=SCREENSHOT_SAMPLE_RATE,
+            max_age_days=SCREENSHOT_MAX_AGE_DAYS,
+            max_total_mb=SCREENSHOT_MAX_TOTAL_MB,
+        )
+
+    def should_capture(self, ok):
+        """Whether a booking that succeeded (ok=True) or failed gets a capture."""
+        if self.policy == "off":
+            return False
+        if not ok or self.policy == "all":
+            return True
+        if self.policy == "sampled":
+            return random.random() < self.sample_rate
+        return False
+
+    def _filename(self, prefix, booking):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = "jpg" if self.fmt == "jpeg" else self.fmt
+        return f"{prefix}_{booking['location']}_{timestamp}.{extension}"
+
+    def _screenshot_kwargs(self):
+        # Chrome encodes JPEG itself; WebP is converted from PNG on the writer thread
+        if self.fmt == "jpeg":
+            return {"type": "jpeg", "quality": self.quality}
+        return {"type": "png"}
+
+    def capture(self, page, booking, ok):
+        """Capture the page (or SCREENSHOT_CLIP_SELECTOR) and queue it for writing.
+
+        Callers check should_capture() first. Returns the queued filename, or
+        None when the capture failed.
+        """
+        name = self._filename("results" if ok else "error", booking)
+        try:
+            data = None
+            if self.clip_selector:
+                try:
+                    data = page.locator(self.clip_selector).first.screenshot(
+                        timeout=CLIP_TIMEOUT, **self._screenshot_kwargs()
+                    )
+                except Exception:
+                    data = None
+            if data is None:
+                data = page.screenshot(**self._screenshot_kwargs())
+        except Exception:
+            print("Screenshot failed (page already closed)")
+            return None
+        self.submit(name, data)
+        return name
+
+    async def capture_async(self, page, booking, ok):
+        """capture() for an async_api page."""
+        name = self._filename("results" if ok else "error", booking)
+        try:
+            data = None
+            if self.clip_selector:
+                try:
+                    data = await page.locator(self.clip_selector).first.screenshot(
+                        timeout=CLIP_TIMEOUT, **self._screenshot_kwargs()
+                    )
+                except Exception:
+                    data = None
+            if data is None:
+                data = await page.screenshot(**self._screenshot_kwargs())
+        except Exception:
+            print("Screenshot failed (page already closed)")
+            return None
+        self.submit(name, data)
+        return name
+
+    def submit(self, name, data):
+        """Queue captured bytes for the writer thread."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._write_loop, name="screenshot-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((name, data))
+
+    def _write_loop(self):
+        while True:
+            name, data = self._queue.get()
+            try:
+                self._write(name, data)
+            except Exception as e:
+                print(f"Could not save screenshot {name}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, data):
+        if not isinstance(data, (bytes, bytearray)):
+            return
+        if self.fmt == "webp":
+            from PIL import Image
+            buffer = io.BytesIO()
+            Image.open(io.BytesIO(data)).save(buffer, format="WEBP", quality=self.quality)
+            data = buffer.getvalue()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), "wb") as f:
+            f.write(data)
+        print(f"Screenshot saved: {name}")
+
+    def flush(self):
+        """Wait for queued captures to be written, then rotate old ones out."""
+        self._queue.join()
+        self.rotate()
+
+    def rotate(self):
+        """Delete captures past the age limit, then the oldest until under the size cap.
+
+        Returns the number of files removed.
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        removed = 0
+        cutoff = time.time() - self.max_age_days * 86400
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.max_total_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            print(f"Rotated out {removed} old screenshot(s)")
+        return removed
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_screenshotter():
+    """Process-wide Screenshotter built from config, flushed at exit."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = Screenshotter.from_config()
+            atexit.register(_default.flush)
+        return _default
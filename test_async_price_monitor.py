@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for async_price_monitor.py — asyncio Playwright engine.
+Run: python3 -m pytest test_async_price_monitor.py -v
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _mock_async_page():
+    """Return a MagicMock page whose awaitable methods are AsyncMocks."""
+    page = MagicMock(name="page")
+    locator = MagicMock(name="locator")
+    for name in ("wait_for", "focus", "type", "input_value", "count",
+                 "is_checked", "click"):
+        setattr(locator, name, AsyncMock())
+    page.locator.return_value = locator
+    for name in ("wait_for_timeout", "eval_on_selector", "select_option",
+                 "goto", "screenshot", "wait_for_selector", "title"):
+        setattr(page, name, AsyncMock())
+    page.keyboard.press = AsyncMock()
+    return page, locator
+
+
+class TestFillSearchFormAsync:
+    """Tests for the async fill_search_form(page, booking)."""
+
+    BOOKING = {
+        "location": "KOA",
+        "pickup_date": "04/01/2025",
+        "dropoff_date": "04/08/2025",
+        "pickup_time": "12:00 PM",
+        "dropoff_time": "12:00 PM",
+        "focus_category": "Economy Car",
+    }
+
+    def test_returns_true_when_dates_match(self):
+        """Returns True when both date fields read back the typed value."""
+        page, locator = _mock_async_page()
+        locator.input_value.side_effect = ["KOA", "KOA", "04/01/2025", "04/08/2025"]
+        locator.count.return_value = 0
+        locator.is_checked.return_value = True
+        from async_price_monitor import fill_search_form
+        assert asyncio.run(fill_search_form(page, self.BOOKING)) is True
+
+    def test_returns_false_when_date_entry_fails(self):
+        """Returns False when enter_date() never verifies."""
+        page, _ = _mock_async_page()
+        with patch("async_price_monitor.enter_location", AsyncMock()), \
+             patch("async_price_monitor.enter_date", AsyncMock(return_value=False)):
+            from async_price_monitor import fill_search_form
+            assert asyncio.run(fill_search_form(page, self.BOOKING)) is False
+
+
+class TestScrapeBookingAsync:
+    """Tests for the async scrape_booking() failure path."""
+
+    BOOKING = TestFillSearchFormAsync.BOOKING
+
+    def test_results_timeout_prints_response_and_raises_blocked(self, capsys):
+        """Like the sync engine, a missing results page reports what rentalCarSearch.act sent."""
+        page, _ = _mock_async_page()
+        response = {"status": 403, "body": "Access denied"}
+        with patch("async_price_monitor.fill_search_form", AsyncMock(return_value=True)), \
+             patch("async_price_monitor.click_search_and_capture", AsyncMock(return_value=response)), \
+             patch("async_price_monitor.wait_for_results", AsyncMock(return_value=False)):
+            from async_price_monitor import scrape_booking
+            from retry import BlockedError
+            with pytest.raises(BlockedError):
+                asyncio.run(scrape_booking(page, self.BOOKING))
+
+        out = capsys.readouterr().out
+        assert "Focus category: Economy Car" in out
+        assert "rentalCarSearch.act response status: 403" in out
+        assert "Access denied" in out
+
+
+class TestScrapeBookingsAsync:
+    """Tests for the async scrape_bookings() — contexts on one shared browser."""
+
+    BOOKINGS = [{"location": code} for code in ("KOA", "LIH", "OGG")]
+
+    def _mock_playwright(self):
+        context = MagicMock(name="context")
+        context.add_init_script = AsyncMock()
+        context.close = AsyncMock()
+        context.route = AsyncMock()
+        context.new_page = AsyncMock(return_value=MagicMock(wait_for_timeout=AsyncMock()))
+        browser = MagicMock(name="browser")
+        browser.new_context = AsyncMock(return_value=context)
+        browser.close = AsyncMock()
+        pw = MagicMock(name="playwright")
+        pw.chromium.launch = AsyncMock(return_value=browser)
+        pw.stop = AsyncMock()
+        factory = MagicMock()
+        factory.return_value.start = AsyncMock(return_value=pw)
+        return factory, pw, browser
+
+    def test_launches_one_browser_with_a_context_per_worker(self):
+        """Workers share one browser; each opens its own context."""
+        factory, pw, browser = self._mock_playwright()
+        with patch("async_price_monitor.async_playwright", factory), \
+             patch("async_price_monitor.attempt_booking", AsyncMock(return_value=({"A": 1.0}, None))):
+            from async_price_monitor import scrape_bookings
+            asyncio.run(scrape_bookings(self.BOOKINGS, lambda i, p: None, workers=2))
+
+        assert pw.chromium.launch.await_count == 1
+        assert browser.new_context.await_count == 2
+
+    def test_every_booking_is_reported_once(self):
+        """on_result fires once per booking, with the scraped prices."""
+        factory, *_ = self._mock_playwright()
+        results = {}
+        with patch("async_price_monitor.async_playwright", factory), \
+             patch("async_price_monitor.attempt_booking", AsyncMock(return_value=({"A": 1.0}, None))):
+            from async_price_monitor import scrape_bookings
+            stats = asyncio.run(scrape_bookings(
+                self.BOOKINGS, lambda i, p: results.setdefault(i, p), workers=2
+            ))
+
+        assert results == {0: {"A": 1.0}, 1: {"A": 1.0}, 2: {"A": 1.0}}
+        assert sum(s["bookings"] for s in stats) == 3
+
+
+class TestRunPriceChecksEngine:
+    """price_monitor.run_price_checks(engine='async') delegates to the async engine."""
+
+    def test_async_engine_is_dispatched(self):
+        tracker = MagicMock()
+        with patch("async_price_monitor.run_price_checks", AsyncMock(return_value=True)) as mock_run:
+            from price_monitor import run_price_checks
+            assert run_price_checks(tracker, [], workers=3, engine="async") is True
+        mock_run.assert_awaited_once_with(tracker, [], workers=3)
@@ -0,0 +1,253 @@
+# test_booking_storage.py
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from booking_storage import SqliteBookingTracker
+from booking_tracker import BookingTracker
+
+BOOKING = {
+    "location": "KOA",
+    "pickup_date": "04/01/2030",
+    "dropoff_date": "04/08/2030",
+    "focus_category": "Economy Car",
+}
+BOOKING_ID = "KOA_04012030_04082030_EconomyCar"
+
+
+def _sqlite(tmp_path, export=True):
+    return SqliteBookingTracker(
+        db_file=str(tmp_path / "price_history.db"),
+        export_file=str(tmp_path / "export.json") if export else None,
+    )
+
+
+class TestSqliteBookingTracker:
+    def test_add_and_list_active(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.add_booking(**dict(BOOKING, location="LIH"))
+
+        active = tracker.get_active_bookings()
+        assert [b["location"] for b in active] == ["KOA", "LIH"]
+        assert active[0]["location_full_name"] == "Kailua-Kona International Airport"
+        assert active[0]["price_history"] == []
+
+    def test_update_prices_and_trends(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING, holding_price=320.0)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0, "Minivan": 450.0})
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 280.0, "Minivan": 440.0})
+        tracker.update_prices(BOOKING_ID, {"Minivan": 430.0})
+
+        trends = tracker.get_price_trends(BOOKING_ID)["focus_category"]
+        assert trends["current"] is None
+        assert trends["previous_price"] == 280.0
+        assert trends["holding_price"] == 320.0
+        assert (trends["lowest"], trends["highest"], trends["average"]) == (280.0, 300.0, 290.0)
+        assert trends["total_checks"] == 2
+
+    def test_handed_out_bookings_see_new_prices(self, tmp_path):
+        """record_booking_prices reads price_history[-2] off the active booking dict."""
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        booking = tracker.get_active_bookings()[0]
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 280.0})
+        assert [r["prices"]["Economy Car"] for r in booking["price_history"]] == [300.0, 280.0]
+
+    def test_trends_without_history(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING)
+        assert tracker.get_price_trends(BOOKING_ID) == {}
+        with pytest.raises(ValueError):
+            tracker.get_price_trends("missing")
+
+    def test_cleanup_expired_deletes_history(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**dict(BOOKING, pickup_date="01/01/2020", dropoff_date="01/05/2020"))
+        tracker.update_prices("KOA_01012020_01052020_EconomyCar", {"Economy Car": 300.0})
+
+        assert tracker.cleanup_expired_bookings() == ["KOA_01012020_01052020_EconomyCar"]
+        assert tracker.get_active_bookings() == []
+        assert tracker.db.execute("SELECT COUNT(*) FROM price_points").fetchone()[0] == 0
+
+    def test_extra_fields_round_trip(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_date_sweep(BOOKING_ID, {"days": 1, "rows": []})
+        tracker.update_booking_details(BOOKING_ID, focus_category="Minivan")
+
+        booking = _sqlite(tmp_path).get_active_bookings()[0]
+        assert booking["date_sweep"] == {"days": 1, "rows": []}
+        assert booking["focus_category"] == "Minivan"
+
+    def test_compact_exports_json(self, tmp_path):
+        tracker = _sqlite(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        tracker.compact()
+
+        data = json.loads((tmp_path / "export.json").read_text())
+        assert data["metadata"]["active_bookings"] == [BOOKING_ID]
+        assert data["bookings"][BOOKING_ID]["price_history"][0]["prices"] == {"Economy Car": 300.0}
+
+
+class TestImportExport:
+    def test_json_round_trip(self, tmp_path):
+        source = BookingTracker(history_file=str(tmp_path / "price_history.json"), price_log=False)
+        source.add_booking(**BOOKING, holding_price=310.0)
+        source.add_booking(**dict(BOOKING, location="LIH"))
+        source.update_prices(BOOKING_ID, {"Economy Car": 300.0, "Minivan": 450.0})
+        source.bookings["metadata"]["active_bookings"].remove("LIH_04012030_04082030_EconomyCar")
+        source.save_bookings()
+
+        tracker = _sqlite(tmp_path, export=False)
+        assert tracker.import_json(str(tmp_path / "price_history.json")) == 2
+        assert [b["location"] for b in tracker.get_active_bookings()] == ["KOA"]
+        assert tracker.get_price_trends(BOOKING_ID) == source.get_price_trends(BOOKING_ID)
+
+        exported = tracker.export_data()
+        original = json.loads((tmp_path / "price_history.json").read_text())
+        for data in (exported, original):
+            data["metadata"] = {"active_bookings": data["metadata"]["active_bookings"]}
+        assert exported == original
+
+    def test_rolled_up_history_round_trip(self, tmp_path):
+        """Rollups keep their OHLC summary through import and export, so lows and highs survive."""
+        from datetime import datetime, timedelta
+        from history_retention import apply_tiers, parse_tiers
+
+        now = datetime(2030, 3, 1, 12, 0)
+        history = []
+        for days_ago in range(40, 0, -1):
+            price = 199.0 if days_ago == 30 else 300.0 + days_ago % 5
+            when = (now - timedelta(days=days_ago)).isoformat()
+            history.append({"timestamp": when, "prices": {"Economy Car": price},
+                            "lowest_price": {"category": "Economy Car", "price": price}})
+        source = BookingTracker(history_file=str(tmp_path / "price_history.json"), price_log=False)
+        source.add_booking(**BOOKING)
+        source.bookings["bookings"][BOOKING_ID]["price_history"] = history
+        source.save_bookings()
+        source.apply_retention("full:7,day:20,week", now=now)
+        assert len(source.bookings["bookings"][BOOKING_ID]["price_history"]) == len(
+            apply_tiers(history, parse_tiers("full:7,day:20,week"), now))
+
+        tracker = _sqlite(tmp_path, export=False)
+        tracker.import_json(str(tmp_path / "price_history.json"))
+        trends = tracker.get_price_trends(BOOKING_ID)["focus_category"]
+        assert (trends["lowest"], trends["total_checks"]) == (199.0, 40)
+        expected = source.get_price_trends(BOOKING_ID)["focus_category"]
+        assert trends["average"] == pytest.approx(expected["average"])
+        assert (trends["current"], trends["highest"]) == (expected["current"], expected["highest"])
+
+        exported = tracker.export_data()["bookings"][BOOKING_ID]
+        original = json.loads((tmp_path / "price_history.json").read_text())["bookings"][BOOKING_ID]
+        assert exported["price_history"] == original["price_history"]
+        assert exported["price_stats"]["categories"]["Economy Car"]["min"] == 199.0
+
+    def test_adds_rollup_column_to_older_databases(self, tmp_path):
+        import sqlite3
+        db = sqlite3.connect(str(tmp_path / "price_history.db"))
+        db.execute("CREATE TABLE price_snapshots (id INTEGER PRIMARY KEY, booking_id TEXT NOT NULL, "
+                   "timestamp TEXT NOT NULL, lowest_category TEXT, lowest_price REAL)")
+        db.close()
+        tracker = _sqlite(tmp_path, export=False)
+        columns = {row["name"] for row in tracker.db.execute("PRAGMA table_info(price_snapshots)")}
+        assert "rollup" in columns
+
+    def test_import_refuses_non_empty_database(self, tmp_path):
+        (tmp_path / "price_history.json").write_text(json.dumps({"metadata": {}, "bookings": {}}))
+        tracker = _sqlite(tmp_path, export=False)
+        tracker.add_booking(**BOOKING)
+        with pytest.raises(ValueError):
+            tracker.import_json(str(tmp_path / "price_history.json"))
+
+
+class TestSqliteRetention:
+    NOW = datetime(2030, 3, 1, 12, 0)
+
+    def _seed(self, tracker):
+        tracker.add_booking(**BOOKING)
+        with tracker.db:
+            for days_ago in range(40, 0, -1):
+                price = 199.0 if days_ago == 30 else 300.0 + days_ago % 5
+                tracker._insert_snapshot(BOOKING_ID, {
+                    "timestamp": (self.NOW - timedelta(days=days_ago)).isoformat(),
+                    "prices": {"Economy Car": price},
+                    "lowest_price": {"category": "Economy Car", "price": price},
+                })
+
+    def test_collapses_old_snapshots_into_rollups(self, tmp_path):
+        now = self.NOW
+        tracker = _sqlite(tmp_path)
+        self._seed(tracker)
+        before = tracker.get_price_trends(BOOKING_ID)["focus_category"]
+        booking = tracker.get_active_bookings()[0]
+
+        removed = tracker.apply_retention("full:7,day:20,week", now=now)
+        snapshots = tracker.db.execute("SELECT COUNT(*) FROM price_snapshots").fetchone()[0]
+        assert removed > 0 and snapshots == 40 - removed
+        assert len(booking["price_history"]) == snapshots
+        assert tracker.apply_retention("full:7,day:20,week", now=now) == 0
+
+        after = tracker.get_price_trends(BOOKING_ID)["focus_category"]
+        for key in ("current", "lowest", "highest", "total_checks"):
+            assert after[key] == before[key]
+        assert after["average"] == pytest.approx(before["average"])
+
+        tracker.compact()
+        data = json.loads((tmp_path / "export.json").read_text())
+        assert len(data["bookings"][BOOKING_ID]["price_history"]) == snapshots
+
+    def test_first_rollup_exports_a_backup(self, tmp_path):
+        tracker = _sqlite(tmp_path, export=False)
+        self._seed(tracker)
+        tracker.apply_retention("full:7,day:20,week", now=self.NOW)
+        data = json.loads((tmp_path / "price_history.pre-retention.json").read_text())
+        assert len(data["bookings"][BOOKING_ID]["price_history"]) == 40
+
+    def test_commits_with_enclosing_transaction(self, tmp_path):
+        tracker = _sqlite(tmp_path, export=False)
+        self._seed(tracker)
+        count = "SELECT COUNT(*) FROM price_snapshots"
+        with tracker.transaction():
+            tracker.update_prices(BOOKING_ID, {"Economy Car": 310.0})
+            removed = tracker.apply_retention("full:7,day:20,week", now=self.NOW)
+            other = _sqlite(tmp_path, export=False)
+            assert other.db.execute(count).fetchone()[0] == 40
+            other.close()
+        reopened = _sqlite(tmp_path, export=False)
+        assert reopened.db.execute(count).fetchone()[0] == 41 - removed
+        assert {"Economy Car": 310.0} in [r["prices"] for r in reopened._history(BOOKING_ID)]
+
+
+class TestSharedInit:
+    def test_has_every_base_attribute(self, tmp_path):
+        """Settings added to BookingTracker's shared setup reach the SQLite tracker too."""
+        base = BookingTracker(history_file=str(tmp_path / "price_history.json"), price_log=False)
+        tracker = _sqlite(tmp_path)
+        assert set(vars(base)) - set(vars(tracker)) == {"bookings"}
+        assert tracker.price_log is False and tracker.pending_ops == 0
+
+
+class TestFromConfig:
+    def test_selects_backend(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert type(BookingTracker.from_config("json")) is BookingTracker
+        assert isinstance(BookingTracker.from_config("sqlite"), SqliteBookingTracker)
+        with pytest.raises(ValueError):
+            BookingTracker.from_config("csv")
+
+
+class TestSqliteTransaction:
+    def test_commits_once_at_end_of_block(self, tmp_path):
+        tracker = _sqlite(tmp_path, export=False)
+        tracker.add_booking(**BOOKING)
+        with tracker.transaction():
+            tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+            other = _sqlite(tmp_path, export=False)
+            assert other.get_price_trends(BOOKING_ID) == {}
+            other.close()
+        assert _sqlite(tmp_path, export=False).get_price_trends(BOOKING_ID)["focus_category"]["current"] == 300.0
@@ -0,0 +1,167 @@
+# test_booking_tracker.py
+import json
+
+from booking_tracker import BookingTracker
+
+BOOKING = {
+    "location": "KOA",
+    "pickup_date": "04/01/2030",
+    "dropoff_date": "04/08/2030",
+    "focus_category": "Economy Car",
+}
+BOOKING_ID = "KOA_04012030_04082030_EconomyCar"
+
+
+def _tracker(tmp_path, **kwargs):
+    kwargs.setdefault("price_log", True)
+    kwargs.setdefault("compact_every", 0)
+    return BookingTracker(history_file=str(tmp_path / "price_history.json"), **kwargs)
+
+
+def _snapshot(tmp_path):
+    return json.loads((tmp_path / "price_history.json").read_text())
+
+
+def _log_lines(tmp_path):
+    path = tmp_path / "price_history.log.jsonl"
+    return path.read_text().splitlines() if path.exists() else []
+
+
+class TestPriceLog:
+    def test_update_appends_one_line_without_rewriting_snapshot(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        before = (tmp_path / "price_history.json").read_text()
+
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0, "Minivan": 450.0})
+
+        assert (tmp_path / "price_history.json").read_text() == before
+        ops = [json.loads(line) for line in _log_lines(tmp_path)]
+        assert [op["op"] for op in ops] == ["add", "prices"]
+        assert ops[1]["record"]["lowest_price"] == {"category": "Economy Car", "price": 300.0}
+
+    def test_reload_replays_log(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        tracker.update_holding_price(BOOKING_ID, 320.0)
+
+        reloaded = _tracker(tmp_path)
+        booking = reloaded.bookings["bookings"][BOOKING_ID]
+        assert booking["holding_price"] == 320.0
+        assert [r["prices"] for r in booking["price_history"]] == [{"Economy Car": 300.0}]
+        assert reloaded.get_active_bookings() == [booking]
+
+    def test_compact_folds_log_into_snapshot(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        tracker.compact()
+
+        assert _log_lines(tmp_path) == []
+        data = _snapshot(tmp_path)
+        assert data["metadata"]["active_bookings"] == [BOOKING_ID]
+        assert data["metadata"]["log_seq"] == 2
+        assert len(data["bookings"][BOOKING_ID]["price_history"]) == 1
+
+    def test_compacts_every_n_ops(self, tmp_path):
+        tracker = _tracker(tmp_path, compact_every=3)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        assert len(_log_lines(tmp_path)) == 2
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 290.0})
+        assert _log_lines(tmp_path) == []
+        assert len(_snapshot(tmp_path)["bookings"][BOOKING_ID]["price_history"]) == 2
+
+    def test_ops_already_in_snapshot_are_not_replayed(self, tmp_path):
+        """A crash after writing the snapshot but before truncating the log."""
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+        log = (tmp_path / "price_history.log.jsonl").read_text()
+        tracker.compact()
+        (tmp_path / "price_history.log.jsonl").write_text(log)
+
+        reloaded = _tracker(tmp_path)
+        assert len(reloaded.bookings["bookings"][BOOKING_ID]["price_history"]) == 1
+
+    def test_torn_last_line_is_ignored(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        with open(tmp_path / "price_history.log.jsonl", "a") as f:
+            f.write('{"op": "prices", "id": ')
+
+        reloaded = _tracker(tmp_path)
+        assert BOOKING_ID in reloaded.bookings["bookings"]
+
+    def test_delete_is_logged(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        tracker.delete_booking(BOOKING_ID)
+
+        reloaded = _tracker(tmp_path)
+        assert reloaded.bookings["bookings"] == {}
+        assert reloaded.get_active_bookings() == []
+
+    def test_log_off_rewrites_snapshot(self, tmp_path):
+        tracker = _tracker(tmp_path, price_log=False)
+        tracker.add_booking(**BOOKING)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+
+        assert _log_lines(tmp_path) == []
+        assert len(_snapshot(tmp_path)["bookings"][BOOKING_ID]["price_history"]) == 1
+
+
+class TestTransaction:
+    def test_batches_ops_into_one_flush(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        with tracker.transaction():
+            tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+            tracker.update_prices(BOOKING_ID, {"Economy Car": 290.0})
+            assert len(_log_lines(tmp_path)) == 1
+            assert len(tracker.bookings["bookings"][BOOKING_ID]["price_history"]) == 2
+        assert [json.loads(line)["seq"] for line in _log_lines(tmp_path)] == [1, 2, 3]
+
+    def test_nested_blocks_flush_at_outermost(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        with tracker.transaction():
+            tracker.add_booking(**BOOKING)
+            with tracker.transaction():
+                tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+            assert _log_lines(tmp_path) == []
+        assert len(_log_lines(tmp_path)) == 2
+
+    def test_flushes_when_block_raises(self, tmp_path):
+        tracker = _tracker(tmp_path)
+        tracker.add_booking(**BOOKING)
+        try:
+            with tracker.transaction():
+                tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+                raise RuntimeError("scrape crashed")
+        except RuntimeError:
+            pass
+        assert len(_tracker(tmp_path).bookings["bookings"][BOOKING_ID]["price_history"]) == 1
+
+    def test_log_off_rewrites_once(self, tmp_path, monkeypatch):
+        tracker = _tracker(tmp_path, price_log=False)
+        tracker.add_booking(**BOOKING)
+        writes = []
+        monkeypatch.setattr("booking_tracker.atomic_write_json",
+                            lambda path, data, indent=2: writes.append(path))
+        with tracker.transaction():
+            tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0})
+            tracker.update_holding_price(BOOKING_ID, 310.0)
+        assert len(writes) == 1
+
+
+class TestAtomicWrite:
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        from booking_tracker import atomic_write_json
+        path = tmp_path / "price_history.json"
+        atomic_write_json(str(path), {"ok": True})
+        try:
+            atomic_write_json(str(path), {"bad": object()})
+        except TypeError:
+            pass
+        assert json.loads(path.read_text()) == {"ok": True}
@@ -0,0 +1,67 @@
+# test_browser_host.py
+import json
+from unittest.mock import patch
+
+import browser_host
+from browser_host import attach_allowed, find_endpoint, stop
+
+
+def _write_host_file(tmp_path, endpoint="http://127.0.0.1:9222", pid=999999, **launch):
+    host_file = tmp_path / "browser_host.json"
+    host_file.write_text(json.dumps({"endpoint": endpoint, "pid": pid, "started_at": "2025-01-01T00:00:00", **launch}))
+    return str(host_file)
+
+
+class TestFindEndpoint:
+    def test_off_never_attaches(self, tmp_path):
+        host_file = _write_host_file(tmp_path)
+        with patch("browser_host.is_alive", return_value=True):
+            assert find_endpoint(mode="off", host_file=host_file) is None
+
+    def test_no_host_file(self, tmp_path):
+        assert find_endpoint(mode="auto", host_file=str(tmp_path / "missing.json")) is None
+
+    def test_live_host_file_endpoint(self, tmp_path):
+        host_file = _write_host_file(tmp_path)
+        with patch("browser_host.is_alive", return_value=True):
+            assert find_endpoint(mode="auto", host_file=host_file) == "http://127.0.0.1:9222"
+
+    def test_dead_host_is_ignored(self, tmp_path):
+        host_file = _write_host_file(tmp_path)
+        with patch("browser_host.is_alive", return_value=False):
+            assert find_endpoint(mode="auto", host_file=host_file) is None
+
+    def test_explicit_cdp_url_wins(self, tmp_path):
+        host_file = _write_host_file(tmp_path)
+        with patch.object(browser_host, "BROWSER_CDP_URL", "http://remote:9333"), \
+             patch("browser_host.is_alive", return_value=True):
+            assert find_endpoint(mode="auto", host_file=host_file) == "http://remote:9333"
+
+
+class TestAttachAllowed:
+    def test_matching_host(self, tmp_path, capsys):
+        host_file = _write_host_file(tmp_path, channel="chrome", headless=True)
+        assert attach_allowed("chrome", True, host_file=host_file)
+        assert capsys.readouterr().out == ""
+
+    def test_refuses_other_channel(self, tmp_path, capsys):
+        host_file = _write_host_file(tmp_path, channel=None, headless=True)
+        assert not attach_allowed("chrome", True, host_file=host_file)
+        assert "bundled Chromium, not channel=chrome" in capsys.readouterr().out
+
+    def test_warns_about_ignored_args(self, tmp_path, capsys):
+        host_file = _write_host_file(tmp_path)
+        assert attach_allowed("chrome", False, host_file=host_file)
+        out = capsys.readouterr().out
+        assert "channel=chrome" in out and "headless=False" in out
+
+
+class TestStop:
+    def test_removes_host_file_when_process_is_gone(self, tmp_path):
+        host_file = _write_host_file(tmp_path)
+        with patch("browser_host.os.kill", side_effect=ProcessLookupError):
+            assert stop(host_file=host_file) is True
+        assert not (tmp_path / "browser_host.json").exists()
+
+    def test_nothing_to_stop(self, tmp_path):
+        assert stop(host_file=str(tmp_path / "missing.json")) is False
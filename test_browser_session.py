@@ -0,0 +1,112 @@
+# test_browser_session.py
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from browser_session import BrowserSession
+
+
+def _session(tmp_path, mode="storage_state", max_age_hours=72):
+    return BrowserSession(mode, name="worker-0", session_dir=str(tmp_path), max_age_hours=max_age_hours)
+
+
+def _write_meta(session, healthy=True, saved_at=None):
+    saved_at = saved_at or datetime.now()
+    with open(session.meta_file, "w") as f:
+        json.dump({"saved_at": saved_at.isoformat(), "healthy": healthy}, f)
+
+
+def _write_state(session, cookies):
+    with open(session.state_file, "w") as f:
+        json.dump({"cookies": cookies, "origins": []}, f)
+
+
+class TestFromConfig:
+    def test_off_returns_none(self):
+        assert BrowserSession.from_config(mode="off") is None
+
+    def test_unknown_mode_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            BrowserSession("bogus", session_dir=str(tmp_path))
+
+
+class TestStaleReason:
+    def test_no_saved_session(self, tmp_path):
+        assert _session(tmp_path).stale_reason() == "no saved session"
+
+    def test_fresh_healthy_session_is_reusable(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session)
+        _write_state(session, [{"name": "a", "expires": time.time() + 3600}])
+        assert session.stale_reason() is None
+
+    def test_unhealthy_run_is_stale(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session, healthy=False)
+        _write_state(session, [])
+        assert session.stale_reason() == "last run got no prices"
+
+    def test_old_session_is_stale(self, tmp_path):
+        session = _session(tmp_path, max_age_hours=1)
+        _write_meta(session, saved_at=datetime.now() - timedelta(hours=5))
+        _write_state(session, [])
+        assert "old" in session.stale_reason()
+
+    def test_all_cookies_expired(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session)
+        _write_state(session, [{"name": "a", "expires": time.time() - 10}])
+        assert session.stale_reason() == "all cookies expired"
+
+    def test_session_cookies_do_not_expire(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session)
+        _write_state(session, [{"name": "a", "expires": -1}])
+        assert session.stale_reason() is None
+
+    def test_missing_profile_dir(self, tmp_path):
+        session = _session(tmp_path, mode="profile")
+        _write_meta(session)
+        assert session.stale_reason() == "profile directory missing"
+
+
+class TestPrepareAndSave:
+    def test_prepare_invalidates_stale_session(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session, healthy=False)
+        _write_state(session, [])
+        assert session.prepare() is False
+        assert not os.path.exists(session.meta_file)
+        assert not os.path.exists(session.state_file)
+        assert session.context_kwargs() == {}
+
+    def test_prepare_warm_session_restores_state(self, tmp_path):
+        session = _session(tmp_path)
+        _write_meta(session)
+        _write_state(session, [])
+        assert session.prepare() is True
+        assert session.context_kwargs() == {"storage_state": session.state_file}
+
+    def test_prepare_creates_profile_dir(self, tmp_path):
+        session = _session(tmp_path, mode="profile")
+        session.prepare()
+        assert os.path.isdir(session.profile_dir)
+
+    def test_save_healthy_writes_state_and_meta(self, tmp_path):
+        session = _session(tmp_path)
+        context = MagicMock()
+        session.save(context, healthy=True)
+        context.storage_state.assert_called_once_with(path=session.state_file)
+        with open(session.meta_file) as f:
+            assert json.load(f)["healthy"] is True
+
+    def test_save_unhealthy_skips_state(self, tmp_path):
+        session = _session(tmp_path)
+        context = MagicMock()
+        session.save(context, healthy=False)
+        context.storage_state.assert_not_called()
+        assert session.stale_reason() == "last run got no prices"
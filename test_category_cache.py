@@ -0,0 +1,52 @@
+# test_category_cache.py
+import json
+from datetime import datetime, timedelta
+
+from category_cache import CategoryCache
+
+
+def _cache(tmp_path, ttl_hours=24):
+    return CategoryCache(path=str(tmp_path / "category_cache.json"), ttl_hours=ttl_hours)
+
+
+class TestCategoryCache:
+    def test_unknown_location(self, tmp_path):
+        assert _cache(tmp_path).get("KOA") is None
+
+    def test_update_then_get_sorted(self, tmp_path):
+        cache = _cache(tmp_path)
+        cache.update("koa", ["Standard SUV", "Economy Car"])
+        assert cache.get("KOA") == ["Economy Car", "Standard SUV"]
+
+    def test_persists_between_instances(self, tmp_path):
+        _cache(tmp_path).update("KOA", ["Economy Car"])
+        assert _cache(tmp_path).get("KOA") == ["Economy Car"]
+
+    def test_categories_past_ttl_are_dropped(self, tmp_path):
+        cache = _cache(tmp_path, ttl_hours=24)
+        now = datetime.now()
+        cache.update("KOA", ["Minivan"], now=now - timedelta(hours=30))
+        cache.update("KOA", ["Economy Car"], now=now)
+        assert cache.get("KOA", now=now) == ["Economy Car"]
+
+    def test_all_stale_is_a_miss(self, tmp_path):
+        cache = _cache(tmp_path, ttl_hours=1)
+        cache.update("KOA", ["Economy Car"], now=datetime.now() - timedelta(hours=2))
+        assert cache.get("KOA") is None
+
+    def test_sold_out_category_stays_within_ttl(self, tmp_path):
+        cache = _cache(tmp_path)
+        cache.update("KOA", ["Economy Car", "Minivan"])
+        cache.update("KOA", ["Economy Car"])
+        assert cache.get("KOA") == ["Economy Car", "Minivan"]
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        path = tmp_path / "category_cache.json"
+        path.write_text("{not json")
+        assert CategoryCache(path=str(path)).get("KOA") is None
+
+    def test_file_layout(self, tmp_path):
+        cache = _cache(tmp_path)
+        cache.update("KOA", ["Economy Car"], now=datetime(2025, 3, 1, 6, 0))
+        data = json.loads((tmp_path / "category_cache.json").read_text())
+        assert data == {"KOA": {"Economy Car": "2025-03-01T06:00:00"}}
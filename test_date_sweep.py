@@ -0,0 +1,81 @@
+# test_date_sweep.py
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from date_sweep import build_grid, build_variants, cheapest, sweep_booking
+
+BOOKING = {
+    "location": "KOA",
+    "pickup_date": "04/10/2030",
+    "dropoff_date": "04/14/2030",
+    "pickup_time": "12:00 PM",
+    "dropoff_time": "10:00 AM",
+    "focus_category": "Economy Car",
+    "price_history": [{"prices": {"Economy Car": 300.0}}],
+}
+
+
+class TestBuildVariants:
+    def test_matrix_around_booking(self):
+        variants = build_variants(BOOKING, days=1, times=[], today=date(2030, 1, 1))
+        shifts = [(v["pickup_shift"], v["dropoff_shift"]) for v in variants]
+        assert shifts == [(p, d) for p in (-1, 0, 1) for d in (-1, 0, 1)]
+        base = variants[shifts.index((0, 0))]
+        assert base["pickup_date"] == "04/10/2030"
+        assert base["dropoff_date"] == "04/14/2030"
+        assert (base["pickup_time"], base["dropoff_time"]) == ("12:00 PM", "10:00 AM")
+
+    def test_variants_carry_only_search_fields(self):
+        variant = build_variants(BOOKING, days=0, times=[], today=date(2030, 1, 1))[0]
+        assert "price_history" not in variant
+        assert variant["focus_category"] == "Economy Car"
+
+    def test_times_multiply_variants(self):
+        variants = build_variants(BOOKING, days=0, times=["10:00 AM", "12:00 PM"], today=date(2030, 1, 1))
+        assert {(v["pickup_time"], v["dropoff_time"]) for v in variants} == {
+            ("10:00 AM", "10:00 AM"), ("10:00 AM", "12:00 PM"),
+            ("12:00 PM", "10:00 AM"), ("12:00 PM", "12:00 PM"),
+        }
+
+    def test_skips_past_pickups_and_inverted_ranges(self):
+        booking = dict(BOOKING, pickup_date="04/10/2030", dropoff_date="04/11/2030")
+        variants = build_variants(booking, days=1, times=[], today=date(2030, 4, 10))
+        for variant in variants:
+            assert variant["pickup_shift"] >= 0
+            assert variant["dropoff_date"] > variant["pickup_date"]
+        assert (1, -1) not in [(v["pickup_shift"], v["dropoff_shift"]) for v in variants]
+
+
+class TestGrid:
+    def test_focus_category_prices_per_variant(self):
+        variants = build_variants(BOOKING, days=1, times=[], today=date(2030, 1, 1))[:3]
+        results = {0: {"Economy Car": 280.0, "Minivan": 500.0}, 1: None, 2: {"Minivan": 450.0}}
+        grid = build_grid(BOOKING, variants, results, days=1)
+        assert grid["category"] == "Economy Car"
+        assert [row[4] for row in grid["rows"]] == [280.0, None, None]
+        assert grid["rows"][0][:4] == [-1, -1, "12:00 PM", "10:00 AM"]
+
+    def test_cheapest(self):
+        grid = {"rows": [[0, 0, "a", "b", 300.0], [1, 0, "a", "b", None], [0, 1, "a", "b", 250.0]]}
+        assert cheapest(grid) == [0, 1, "a", "b", 250.0]
+        assert cheapest({"rows": [[0, 0, "a", "b", None]]}) is None
+
+
+class TestSweepBooking:
+    def test_scrapes_variants_and_stores_grid(self):
+        tracker = MagicMock()
+
+        def fake_scrape(variants, on_result, workers=1, channel=None):
+            for index, variant in enumerate(variants):
+                on_result(index, {"Economy Car": 300.0 - variant["dropoff_shift"]})
+            return []
+
+        with patch("price_monitor.scrape_bookings", side_effect=fake_scrape) as scrape, \
+                patch("price_monitor.print_worker_timings"):
+            grid = sweep_booking(tracker, BOOKING, days=1, times=[], workers=2, engine="sync")
+
+        assert scrape.call_args.kwargs["workers"] == 2
+        booking_id, stored = tracker.update_date_sweep.call_args.args
+        assert booking_id == "KOA_04102030_04142030_EconomyCar"
+        assert stored is grid
+        assert cheapest(grid)[4] == 299.0
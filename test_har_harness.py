@@ -0,0 +1,116 @@
+# test_har_harness.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from har_harness import (
+    attach_har,
+    attach_har_async,
+    fixture_name,
+    replay_tracker,
+    route_from_har_kwargs,
+    save_dom_fixture,
+)
+
+BOOKING = {"location": "KOA", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"}
+
+
+class TestRouteFromHarKwargs:
+    def test_off_returns_none(self):
+        assert route_from_har_kwargs("off") is None
+
+    def test_record_updates_har(self, tmp_path):
+        path = str(tmp_path / "sub" / "session.har")
+        kwargs = route_from_har_kwargs("record", path)
+        assert kwargs["har"] == path
+        assert kwargs["update"] is True
+        assert (tmp_path / "sub").is_dir()
+
+    def test_replay_aborts_unmatched_requests(self, tmp_path):
+        path = tmp_path / "session.har"
+        path.write_text("{}")
+        kwargs = route_from_har_kwargs("replay", str(path))
+        assert kwargs == {"har": str(path), "not_found": "abort"}
+
+    def test_replay_without_recording_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            route_from_har_kwargs("replay", str(tmp_path / "missing.har"))
+
+
+class TestAttachHar:
+    def test_off_leaves_context_alone(self):
+        context = MagicMock()
+        assert attach_har(context, "off") == "off"
+        context.route_from_har.assert_not_called()
+
+    def test_replay_routes_context_from_har(self, tmp_path):
+        path = tmp_path / "session.har"
+        path.write_text("{}")
+        context = MagicMock()
+        attach_har(context, "replay", str(path))
+        context.route_from_har.assert_called_once_with(har=str(path), not_found="abort")
+
+    def test_async_replay(self, tmp_path):
+        path = tmp_path / "session.har"
+        path.write_text("{}")
+        context = MagicMock()
+        context.route_from_har = AsyncMock()
+        asyncio.run(attach_har_async(context, "replay", str(path)))
+        context.route_from_har.assert_awaited_once()
+
+    def test_unknown_mode_raises(self):
+        with pytest.raises(ValueError):
+            attach_har(MagicMock(), "rewind")
+
+
+class TestDomFixtures:
+    def test_fixture_name_is_filesystem_safe(self):
+        assert fixture_name(BOOKING) == "KOA_04-01-2025_04-08-2025.html"
+
+    def test_save_dom_fixture(self, tmp_path):
+        path = save_dom_fixture("<html>cars</html>", BOOKING, directory=str(tmp_path))
+        assert open(path).read() == "<html>cars</html>"
+
+
+class TestReplayRun:
+    TRACKED = {
+        "location": "KOA",
+        "pickup_date": "04/01/2030",
+        "dropoff_date": "04/08/2030",
+        "focus_category": "Economy Car",
+    }
+
+    def _tracker(self, tmp_path):
+        from booking_tracker import BookingTracker
+        tracker = BookingTracker(history_file=str(tmp_path / "price_history.json"), price_log=False)
+        tracker.add_booking(**self.TRACKED)
+        return tracker
+
+    def test_off_keeps_tracker(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        bookings = tracker.get_active_bookings()
+        assert replay_tracker(tracker, bookings, "off") == (tracker, bookings)
+
+    def test_replay_run_leaves_history_untouched(self, tmp_path, monkeypatch):
+        """Replayed prices go to a throwaway tracker and no email is sent."""
+        monkeypatch.chdir(tmp_path)
+        tracker = self._tracker(tmp_path)
+        before = (tmp_path / "price_history.json").read_bytes()
+
+        def fake_scrape(searches, on_result, **kwargs):
+            on_result(0, {"Economy Car": 123.0})
+            return []
+
+        with patch("har_harness.HAR_MODE", "replay"), \
+             patch("price_monitor.HAR_MODE", "replay"), \
+             patch("price_monitor.scrape_bookings", side_effect=fake_scrape), \
+             patch("price_monitor.print_worker_timings"), \
+             patch("email_module.send_price_alert") as send:
+            from price_monitor import run_price_checks
+            assert run_price_checks(tracker, tracker.get_active_bookings(), workers=1, engine="sync") is True
+
+        send.assert_not_called()
+        assert (tmp_path / "price_history.json").read_bytes() == before
+        assert tracker.get_active_bookings()[0]["price_history"] == []
+        assert not (tmp_path / "category_cache.json").exists()
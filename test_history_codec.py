@@ -0,0 +1,77 @@
+# test_history_codec.py
+import json
+
+import pytest
+
+from booking_tracker import BookingTracker
+from history_codec import decode, decode_file_data, encode, encode_file_data, is_encoded, normalize
+
+RECORDS = [
+    {"timestamp": "2025-03-01T06:00:00",
+     "prices": {"Economy Car": 414.17999999999995, "Minivan": 550.0},
+     "lowest_price": {"category": "Economy Car", "price": 414.17999999999995}},
+    {"timestamp": "2025-03-01T18:00:00",
+     "prices": {"Minivan": 540.5, "Compact SUV": 480.0},
+     "lowest_price": {"category": "Compact SUV", "price": 480.0}},
+]
+
+
+class TestCodec:
+    def test_layout(self):
+        encoded = encode(RECORDS)
+        assert encoded["format"] == "columnar" and encoded["v"] == 1
+        assert encoded["categories"] == ["Economy Car", "Minivan", "Compact SUV"]
+        assert encoded["timestamps"] == ["2025-03-01T06:00:00", "2025-03-01T18:00:00"]
+        assert encoded["prices"] == [[41418, 55000, None], [None, 54050, 48000]]
+        assert encoded["lowest"] == [0, 2]
+
+    def test_round_trip_at_cent_precision(self):
+        decoded = decode(json.loads(json.dumps(encode(RECORDS))))
+        assert decoded == normalize(RECORDS)
+        assert decoded[0]["prices"]["Economy Car"] == 414.18
+        assert "Economy Car" not in decoded[1]["prices"]
+
+    def test_records_with_extra_keys_are_not_encoded(self):
+        assert encode([dict(RECORDS[0], note="manual")]) is None
+
+    def test_missing_lowest_price(self):
+        records = [{"timestamp": "t", "prices": {"Economy Car": 300.0}}]
+        assert decode(encode(records)) == records
+
+    def test_unknown_version(self):
+        with pytest.raises(ValueError):
+            decode(dict(encode(RECORDS), v=2))
+
+    def test_file_data_round_trip(self):
+        data = {"metadata": {"active_bookings": ["a"]},
+                "bookings": {"a": {"location": "KOA", "price_history": RECORDS},
+                             "b": {"location": "LIH", "price_history": []}}}
+        encoded = encode_file_data(data)
+        assert is_encoded(encoded["bookings"]["a"]["price_history"])
+        assert encoded["bookings"]["b"]["price_history"] == []
+        assert data["bookings"]["a"]["price_history"] is RECORDS
+        decoded = decode_file_data(json.loads(json.dumps(encoded)))
+        assert decoded["bookings"]["a"]["price_history"] == normalize(RECORDS)
+
+
+class TestTrackerColumnarFormat:
+    BOOKING = {"location": "KOA", "pickup_date": "04/01/2030", "dropoff_date": "04/08/2030",
+               "focus_category": "Economy Car"}
+    BOOKING_ID = "KOA_04012030_04082030_EconomyCar"
+
+    def test_writes_columnar_and_reads_back_dicts(self, tmp_path):
+        path = str(tmp_path / "price_history.json")
+        tracker = BookingTracker(history_file=path, price_log=False, history_format="columnar")
+        tracker.add_booking(**self.BOOKING)
+        tracker.update_prices(self.BOOKING_ID, {"Economy Car": 300.25, "Minivan": 450.0})
+
+        on_disk = json.loads((tmp_path / "price_history.json").read_text())
+        assert is_encoded(on_disk["bookings"][self.BOOKING_ID]["price_history"])
+
+        reloaded = BookingTracker(history_file=path, price_log=False, history_format="dict")
+        history = reloaded.bookings["bookings"][self.BOOKING_ID]["price_history"]
+        assert history[0]["prices"] == {"Economy Car": 300.25, "Minivan": 450.0}
+        assert reloaded.get_price_trends(self.BOOKING_ID)["focus_category"]["current"] == 300.25
+        reloaded.save_bookings()
+        assert isinstance(json.loads((tmp_path / "price_history.json").read_text())
+                          ["bookings"][self.BOOKING_ID]["price_history"], list)
@@ -0,0 +1,169 @@
+# test_history_retention.py
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from booking_tracker import BookingTracker
+from history_retention import apply_tiers, parse_tiers, rollup
+from price_stats import build_stats, category_trend
+
+NOW = datetime(2030, 6, 1, 12, 0)
+TIERS = parse_tiers("full:7,day:30,week")
+
+
+def _record(days_ago, prices, hour=6):
+    when = (NOW - timedelta(days=days_ago)).replace(hour=hour)
+    lowest = min(prices.items(), key=lambda item: item[1])
+    return {"timestamp": when.isoformat(), "prices": prices,
+            "lowest_price": {"category": lowest[0], "price": lowest[1]}}
+
+
+def _history():
+    """Two checks a day for 60 days, Economy Car dipping to its low 45 days ago"""
+    records = []
+    for days_ago in range(60, 0, -1):
+        for hour in (6, 18):
+            economy = 300.0 + days_ago % 7 + (hour == 18)
+            if days_ago == 45 and hour == 18:
+                economy = 199.99
+            prices = {"Economy Car": economy, "Minivan": 450.0 + days_ago % 3}
+            if days_ago == 20:
+                prices["Compact SUV"] = 500.0
+            records.append(_record(days_ago, prices, hour))
+    return records
+
+
+class TestParseTiers:
+    def test_parses_and_disables(self):
+        assert TIERS == [("full", 7), ("day", 30), ("week", None)]
+        assert parse_tiers("off") == [] and parse_tiers("") == []
+
+    @pytest.mark.parametrize("spec", ["full:7,month", "full:7,day:30", "full,week", "full:30,day:7,week"])
+    def test_rejects_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_tiers(spec)
+
+
+class TestRollup:
+    def test_ohlc_and_lowest_price(self):
+        records = [_record(10, {"Economy Car": 310.0, "Minivan": 450.0}, 6),
+                   _record(10, {"Economy Car": 290.0}, 12),
+                   _record(10, {"Economy Car": 300.0, "Minivan": 440.0}, 18)]
+        record = rollup(records, "day")
+        assert record["timestamp"] == records[-1]["timestamp"]
+        assert record["prices"] == {"Economy Car": 300.0, "Minivan": 440.0}
+        assert record["lowest_price"] == {"category": "Economy Car", "price": 290.0}
+        assert record["rollup"]["checks"] == 3
+        assert record["rollup"]["start"] == records[0]["timestamp"]
+        assert record["rollup"]["categories"]["Economy Car"] == {
+            "open": 310.0, "high": 310.0, "low": 290.0, "close": 300.0, "sum": 900.0, "count": 3}
+        assert record["rollup"]["categories"]["Minivan"]["count"] == 2
+
+
+class TestApplyTiers:
+    def test_tiers(self):
+        history = _history()
+        ages = [NOW - datetime.fromisoformat(r["timestamp"]) for r in history]
+        day_dates = {datetime.fromisoformat(r["timestamp"]).date()
+                     for r, age in zip(history, ages) if timedelta(days=7) <= age < timedelta(days=30)}
+
+        retained = apply_tiers(history, TIERS, NOW)
+        periods = [r.get("rollup", {}).get("period", "full") for r in retained]
+        assert periods.count("full") == sum(age < timedelta(days=7) for age in ages)
+        assert periods.count("day") == len(day_dates)
+        assert set(periods[:periods.index("day")]) == {"week"}
+        assert [r["timestamp"] for r in retained] == sorted(r["timestamp"] for r in retained)
+
+    def test_stats_are_preserved(self):
+        history = _history()
+        before = build_stats(history)
+        after = build_stats(apply_tiers(history, TIERS, NOW))
+        for category in ("Economy Car", "Minivan", "Compact SUV"):
+            old, new = before["categories"][category], after["categories"][category]
+            assert (new["min"], new["max"], new["count"]) == (old["min"], old["max"], old["count"])
+            assert new["sum"] == pytest.approx(old["sum"])
+        assert category_trend(after, "Economy Car")["lowest"] == 199.99
+
+    def test_idempotent_and_ages_into_coarser_tiers(self):
+        once = apply_tiers(_history(), TIERS, NOW)
+        assert apply_tiers(once, TIERS, NOW) is once
+
+        later = apply_tiers(once, TIERS, NOW + timedelta(days=14))
+        assert build_stats(later)["categories"]["Economy Car"]["count"] == 120
+        assert sum(r.get("rollup", {}).get("checks", 1) for r in later) == 120
+
+    def test_leaves_unparseable_history_alone(self):
+        records = [{"timestamp": "11/10 06:00", "prices": {"Economy Car": 300.0}}]
+        assert apply_tiers(records, TIERS, NOW) is records
+
+
+class TestTrackerRetention:
+    def _tracker(self, tmp_path, **kwargs):
+        kwargs.setdefault("price_log", False)
+        return BookingTracker(history_file=str(tmp_path / "price_history.json"), **kwargs)
+
+    def _seed(self, tracker):
+        booking_id = tracker.add_booking("KOA", "07/01/2030", "07/08/2030", "Economy Car")
+        booking = tracker.bookings["bookings"][booking_id]
+        booking["price_history"] = _history()
+        tracker.save_bookings()
+        return booking_id
+
+    def test_rolls_up_and_saves(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        booking_id = self._seed(tracker)
+        trends = tracker.get_price_trends(booking_id)
+
+        retained = len(apply_tiers(_history(), TIERS, NOW))
+        assert tracker.apply_retention("full:7,day:30,week", now=NOW) == 120 - retained
+        data = json.loads((tmp_path / "price_history.json").read_text())
+        assert len(data["bookings"][booking_id]["price_history"]) == retained
+        reloaded = self._tracker(tmp_path).get_price_trends(booking_id)["focus_category"]
+        for key in ("current", "lowest", "highest", "total_checks"):
+            assert reloaded[key] == trends["focus_category"][key]
+        assert reloaded["average"] == pytest.approx(trends["focus_category"]["average"])
+
+    def test_one_save_inside_transaction(self, tmp_path):
+        """The run's prices and the rollup are written together when the block ends."""
+        tracker = self._tracker(tmp_path, price_log=True, compact_every=0)
+        booking_id = self._seed(tracker)
+        path = tmp_path / "price_history.json"
+        with tracker.transaction():
+            tracker.update_prices(booking_id, {"Economy Car": 310.0})
+            removed = tracker.apply_retention("full:7,day:30,week", now=NOW)
+            assert len(json.loads(path.read_text())["bookings"][booking_id]["price_history"]) == 120
+        assert not (tmp_path / "price_history.log.jsonl").read_text()
+
+        history = self._tracker(tmp_path, price_log=True).bookings["bookings"][booking_id]["price_history"]
+        assert len(history) == 121 - removed
+        assert {"Economy Car": 310.0} in [r["prices"] for r in history]
+
+    def test_first_rollup_saves_a_backup(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        booking_id = self._seed(tracker)
+        backup = tmp_path / "price_history.pre-retention.json"
+        assert tracker.apply_retention("full:7,day:30,week", save=False, now=NOW) > 0
+        assert not backup.exists()
+
+        tracker.apply_retention("full:7,day:30,week", now=NOW)
+        assert len(json.loads(backup.read_text())["bookings"][booking_id]["price_history"]) == 120
+        tracker.apply_retention("full:7,day:30,week", now=NOW + timedelta(days=14))
+        assert len(json.loads(backup.read_text())["bookings"][booking_id]["price_history"]) == 120
+
+    def test_dry_run_and_off(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        booking_id = self._seed(tracker)
+        assert tracker.apply_retention("full:7,day:30,week", save=False, now=NOW) > 0
+        assert tracker.apply_retention("off", now=NOW) == 0
+        assert len(tracker.bookings["bookings"][booking_id]["price_history"]) == 120
+
+    def test_sharded_skips_unloaded_histories(self, tmp_path):
+        booking_id = self._seed(self._tracker(tmp_path))
+        self._tracker(tmp_path, history_layout="sharded").save_bookings()
+        tracker = self._tracker(tmp_path, history_layout="sharded")
+        assert tracker.apply_retention("full:7,day:30,week", now=NOW) == 0
+        tracker.bookings["bookings"][booking_id]["price_history"]
+        assert tracker.apply_retention("full:7,day:30,week", now=NOW) > 0
+        assert len(self._tracker(tmp_path, history_layout="sharded")
+                   .bookings["bookings"][booking_id]["price_history"]) == len(apply_tiers(_history(), TIERS, NOW))
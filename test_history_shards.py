@@ -0,0 +1,153 @@
+# test_history_shards.py
+import json
+
+from booking_storage import SqliteBookingTracker
+from booking_tracker import BookingTracker
+from delete_booking_cli import BookingManager
+from history_shards import LazyBooking, shard_path
+
+BOOKING = {
+    "location": "KOA",
+    "pickup_date": "04/01/2030",
+    "dropoff_date": "04/08/2030",
+    "focus_category": "Economy Car",
+}
+BOOKING_ID = "KOA_04012030_04082030_EconomyCar"
+OTHER_ID = "LIH_04012030_04082030_EconomyCar"
+
+
+def _tracker(tmp_path, **kwargs):
+    kwargs.setdefault("price_log", False)
+    kwargs.setdefault("history_layout", "sharded")
+    return BookingTracker(history_file=str(tmp_path / "price_history.json"), **kwargs)
+
+
+def _shard(tmp_path, booking_id=BOOKING_ID):
+    return shard_path(str(tmp_path / "price_history.json"), booking_id)
+
+
+def _seed(tmp_path, **kwargs):
+    tracker = _tracker(tmp_path, **kwargs)
+    tracker.add_booking(**BOOKING, holding_price=320.0)
+    tracker.add_booking(**dict(BOOKING, location="LIH"))
+    tracker.update_prices(BOOKING_ID, {"Economy Car": 300.0, "Minivan": 450.0})
+    tracker.update_prices(BOOKING_ID, {"Economy Car": 280.0})
+    return tracker
+
+
+class TestLazyBooking:
+    def test_loads_history_on_first_access(self):
+        calls = []
+        booking = LazyBooking({"location": "KOA"}, lambda: calls.append(1) or [{"prices": {}}])
+        assert dict(booking) == {"location": "KOA"}
+        assert "price_history" in booking
+        assert booking.get("price_history") == [{"prices": {}}]
+        assert booking["price_history"] is booking["price_history"]
+        assert len(calls) == 1 and booking.history_loaded
+
+
+class TestShardedLayout:
+    def test_index_has_no_histories(self, tmp_path):
+        _seed(tmp_path)
+        index = json.loads((tmp_path / "price_history.json").read_text())
+        assert index["metadata"]["layout"] == "sharded"
+        assert "price_history" not in index["bookings"][BOOKING_ID]
+        assert index["bookings"][BOOKING_ID]["price_stats"]["checks"] == 2
+        with open(_shard(tmp_path)) as f:
+            assert [r["prices"]["Economy Car"] for r in json.load(f)] == [300.0, 280.0]
+
+    def test_open_reads_no_shards(self, tmp_path, monkeypatch):
+        _seed(tmp_path)
+        monkeypatch.setattr("history_shards.read_shard", lambda path: (_ for _ in ()).throw(AssertionError(path)))
+        tracker = _tracker(tmp_path)
+        assert [b["location"] for b in tracker.get_active_bookings()] == ["KOA", "LIH"]
+        trends = tracker.get_price_trends(BOOKING_ID)["focus_category"]
+        assert (trends["current"], trends["previous_price"], trends["holding_price"]) == (280.0, 300.0, 320.0)
+        assert tracker.get_price_trends(OTHER_ID) == {}
+
+    def test_history_loads_when_touched(self, tmp_path):
+        _seed(tmp_path)
+        tracker = _tracker(tmp_path)
+        booking = tracker.get_active_bookings()[0]
+        assert not booking.history_loaded
+        assert len(booking["price_history"]) == 2
+        assert not tracker.bookings["bookings"][OTHER_ID].history_loaded
+
+    def test_save_rewrites_only_changed_shards(self, tmp_path):
+        _seed(tmp_path)
+        other_mtime = (tmp_path / "price_history.history" / f"{OTHER_ID}.json").stat().st_mtime_ns
+        tracker = _tracker(tmp_path)
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 260.0})
+        assert (tmp_path / "price_history.history" / f"{OTHER_ID}.json").stat().st_mtime_ns == other_mtime
+        assert not tracker.bookings["bookings"][OTHER_ID].history_loaded
+        assert len(_tracker(tmp_path).get_active_bookings()[0]["price_history"]) == 3
+
+    def test_log_replay_touches_only_logged_bookings(self, tmp_path):
+        tracker = _seed(tmp_path, price_log=True, compact_every=0)
+        tracker.compact()
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 260.0})
+
+        reopened = _tracker(tmp_path, price_log=True, compact_every=0)
+        assert reopened.get_price_trends(BOOKING_ID)["focus_category"]["current"] == 260.0
+        assert not reopened.bookings["bookings"][OTHER_ID].history_loaded
+
+    def test_replayed_op_already_in_shard_is_skipped(self, tmp_path):
+        tracker = _seed(tmp_path, price_log=True, compact_every=0)
+        tracker.compact()
+        index = (tmp_path / "price_history.json").read_text()
+        tracker.update_prices(BOOKING_ID, {"Economy Car": 260.0})
+        # Crash after the shard was written but before the index was replaced
+        tracker._compact_at_exit = lambda: None
+        tracker.compact()
+        (tmp_path / "price_history.json").write_text(index)
+        log = tmp_path / "price_history.log.jsonl"
+        log.write_text(json.dumps({"op": "prices", "id": BOOKING_ID, "seq": tracker.log_seq,
+                                   "record": tracker.bookings["bookings"][BOOKING_ID]["price_history"][-1]}) + "\n")
+
+        history = _tracker(tmp_path, price_log=True, compact_every=0).bookings["bookings"][BOOKING_ID]["price_history"]
+        assert [r["prices"]["Economy Car"] for r in history] == [300.0, 280.0, 260.0]
+
+    def test_delete_removes_shard(self, tmp_path):
+        tracker = _seed(tmp_path)
+        tracker.delete_booking(BOOKING_ID)
+        assert not (tmp_path / "price_history.history" / f"{BOOKING_ID}.json").exists()
+
+    def test_columnar_shards(self, tmp_path):
+        _seed(tmp_path, history_format="columnar")
+        with open(_shard(tmp_path)) as f:
+            assert json.load(f)["format"] == "columnar"
+        history = _tracker(tmp_path).get_active_bookings()[0]["price_history"]
+        assert [r["prices"]["Economy Car"] for r in history] == [300.0, 280.0]
+
+
+class TestLayoutMigration:
+    def test_single_file_moves_into_shards(self, tmp_path):
+        _seed(tmp_path, history_layout="single")
+        tracker = _tracker(tmp_path)
+        tracker.save_bookings()
+        index = json.loads((tmp_path / "price_history.json").read_text())
+        assert "price_history" not in index["bookings"][BOOKING_ID]
+        assert len(_tracker(tmp_path).get_active_bookings()[0]["price_history"]) == 2
+
+    def test_sharded_back_to_single_file(self, tmp_path):
+        _seed(tmp_path)
+        _tracker(tmp_path, history_layout="single").save_bookings()
+        data = json.loads((tmp_path / "price_history.json").read_text())
+        assert "layout" not in data["metadata"]
+        assert len(data["bookings"][BOOKING_ID]["price_history"]) == 2
+        assert data["bookings"][OTHER_ID]["price_history"] == []
+
+
+class TestReaders:
+    def test_delete_cli_removes_shard(self, tmp_path):
+        _seed(tmp_path)
+        manager = BookingManager(str(tmp_path / "price_history.json"))
+        assert manager.delete_booking("1")
+        assert not (tmp_path / "price_history.history" / f"{BOOKING_ID}.json").exists()
+        assert list(_tracker(tmp_path).bookings["bookings"]) == [OTHER_ID]
+
+    def test_sqlite_import_reads_shards(self, tmp_path):
+        source = _seed(tmp_path)
+        tracker = SqliteBookingTracker(db_file=str(tmp_path / "price_history.db"), export_file=None)
+        assert tracker.import_json(str(tmp_path / "price_history.json")) == 2
+        assert tracker.get_price_trends(BOOKING_ID) == source.get_price_trends(BOOKING_ID)
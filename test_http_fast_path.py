@@ -0,0 +1,134 @@
+# test_http_fast_path.py
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from http_fast_path import build_request, fetch_prices, fetch_prices_async, load_template, save_template
+
+TEMPLATE_BOOKING = {
+    "location": "KOA",
+    "pickup_date": "04/01/2025",
+    "dropoff_date": "04/08/2025",
+    "pickup_time": "12:00 PM",
+    "dropoff_time": "10:00 AM",
+}
+BOOKING = dict(TEMPLATE_BOOKING, location="LIH", pickup_date="05/02/2025", dropoff_date="05/09/2025")
+RESPONSE_BODY = "".join(
+    f'<div role="row"><div class="inner text-center h3-tag-style">{category}</div>'
+    f'<a class="card car-result-card lowest-price" data-price="{price}"></a></div>'
+    for category, price in (("Economy Car", "301.50"), ("Standard SUV", "455.00"))
+)
+
+
+def _template():
+    return {
+        "url": "https://www.costcotravel.com/rentalCarSearch.act",
+        "method": "POST",
+        "headers": {"content-type": "application/x-www-form-urlencoded"},
+        "post_data": (
+            "pickupLocationCode=KOA&pickupDate=04%2F01%2F2025&dropoffDate=04%2F08%2F2025"
+            "&pickupTime=12%3A00+PM&dropoffTime=10%3A00+AM&driverAge=25"
+        ),
+        "booking": dict(TEMPLATE_BOOKING),
+    }
+
+
+class TestBuildRequest:
+    def test_substitutes_form_encoded_values(self):
+        url, method, headers, data = build_request(_template(), BOOKING)
+        assert method == "POST"
+        assert "pickupLocationCode=LIH" in data
+        assert "pickupDate=05%2F02%2F2025" in data
+        assert "dropoffDate=05%2F09%2F2025" in data
+        assert "pickupTime=12%3A00+PM" in data
+
+    def test_swapped_values_are_not_replaced_twice(self):
+        booking = dict(TEMPLATE_BOOKING, pickup_date="04/08/2025", dropoff_date="04/15/2025")
+        _, _, _, data = build_request(_template(), booking)
+        assert "pickupDate=04%2F08%2F2025" in data
+        assert "dropoffDate=04%2F15%2F2025" in data
+
+    def test_field_missing_from_body_is_unsafe(self):
+        template = _template()
+        template["post_data"] = "pickupLocationCode=KOA"
+        assert build_request(template, BOOKING) is None
+
+    def test_shared_template_value_with_different_targets_is_unsafe(self):
+        template = _template()
+        template["booking"]["dropoff_time"] = "12:00 PM"
+        template["post_data"] = template["post_data"].replace("10%3A00+AM", "12%3A00+PM")
+        booking = dict(BOOKING, dropoff_time="09:00 AM")
+        assert build_request(template, booking) is None
+
+    def test_location_only_replaced_as_whole_token(self):
+        template = _template()
+        template["post_data"] += "&note=KOALA"
+        _, _, _, data = build_request(template, BOOKING)
+        assert "note=KOALA" in data
+
+
+class TestTemplateFile:
+    def test_save_strips_browser_managed_headers(self, tmp_path):
+        path = str(tmp_path / "template.json")
+        request = {
+            "url": "https://www.costcotravel.com/rentalCarSearch.act",
+            "method": "POST",
+            "headers": {"cookie": "a=b", "content-length": "10", ":authority": "x", "accept": "*/*"},
+            "post_data": "pickupLocationCode=KOA",
+        }
+        save_template(request, TEMPLATE_BOOKING, path=path)
+        template = load_template(path)
+        assert template["headers"] == {"accept": "*/*"}
+        assert template["booking"]["location"] == "KOA"
+
+    def test_save_replaces_template_atomically(self, tmp_path):
+        path = tmp_path / "template.json"
+        path.write_text("{}")
+        with patch("http_fast_path.atomic_write_json") as write:
+            save_template({"url": "https://example.com/rentalCarSearch.act"}, TEMPLATE_BOOKING, path=str(path))
+        assert write.call_args[0][0] == str(path)
+        assert path.read_text() == "{}"
+
+    def test_missing_template(self, tmp_path):
+        assert load_template(str(tmp_path / "missing.json")) is None
+
+
+class TestFetchPrices:
+    def test_valid_response_returns_prices(self):
+        context = MagicMock()
+        context.fetch.return_value.status = 200
+        context.fetch.return_value.text.return_value = RESPONSE_BODY
+        prices = fetch_prices(context, BOOKING, template=_template())
+        assert prices == {"Economy Car": 301.5, "Standard SUV": 455.0}
+        assert "pickupLocationCode=LIH" in context.fetch.call_args[1]["data"]
+
+    def test_error_status_gives_no_prices(self):
+        context = MagicMock()
+        context.fetch.return_value.status = 403
+        context.fetch.return_value.text.return_value = RESPONSE_BODY
+        assert fetch_prices(context, BOOKING, template=_template()) == {}
+
+    def test_unparseable_body_gives_no_prices(self):
+        context = MagicMock()
+        context.fetch.return_value.status = 200
+        context.fetch.return_value.text.return_value = "<html>captcha</html>"
+        assert fetch_prices(context, BOOKING, template=_template()) == {}
+
+    def test_response_without_focus_category_gives_no_prices(self):
+        context = MagicMock()
+        context.fetch.return_value.status = 200
+        context.fetch.return_value.text.return_value = RESPONSE_BODY
+        booking = dict(BOOKING, focus_category="Minivan")
+        assert fetch_prices(context, booking, template=_template()) == {}
+
+    def test_request_error_gives_no_prices(self):
+        context = MagicMock()
+        context.fetch.side_effect = Exception("connection reset")
+        assert fetch_prices(context, BOOKING, template=_template()) == {}
+
+    def test_async(self):
+        response = MagicMock(status=200)
+        response.text = AsyncMock(return_value=RESPONSE_BODY)
+        context = MagicMock()
+        context.fetch = AsyncMock(return_value=response)
+        prices = asyncio.run(fetch_prices_async(context, BOOKING, template=_template()))
+        assert prices["Economy Car"] == 301.5
@@ -0,0 +1,74 @@
+# test_memory_watchdog.py
+import os
+from unittest.mock import MagicMock
+
+from memory_watchdog import MemoryWatchdog, heap_mb, process_rss_mb, rss_by_type, sample_memory
+
+MB = 1024 * 1024
+
+
+class TestMemoryWatchdog:
+    def test_recycles_after_max_searches(self):
+        watchdog = MemoryWatchdog(max_searches=3, max_heap_mb=0, max_rss_mb=0)
+        assert watchdog.check() is None
+        assert watchdog.check() is None
+        assert "3 searches" in watchdog.check()
+        watchdog.recycled()
+        assert watchdog.check() is None
+        assert watchdog.stats()["recycles"] == 1
+
+    def test_heap_threshold(self):
+        watchdog = MemoryWatchdog(max_searches=0, max_heap_mb=100, max_rss_mb=0)
+        assert watchdog.check({"heap_mb": 80.0, "rss_mb": None}) is None
+        assert "JS heap" in watchdog.check({"heap_mb": 150.0, "rss_mb": None})
+        assert watchdog.peak_heap_mb == 150.0
+
+    def test_rss_threshold_sums_process_types(self):
+        watchdog = MemoryWatchdog(max_searches=0, max_heap_mb=0, max_rss_mb=500)
+        assert watchdog.check({"heap_mb": None, "rss_mb": {"browser": 200.0, "renderer": 250.0}}) is None
+        reason = watchdog.check({"heap_mb": None, "rss_mb": {"browser": 200.0, "renderer": 400.0}})
+        assert "RSS 600 MB" in reason
+
+    def test_missing_samples_never_recycle(self):
+        watchdog = MemoryWatchdog(max_searches=0, max_heap_mb=1, max_rss_mb=1)
+        assert watchdog.check({"heap_mb": None, "rss_mb": None}) is None
+        assert watchdog.check(None) is None
+
+    def test_samples_memory_off_when_limits_disabled(self):
+        assert not MemoryWatchdog(max_heap_mb=0, max_rss_mb=0).samples_memory
+        assert MemoryWatchdog(max_heap_mb=0, max_rss_mb=10).samples_memory
+
+
+class TestSampling:
+    def test_heap_mb_from_metrics(self):
+        metrics = {"metrics": [{"name": "Nodes", "value": 10}, {"name": "JSHeapUsedSize", "value": 64 * MB}]}
+        assert heap_mb(metrics) == 64.0
+        assert heap_mb({"metrics": []}) is None
+
+    def test_rss_of_this_process(self):
+        if not os.path.exists("/proc/self/status"):
+            return
+        assert process_rss_mb(os.getpid()) > 0
+        totals = rss_by_type({"processInfo": [{"type": "browser", "id": os.getpid()}]})
+        assert totals["browser"] > 0
+
+    def test_unreadable_processes_are_skipped(self):
+        assert rss_by_type({"processInfo": [{"type": "renderer", "id": -1}]}) is None
+
+    def test_sample_memory_uses_cdp(self):
+        browser, context, page = MagicMock(), MagicMock(), MagicMock()
+        page_cdp = context.new_cdp_session.return_value
+        page_cdp.send.side_effect = lambda method: (
+            {"metrics": [{"name": "JSHeapUsedSize", "value": 32 * MB}]} if method == "Performance.getMetrics" else {}
+        )
+        browser.new_browser_cdp_session.return_value.send.return_value = {"processInfo": []}
+
+        sample = sample_memory(browser, context, page)
+
+        assert sample == {"heap_mb": 32.0, "rss_mb": None}
+        page_cdp.detach.assert_called_once()
+
+    def test_sample_memory_survives_cdp_errors(self):
+        context = MagicMock()
+        context.new_cdp_session.side_effect = Exception("not chromium")
+        assert sample_memory(None, context, MagicMock()) == {"heap_mb": None, "rss_mb": None}
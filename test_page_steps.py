@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for page_steps.py — running shared page flows on the sync and async APIs.
+Run: python3 -m pytest test_page_steps.py -v
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from page_steps import ExpectResponse, Sleep, drive, drive_async
+
+
+def _read_field(page):
+    value = yield page.input_value()
+    return value.upper()
+
+
+def _recover(page):
+    try:
+        yield page.click()
+    except RuntimeError:
+        return "recovered"
+    return "clicked"
+
+
+class TestDrive:
+    """Tests for drive() — the sync API, where each yielded call has already run."""
+
+    def test_sends_call_results_back(self):
+        page = MagicMock()
+        page.input_value.return_value = "koa"
+        assert drive(_read_field(page)) == "KOA"
+
+    def test_throws_errors_into_the_flow(self):
+        def failing():
+            raise RuntimeError("detached")
+            yield
+
+        def flow():
+            try:
+                yield from failing()
+            except RuntimeError:
+                return "recovered"
+
+        assert drive(flow()) == "recovered"
+
+    def test_sleep_uses_time_sleep(self):
+        def flow():
+            yield Sleep(1.5)
+
+        with patch("page_steps.time.sleep") as sleep:
+            drive(flow())
+        sleep.assert_called_once_with(1.5)
+
+    def test_expect_response_wraps_the_inner_flow(self):
+        page = MagicMock()
+        info = page.expect_response.return_value.__enter__.return_value
+        info.value = "response"
+        clicked = []
+
+        def click():
+            clicked.append(True)
+            yield page.click()
+
+        def flow():
+            got = yield ExpectResponse(page, "predicate", 5000, click())
+            return got.value
+
+        assert drive(flow()) == "response"
+        page.expect_response.assert_called_once_with("predicate", timeout=5000)
+        assert clicked == [True]
+
+    def test_unhandled_error_propagates(self):
+        def flow():
+            yield Sleep(0)
+            raise ValueError("bad")
+
+        with patch("page_steps.time.sleep"), pytest.raises(ValueError):
+            drive(flow())
+
+
+class TestDriveAsync:
+    """Tests for drive_async() — the async API, where yielded calls are awaited."""
+
+    def test_awaits_call_results(self):
+        page = MagicMock()
+        page.input_value = AsyncMock(return_value="koa")
+        assert asyncio.run(drive_async(_read_field(page))) == "KOA"
+
+    def test_throws_awaited_errors_into_the_flow(self):
+        page = MagicMock()
+        page.click = AsyncMock(side_effect=RuntimeError("detached"))
+        assert asyncio.run(drive_async(_recover(page))) == "recovered"
+
+    def test_plain_values_pass_through(self):
+        page = MagicMock()
+        page.click.return_value = None
+        assert asyncio.run(drive_async(_recover(page))) == "clicked"
+
+    def test_sleep_uses_asyncio_sleep(self):
+        def flow():
+            yield Sleep(2)
+
+        with patch("page_steps.asyncio.sleep", AsyncMock()) as sleep:
+            asyncio.run(drive_async(flow()))
+        sleep.assert_awaited_once_with(2)
+
+    def test_expect_response_enters_async_context(self):
+        page = MagicMock()
+        manager = page.expect_response.return_value
+        manager.__aenter__ = AsyncMock(return_value=MagicMock(value="response"))
+        manager.__aexit__ = AsyncMock(return_value=False)
+        page.click = AsyncMock()
+
+        def click():
+            yield page.click()
+
+        def flow():
+            got = yield ExpectResponse(page, "predicate", 5000, click())
+            return got.value
+
+        assert asyncio.run(drive_async(flow())) == "response"
+        page.click.assert_awaited_once()
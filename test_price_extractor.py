@@ -8,31 +8,15 @@ import pytest
 from unittest.mock import MagicMock, patch
 
 
-def _make_row_mock(category_name, price_str):
-    """Return a mock Playwright Locator for a single results row."""
-    name_locator = MagicMock()
-    name_locator.text_content.return_value = category_name
-
-    price_locator = MagicMock()
-    price_locator.get_attribute.return_value = price_str
-
-    row = MagicMock()
-
-    def row_locator_side_effect(selector):
-        if "inner" in selector:
-            return name_locator
-        return price_locator
-
-    row.locator.side_effect = row_locator_side_effect
-    return row
+def _make_row_mock(category_name, price_str, card_count=3):
+    """Return one results row as produced by RESULT_ROWS_JS."""
+    return {"category": category_name, "lowest_price": price_str, "card_count": card_count}
 
 
 def _make_page_mock(rows):
-    """Return a mock Playwright page whose div[role='row'] locator returns rows."""
+    """Return a mock Playwright page whose page.evaluate() returns rows."""
     page = MagicMock()
-    rows_locator = MagicMock()
-    rows_locator.all.return_value = rows
-    page.locator.return_value = rows_locator
+    page.evaluate.return_value = rows
     return page
 
 
@@ -70,11 +54,9 @@ class TestExtractLowestPrices:
         }
 
     def test_skips_row_when_price_element_missing(self):
-        """Rows where get_attribute raises are silently skipped."""
+        """Rows without a lowest-price card are silently skipped."""
         good_row = _make_row_mock("Economy Car", "299.99")
-
-        bad_row = MagicMock()
-        bad_row.locator.side_effect = Exception("element not found")
+        bad_row = _make_row_mock("Compact Car", None, card_count=0)
 
         page = _make_page_mock([bad_row, good_row])
 
@@ -84,6 +66,19 @@ class TestExtractLowestPrices:
 
         assert result == {"Economy Car": 299.99}
 
+    def test_reads_all_rows_in_one_round_trip(self):
+        """Extraction costs one page.evaluate call regardless of row count."""
+        rows = [_make_row_mock(f"Category {i}", f"{100 + i}") for i in range(25)]
+        page = _make_page_mock(rows)
+
+        with patch("price_extractor.save_prices_to_file"):
+            from price_extractor import extract_lowest_prices
+            result = extract_lowest_prices(page)
+
+        assert len(result) == 25
+        page.evaluate.assert_called_once()
+        page.locator.assert_not_called()
+
     def test_returns_empty_dict_when_no_rows(self):
         """Returns empty dict when no rows found on page."""
         page = _make_page_mock([])
@@ -116,3 +111,79 @@ class TestExtractLowestPrices:
             extract_lowest_prices(page)
 
         mock_save.assert_called_once_with({"Economy Car": 299.99})
+
+
+class TestScanResultRows:
+    """Tests for scan_result_rows(page) — the shared single-evaluate row reader."""
+
+    def test_normalizes_names_prices_and_card_counts(self):
+        page = _make_page_mock([
+            {"category": "  Standard SUV \n", "lowest_price": "523.11", "card_count": 4},
+            {"category": "", "lowest_price": "1", "card_count": 1},
+            {"category": "Minivan", "lowest_price": "n/a", "card_count": 0},
+        ])
+        from price_extractor import scan_result_rows
+        assert scan_result_rows(page) == [
+            {"category": "Standard SUV", "lowest_price": 523.11, "card_count": 4},
+            {"category": "Minivan", "lowest_price": None, "card_count": 0},
+        ]
+
+    def test_available_categories_include_rows_without_prices(self):
+        """get_available_categories() lists every named row from the same scan."""
+        page = _make_page_mock([
+            _make_row_mock("Economy Car", "299.99"),
+            _make_row_mock("Minivan", None, card_count=0),
+        ])
+        from price_monitor import get_available_categories
+        assert get_available_categories(page) == {"Economy Car", "Minivan"}
+        page.evaluate.assert_called_once()
+
+
+class TestParseSearchResponse:
+    """Tests for parse_search_response(body) — prices from the rentalCarSearch payload."""
+
+    def test_parses_results_html_fragment(self):
+        """An HTML fragment is read with the same row/card selectors as the DOM path."""
+        body = (
+            '<div role="row"><div class="inner text-center h3-tag-style"> Economy Car </div>'
+            '<a class="card car-result-card lowest-price" data-price="299.99"></a></div>'
+            '<div role="row"><div class="inner text-center h3-tag-style">Minivan</div></div>'
+        )
+        from price_extractor import parse_search_response
+        assert parse_search_response(body) == {"Economy Car": 299.99}
+
+    def test_returns_empty_dict_for_unusable_bodies(self):
+        """None, empty and error bodies yield {} so callers fall back to the DOM."""
+        from price_extractor import parse_search_response
+        assert parse_search_response(None) == {}
+        assert parse_search_response("") == {}
+        assert parse_search_response('{"error": "session expired"}') == {}
+
+    def test_json_payload_is_not_guessed_at(self):
+        """Only the results markup is read; a JSON body falls back to the DOM."""
+        import json
+        body = json.dumps({"results": [{"categoryName": "Economy Car", "lowestPrice": 299.99}]})
+        from price_extractor import parse_search_response
+        assert parse_search_response(body) == {}
+
+
+class TestExtractPricesFromResponse:
+    """Tests for extract_prices_from_response(body, focus_category)."""
+
+    BODY = (
+        '<div role="row"><div class="inner text-center h3-tag-style">Economy Car</div>'
+        '<a class="card car-result-card lowest-price" data-price="299.99"></a></div>'
+    )
+
+    def test_trusted_when_focus_category_is_priced(self):
+        from price_extractor import extract_prices_from_response
+        with patch("price_extractor.save_prices_to_file") as save:
+            assert extract_prices_from_response(self.BODY, "Economy Car") == {"Economy Car": 299.99}
+        save.assert_called_once()
+
+    def test_missing_focus_category_falls_back(self):
+        """A response without the booking's category is not trusted or saved."""
+        from price_extractor import extract_prices_from_response
+        with patch("price_extractor.save_prices_to_file") as save:
+            assert extract_prices_from_response(self.BODY, "Minivan") == {}
+        save.assert_not_called()
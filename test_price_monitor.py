@@ -120,6 +120,119 @@ class TestSetupBrowser:
         assert "undefined" in script_arg
 
 
+    def test_no_route_without_blocker(self):
+        """Requests are not intercepted unless a blocker is passed."""
+        mock_sp, _, _, mock_context, _ = self._make_mocks()
+        with patch("price_monitor.sync_playwright", mock_sp):
+            from price_monitor import setup_browser
+            setup_browser()
+        mock_context.route.assert_not_called()
+
+    def test_routes_all_requests_through_blocker(self):
+        """A RequestBlocker is installed on the context for every URL."""
+        mock_sp, _, _, mock_context, _ = self._make_mocks()
+        blocker = MagicMock(name="blocker")
+        with patch("price_monitor.sync_playwright", mock_sp):
+            from price_monitor import setup_browser
+            setup_browser(blocker=blocker)
+        mock_context.route.assert_called_once_with("**/*", blocker.handle_route)
+
+    def test_restores_storage_state_session(self):
+        """A warm storage_state session is passed to new_context()."""
+        mock_sp, _, mock_browser, _, _ = self._make_mocks()
+        session = MagicMock(name="session", mode="storage_state")
+        session.context_kwargs.return_value = {"storage_state": "state.json"}
+        with patch("price_monitor.sync_playwright", mock_sp):
+            from price_monitor import setup_browser
+            setup_browser(session=session)
+        session.prepare.assert_called_once()
+        assert mock_browser.new_context.call_args[1]["storage_state"] == "state.json"
+
+    def test_profile_session_uses_persistent_context(self):
+        """A profile session launches a persistent context and reuses its first page."""
+        mock_sp, mock_pw, _, _, _ = self._make_mocks()
+        persistent = MagicMock(name="persistent_context")
+        existing_page = MagicMock(name="existing_page")
+        persistent.pages = [existing_page]
+        persistent.browser = None
+        mock_pw.chromium.launch_persistent_context.return_value = persistent
+        session = MagicMock(name="session", mode="profile", profile_dir="/tmp/profile")
+        with patch("price_monitor.sync_playwright", mock_sp):
+            from price_monitor import setup_browser
+            _, browser, context, page = setup_browser(session=session)
+        mock_pw.chromium.launch.assert_not_called()
+        assert mock_pw.chromium.launch_persistent_context.call_args[0][0] == "/tmp/profile"
+        assert browser is None
+        assert context is persistent
+        assert page is existing_page
+
+    def test_attaches_to_browser_host_when_available(self):
+        """A running browser host is reused over CDP instead of launching."""
+        mock_sp, mock_pw, _, mock_context, _ = self._make_mocks()
+        remote = MagicMock(name="remote_browser")
+        remote.new_context.return_value = mock_context
+        mock_pw.chromium.connect_over_cdp.return_value = remote
+        with patch("price_monitor.sync_playwright", mock_sp), \
+             patch("price_monitor.find_endpoint", return_value="http://127.0.0.1:9222"):
+            from price_monitor import setup_browser
+            _, browser, _, _ = setup_browser()
+        mock_pw.chromium.connect_over_cdp.assert_called_once_with("http://127.0.0.1:9222")
+        mock_pw.chromium.launch.assert_not_called()
+        assert browser is remote
+
+    def test_launches_when_attach_fails(self):
+        """A host that refuses the connection falls back to a local launch."""
+        mock_sp, mock_pw, mock_browser, _, _ = self._make_mocks()
+        mock_pw.chromium.connect_over_cdp.side_effect = Exception("refused")
+        with patch("price_monitor.sync_playwright", mock_sp), \
+             patch("price_monitor.find_endpoint", return_value="http://127.0.0.1:9222"):
+            from price_monitor import setup_browser
+            _, browser, _, _ = setup_browser()
+        assert browser is mock_browser
+
+    def test_launches_when_host_runs_another_channel(self):
+        mock_sp, mock_pw, mock_browser, _, _ = self._make_mocks()
+        with patch("price_monitor.sync_playwright", mock_sp), \
+             patch("price_monitor.find_endpoint", return_value="http://127.0.0.1:9222"), \
+             patch("price_monitor.attach_allowed", return_value=False) as allowed:
+            from price_monitor import setup_browser
+            _, browser, _, _ = setup_browser(channel="chrome")
+        allowed.assert_called_once_with("chrome", True)
+        mock_pw.chromium.connect_over_cdp.assert_not_called()
+        assert mock_pw.chromium.launch.call_args[1]["channel"] == "chrome"
+        assert browser is mock_browser
+
+    def test_attach_false_skips_browser_host(self):
+        mock_sp, mock_pw, *_ = self._make_mocks()
+        with patch("price_monitor.sync_playwright", mock_sp), \
+             patch("price_monitor.find_endpoint", return_value="http://127.0.0.1:9222") as find:
+            from price_monitor import setup_browser
+            setup_browser(attach=False)
+        find.assert_not_called()
+        mock_pw.chromium.connect_over_cdp.assert_not_called()
+
+    def test_replay_har_routes_after_blocker(self, tmp_path):
+        """Replay mode serves the context from the HAR, registered after the blocker."""
+        har = tmp_path / "session.har"
+        har.write_text("{}")
+        mock_sp, _, _, mock_context, _ = self._make_mocks()
+        blocker = MagicMock(name="blocker")
+        with patch("price_monitor.sync_playwright", mock_sp):
+            from price_monitor import setup_browser
+            setup_browser(blocker=blocker, har_mode="replay", har_path=str(har))
+        mock_context.route_from_har.assert_called_once_with(har=str(har), not_found="abort")
+        calls = [name for name, *_ in mock_context.method_calls]
+        assert calls.index("route") < calls.index("route_from_har")
+
+    def test_close_browser_closes_persistent_context(self):
+        """close_browser() closes the context when there is no browser object."""
+        from price_monitor import close_browser
+        mock_pw, context = MagicMock(), MagicMock()
+        close_browser(mock_pw, None, context)
+        context.close.assert_called_once()
+        mock_pw.stop.assert_called_once()
+
+
 # ---------------------------------------------------------------------------
 # Phase 3: Form automation helpers
 # ---------------------------------------------------------------------------
@@ -371,6 +484,42 @@ class TestWaitForResults:
         assert result is True
 
 
+class TestWaitForStableResults:
+    """Tests for the results-stability detector that replaced the 2 s sleep."""
+
+    def test_no_fixed_sleep_after_first_card(self):
+        page, _ = _mock_page()
+        page.evaluate.return_value = {"stable": True, "count": 12, "elapsed": 450}
+        from price_monitor import wait_for_results
+        assert wait_for_results(page, page.url) is True
+        page.wait_for_timeout.assert_not_called()
+
+    def test_passes_quiet_window_and_ceiling(self):
+        page, _ = _mock_page()
+        page.evaluate.return_value = {"stable": True, "count": 3, "elapsed": 120}
+        from price_monitor import RESULT_CARD_SELECTOR, wait_for_stable_results
+        outcome = wait_for_stable_results(page, quiet_ms=250, ceiling_ms=3000)
+        assert outcome["stable"] is True
+        assert page.evaluate.call_args[0][1] == [RESULT_CARD_SELECTOR, 250, 3000]
+
+    def test_records_detection_latency(self):
+        page, _ = _mock_page()
+        page.evaluate.return_value = {"stable": False, "count": 7, "elapsed": 5000}
+        from price_monitor import wait_for_stable_results
+        from timing import RunTimer
+        timer = RunTimer(path="")
+        wait_for_stable_results(page, timer=timer)
+        assert timer.records[0]["stage"] == "results_stable"
+        assert timer.records[0]["seconds"] == 5.0
+        assert timer.records[0]["ok"] is False
+
+    def test_evaluate_failure_does_not_fail_the_wait(self):
+        page, _ = _mock_page()
+        page.evaluate.side_effect = Exception("Execution context was destroyed")
+        from price_monitor import wait_for_results
+        assert wait_for_results(page, page.url) is True
+
+
 # ---------------------------------------------------------------------------
 # Phase 2: process_booking() error handling — cascade guard and nav retry
 # ---------------------------------------------------------------------------
@@ -387,12 +536,20 @@ class TestProcessBooking:
         "focus_category": "Economy Car",
     }
 
-    def _stub_price_extractor(self, prices=None):
+    def _stub_price_extractor(self, prices=None, response_prices=None):
         """Insert a stub price_extractor into sys.modules so process_booking can import it."""
         import sys, types as _t
         stub = _t.ModuleType("price_extractor")
         stub.extract_lowest_prices = MagicMock(return_value=prices or {})
-        sys.modules["price_extractor"] = stub
+        stub.extract_prices_from_response = MagicMock(return_value=response_prices or {})
+        self._modules_patch = patch.dict(sys.modules, {"price_extractor": stub})
+        self._modules_patch.start()
+        return stub
+
+    def teardown_method(self):
+        if getattr(self, "_modules_patch", None):
+            self._modules_patch.stop()
+            self._modules_patch = None
 
     def test_returns_none_when_navigation_always_fails(self):
         """Returns None cleanly when goto() times out on all attempts."""
@@ -404,6 +561,52 @@ class TestProcessBooking:
         result = process_booking(page, self.BOOKING)
         assert result is None
 
+    def test_navigation_failure_retried_with_backoff(self):
+        """A navigation error is retried up to the attempt limit, waiting between tries."""
+        self._stub_price_extractor()
+        page = MagicMock()
+        page.goto.side_effect = Exception("Timeout")
+
+        from price_monitor import attempt_booking
+        from retry import NavigationError
+        prices, error = attempt_booking(page, self.BOOKING, attempts=3)
+
+        assert prices is None
+        assert isinstance(error, NavigationError)
+        assert page.goto.call_count == 3
+        assert page.wait_for_timeout.call_count == 2
+
+    def test_extraction_failure_is_not_retried(self):
+        """Rendered results without prices fail fast as an ExtractionError."""
+        self._stub_price_extractor(prices={})
+        page = MagicMock()
+
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture", return_value={}), \
+             patch("price_monitor.wait_for_results", return_value=True):
+            from price_monitor import attempt_booking
+            from retry import ExtractionError
+            prices, error = attempt_booking(page, self.BOOKING, attempts=3)
+
+        assert prices is None
+        assert isinstance(error, ExtractionError)
+        assert page.goto.call_count == 1
+
+    def test_search_403_is_reported_as_blocked(self):
+        """A 403 from rentalCarSearch with no results is a BlockedError."""
+        self._stub_price_extractor()
+        page = MagicMock()
+
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture", return_value={"status": 403, "body": ""}), \
+             patch("price_monitor.wait_for_results", return_value=False):
+            from price_monitor import attempt_booking
+            from retry import BlockedError
+            _, error = attempt_booking(page, self.BOOKING, attempts=3)
+
+        assert isinstance(error, BlockedError)
+        assert page.goto.call_count == 1
+
     def test_error_screenshot_failure_does_not_propagate(self):
         """Exception from error screenshot is swallowed — returns None cleanly."""
         self._stub_price_extractor()
@@ -431,3 +634,432 @@ class TestProcessBooking:
 
         assert result == mock_prices
         assert page.goto.call_count == 2  # first attempt + one retry
+
+    def test_uses_search_response_prices_without_waiting_for_cards(self):
+        """Parsed rentalCarSearch prices skip wait_for_results and the DOM scrape."""
+        response_prices = {"Economy Car": 250.0}
+        stub = self._stub_price_extractor({"Economy Car": 999.0}, response_prices)
+        page = MagicMock()
+
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture",
+                   return_value={"status": 200, "body": "{}"}), \
+             patch("price_monitor.wait_for_results") as mock_wait:
+            from price_monitor import process_booking
+            result = process_booking(page, self.BOOKING)
+
+        assert result == response_prices
+        mock_wait.assert_not_called()
+        stub.extract_lowest_prices.assert_not_called()
+        stub.extract_prices_from_response.assert_called_once_with("{}", "Economy Car")
+
+    def test_records_stage_spans(self, tmp_path):
+        """Each stage of a successful booking is timed on the passed RunTimer."""
+        self._stub_price_extractor(response_prices={"Economy Car": 250.0})
+        page = MagicMock()
+
+        from screenshots import Screenshotter
+        from timing import RunTimer
+        timer = RunTimer(path="")
+        screenshots = Screenshotter(policy="all", directory=str(tmp_path))
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture",
+                   return_value={"status": 200, "body": "{}"}):
+            from price_monitor import process_booking
+            process_booking(page, self.BOOKING, timer=timer, screenshots=screenshots)
+
+        stages = [entry["stage"] for entry in timer.records]
+        assert stages == ["navigate", "settle", "search", "parse_response", "screenshot"]
+        assert all(entry["booking"] == "KOA 04/01/2025-04/08/2025" for entry in timer.records)
+
+    def test_success_skips_screenshot_under_on_failure_policy(self):
+        """The on-failure policy never captures a successful booking."""
+        self._stub_price_extractor(response_prices={"Economy Car": 250.0})
+        page = MagicMock()
+
+        from screenshots import Screenshotter
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture",
+                   return_value={"status": 200, "body": "{}"}):
+            from price_monitor import process_booking
+            process_booking(page, self.BOOKING, screenshots=Screenshotter(policy="on-failure"))
+
+        page.screenshot.assert_not_called()
+
+    def test_falls_back_to_dom_when_response_unparseable(self):
+        """Empty response parse falls back to wait_for_results + DOM extraction."""
+        stub = self._stub_price_extractor({"Economy Car": 301.0}, {})
+        page = MagicMock()
+
+        with patch("price_monitor.fill_search_form", return_value=True), \
+             patch("price_monitor.click_search_and_capture",
+                   return_value={"status": 200, "body": "<html></html>"}), \
+             patch("price_monitor.wait_for_results", return_value=True) as mock_wait:
+            from price_monitor import process_booking
+            result = process_booking(page, self.BOOKING)
+
+        assert result == {"Economy Car": 301.0}
+        mock_wait.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Concurrent scraping: scrape_bookings() worker pool
+# ---------------------------------------------------------------------------
+
+class TestScrapeBookings:
+    """Tests for scrape_bookings() — N browser contexts sharing a retry scheduler."""
+
+    BOOKINGS = [
+        {"location": "KOA", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"},
+        {"location": "LIH", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"},
+        {"location": "OGG", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"},
+    ]
+
+    def _fake_setup_browser(self, **kwargs):
+        return MagicMock(name="pw"), MagicMock(name="browser"), MagicMock(name="ctx"), MagicMock(name="page")
+
+    def test_every_booking_is_reported_once(self):
+        """Each queued booking produces exactly one on_result callback."""
+        results = {}
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser), \
+             patch("price_monitor.attempt_booking",
+                   side_effect=lambda page, booking, **kw: ({"Economy Car": 100.0}, None)):
+            from price_monitor import scrape_bookings
+            scrape_bookings(self.BOOKINGS, lambda i, p: results.setdefault(i, p), workers=2)
+
+        assert sorted(results) == [0, 1, 2]
+        assert all(p == {"Economy Car": 100.0} for p in results.values())
+
+    def test_returns_stats_per_worker(self):
+        """One timing dict per worker; booking counts add up to the total."""
+        from retry import ExtractionError
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser), \
+             patch("price_monitor.attempt_booking", return_value=(None, ExtractionError("no prices"))):
+            from price_monitor import scrape_bookings
+            stats = scrape_bookings(self.BOOKINGS, lambda i, p: None, workers=2)
+
+        assert len(stats) == 2
+        assert sum(s["bookings"] for s in stats) == 3
+        assert all(s["succeeded"] == 0 for s in stats)
+
+    def test_failed_booking_is_retried_at_end_of_run(self):
+        """A retryable failure is requeued once and reported with its retry result."""
+        from retry import ResultsTimeoutError
+        outcomes = {"KOA": [(None, ResultsTimeoutError("slow")), ({"Economy Car": 90.0}, None)]}
+        results = {}
+
+        def attempt(page, booking, **kw):
+            queued = outcomes.get(booking["location"])
+            return queued.pop(0) if queued else ({"Economy Car": 100.0}, None)
+
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser), \
+             patch("price_monitor.attempt_booking", side_effect=attempt):
+            from price_monitor import scrape_bookings
+            stats = scrape_bookings(self.BOOKINGS, lambda i, p: results.setdefault(i, p), workers=1)
+
+        assert results[0] == {"Economy Car": 90.0}
+        assert stats[0]["bookings"] == 4
+
+    def test_circuit_breaker_stops_run(self):
+        """Consecutive failures open the breaker; untouched bookings report None."""
+        from retry import NavigationError
+        bookings = self.BOOKINGS * 3
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser), \
+             patch("price_monitor.attempt_booking", return_value=(None, NavigationError("blocked"))) as mock_attempt, \
+             patch("retry.CIRCUIT_BREAKER_THRESHOLD", 3):
+            from price_monitor import scrape_bookings
+            results = {}
+            scrape_bookings(bookings, lambda i, p: results.setdefault(i, p), workers=1)
+
+        assert mock_attempt.call_count == 3
+        assert len(results) == len(bookings)
+        assert all(p is None for p in results.values())
+
+    def test_worker_count_capped_at_booking_count(self):
+        """No idle browsers are launched when workers > bookings."""
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser) as mock_setup, \
+             patch("price_monitor.attempt_booking", return_value=({"Economy Car": 1.0}, None)):
+            from price_monitor import scrape_bookings
+            stats = scrape_bookings(self.BOOKINGS[:1], lambda i, p: None, workers=4)
+
+        assert len(stats) == 1
+        assert mock_setup.call_count == 1
+
+    def test_context_recycled_without_losing_progress(self):
+        """The watchdog swaps contexts every N searches; every booking is still reported."""
+        results = {}
+        fresh = (MagicMock(name="ctx2"), MagicMock(name="page2"))
+        with patch("price_monitor.setup_browser", side_effect=self._fake_setup_browser), \
+             patch("price_monitor.attempt_booking", return_value=({"Economy Car": 1.0}, None)) as mock_attempt, \
+             patch("price_monitor.recycle_context", return_value=fresh) as mock_recycle, \
+             patch("memory_watchdog.MEMORY_RECYCLE_SEARCHES", 2):
+            from price_monitor import scrape_bookings
+            stats = scrape_bookings(self.BOOKINGS, lambda i, p: results.setdefault(i, p), workers=1)
+
+        assert mock_recycle.call_count == 1
+        assert mock_attempt.call_args_list[2].args[0] is fresh[1]
+        assert stats[0]["recycles"] == 1
+        assert sorted(results) == [0, 1, 2]
+
+    def test_unprocessed_bookings_reported_as_failed_when_browser_fails(self):
+        """If every worker fails to launch, each booking is still reported with None."""
+        results = {}
+        with patch("price_monitor.setup_browser", side_effect=Exception("launch failed")):
+            from price_monitor import scrape_bookings
+            scrape_bookings(self.BOOKINGS, lambda i, p: results.setdefault(i, p), workers=2)
+
+        assert results == {0: None, 1: None, 2: None}
+
+
+class TestRecycleContext:
+    """Tests for recycle_context() — fresh context carrying the old session."""
+
+    def test_new_context_gets_old_storage_state(self):
+        from price_monitor import recycle_context
+        browser, context, page = MagicMock(), MagicMock(), MagicMock()
+        context.storage_state.return_value = {"cookies": [{"name": "sid"}], "origins": []}
+        blocker = MagicMock()
+
+        new_context, new_page = recycle_context(browser, context, page, blocker=blocker)
+
+        kwargs = browser.new_context.call_args.kwargs
+        assert kwargs["storage_state"] == {"cookies": [{"name": "sid"}], "origins": []}
+        assert new_context is browser.new_context.return_value
+        new_context.route.assert_called_once_with("**/*", blocker.handle_route)
+        assert new_page is new_context.new_page.return_value
+        context.close.assert_called_once()
+
+    def test_persistent_profile_only_replaces_page(self):
+        from price_monitor import recycle_context
+        context, page = MagicMock(), MagicMock()
+
+        new_context, new_page = recycle_context(None, context, page)
+
+        assert new_context is context
+        assert new_page is context.new_page.return_value
+        page.close.assert_called_once()
+        context.close.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Pacing modes: human think-time vs fast condition waits
+# ---------------------------------------------------------------------------
+
+class TestPacing:
+    """Tests for the 'human' and 'fast' pacing modes of the form helpers."""
+
+    def test_human_pacing_sleeps_between_actions(self):
+        """Human pacing keeps the randomized wait_for_timeout calls."""
+        page, locator = _mock_page()
+        locator.is_checked.return_value = False
+        from price_monitor import check_age_checkbox
+        check_age_checkbox(page, pacing="human")
+        assert page.wait_for_timeout.call_count == 2
+
+    def test_booking_gap_keeps_a_minimum_in_fast_pacing(self):
+        """Fast pacing shortens the pause between bookings but never drops it."""
+        from price_monitor import booking_gap
+        assert 2000 <= booking_gap("human") <= 4000
+        with patch("price_monitor.FAST_BOOKING_GAP_MS", 750):
+            assert booking_gap("fast") == 750
+
+    def test_fast_pacing_waits_on_checkbox_state(self):
+        """Fast pacing replaces the sleeps with a wait on the checked state."""
+        page, locator = _mock_page()
+        locator.is_checked.return_value = False
+        from price_monitor import check_age_checkbox
+        check_age_checkbox(page, pacing="fast")
+        page.wait_for_timeout.assert_not_called()
+        page.wait_for_function.assert_called_once()
+
+    def test_fast_date_entry_waits_for_value_to_settle(self):
+        """enter_date waits for the input to hold the typed value instead of sleeping."""
+        page, locator = _mock_page()
+        locator.input_value.return_value = "04/01/2025"
+        from price_monitor import enter_date
+        assert enter_date(page, "pickUpDateWidget", "04/01/2025", pacing="fast") is True
+        page.wait_for_timeout.assert_not_called()
+        _, kwargs = page.wait_for_function.call_args
+        assert kwargs["arg"] == ["pickUpDateWidget", "04/01/2025"]
+
+    def test_fast_wait_timeout_does_not_abort(self):
+        """A condition that never holds degrades to the caller's own verification."""
+        page, locator = _mock_page()
+        page.wait_for_function.side_effect = Exception("Timeout")
+        locator.input_value.return_value = "04/01/2025"
+        from price_monitor import enter_date
+        assert enter_date(page, "pickUpDateWidget", "04/01/2025", pacing="fast") is True
+
+    def test_unknown_pacing_mode_raises(self):
+        from price_monitor import resolve_pacing
+        with pytest.raises(ValueError):
+            resolve_pacing("turbo")
+
+
+# ---------------------------------------------------------------------------
+# Search deduplication: plan_searches() and PriceCheckRun fan-out
+# ---------------------------------------------------------------------------
+
+def _booking(location, category, pickup="04/02/2099", dropoff="04/08/2099", time="12:00 PM"):
+    return {
+        "location": location,
+        "pickup_date": pickup,
+        "dropoff_date": dropoff,
+        "pickup_time": time,
+        "dropoff_time": "12:00 PM",
+        "focus_category": category,
+    }
+
+
+class TestPlanSearches:
+    """Tests for plan_searches(bookings)."""
+
+    def test_groups_bookings_that_differ_only_in_category(self):
+        from price_monitor import plan_searches
+        bookings = [
+            _booking("SAN", "Standard Car"),
+            _booking("KOA", "Economy Car"),
+            _booking("SAN", "Full-size Car"),
+        ]
+        assert plan_searches(bookings) == [[0, 2], [1]]
+
+    def test_different_times_are_separate_searches(self):
+        from price_monitor import plan_searches
+        bookings = [_booking("SAN", "Standard Car"), _booking("SAN", "Standard Car", time="10:00 AM")]
+        assert plan_searches(bookings) == [[0], [1]]
+
+
+class TestPriceCheckRun:
+    """Tests for PriceCheckRun — one search per group, prices fanned out."""
+
+    def _run(self, bookings):
+        tracker = MagicMock()
+        tracker.cleanup_expired_bookings.return_value = []
+        from price_monitor import PriceCheckRun
+        run = PriceCheckRun(tracker, bookings)
+        run.categories = MagicMock(name="category_cache")
+        return run
+
+    def test_one_search_per_group(self):
+        run = self._run([_booking("SAN", "Standard Car"), _booking("SAN", "Full-size Car")])
+        assert len(run.searches) == 1
+
+    def test_result_is_recorded_for_every_booking_in_group(self):
+        bookings = [
+            _booking("SAN", "Standard Car"),
+            _booking("KOA", "Economy Car"),
+            _booking("SAN", "Full-size Car"),
+        ]
+        run = self._run(bookings)
+        prices = {"Standard Car": 414.04, "Full-size Car": 418.0}
+        with patch("price_monitor.record_booking_prices",
+                   side_effect=lambda t, a, booking, p: {"booking": booking}) as mock_record:
+            run.on_result(0, prices)
+
+        assert mock_record.call_count == 2
+        assert sorted(run.entries) == [0, 2]
+        assert run.entries[2]["booking"]["focus_category"] == "Full-size Car"
+
+    def test_result_refreshes_category_cache(self):
+        run = self._run([_booking("SAN", "Standard Car")])
+        prices = {"Standard Car": 414.04, "Full-size Car": 418.0}
+        with patch("price_monitor.record_booking_prices", return_value={}):
+            run.on_result(0, prices)
+        location, categories = run.categories.update.call_args[0]
+        assert location == "SAN"
+        assert sorted(categories) == ["Full-size Car", "Standard Car"]
+
+    def test_failed_search_leaves_category_cache_alone(self):
+        run = self._run([_booking("SAN", "Standard Car")])
+        run.on_result(0, None)
+        run.categories.update.assert_not_called()
+
+
+class TestRunPriceChecks:
+    """Tests for the end-of-run retention and compaction in run_price_checks()."""
+
+    def _run(self, tracker, run_side_effect=None):
+        run = MagicMock(name="run", searches=[])
+        run.finish.return_value = True
+        with patch("price_monitor.PriceCheckRun", return_value=run, side_effect=run_side_effect):
+            from price_monitor import run_price_checks
+            return run_price_checks(tracker, [], workers=1, engine="sync")
+
+    def test_retention_failure_keeps_run_result(self, capsys):
+        tracker = MagicMock()
+        tracker.apply_retention.side_effect = OSError("disk full")
+        assert self._run(tracker) is True
+        tracker.compact.assert_called_once()
+        assert "Could not apply price retention: disk full" in capsys.readouterr().out
+
+    def test_compact_failure_does_not_hide_run_error(self, capsys):
+        tracker = MagicMock()
+        tracker.compact.side_effect = OSError("disk full")
+        assert self._run(tracker, run_side_effect=ValueError("scrape broke")) is False
+        out = capsys.readouterr().out
+        assert "An error occurred: scrape broke" in out
+        assert "Could not compact the price history: disk full" in out
+
+
+class TestCheckBooking:
+    """Tests for check_booking() — HTTP fast path with browser fallback."""
+
+    BOOKING = {"location": "KOA", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"}
+
+    def test_fast_path_prices_skip_the_browser(self):
+        context, page = MagicMock(), MagicMock()
+        with patch("price_monitor.fast_path_enabled", return_value=True), \
+             patch("price_monitor.fetch_prices", return_value={"Economy Car": 250.0}), \
+             patch("price_monitor.attempt_booking") as mock_attempt:
+            from price_monitor import check_booking
+            assert check_booking(context, page, self.BOOKING) == ({"Economy Car": 250.0}, None)
+        mock_attempt.assert_not_called()
+
+    def test_falls_back_to_browser_when_fast_path_fails(self):
+        context, page = MagicMock(), MagicMock()
+        with patch("price_monitor.fast_path_enabled", return_value=True), \
+             patch("price_monitor.fetch_prices", return_value={}), \
+             patch("price_monitor.attempt_booking", return_value=({"Economy Car": 260.0}, None)) as mock_attempt:
+            from price_monitor import check_booking
+            prices, _ = check_booking(context, page, self.BOOKING)
+        assert prices == {"Economy Car": 260.0}
+        mock_attempt.assert_called_once()
+
+    def test_disabled_fast_path_is_not_tried(self):
+        context, page = MagicMock(), MagicMock()
+        with patch("price_monitor.fast_path_enabled", return_value=False), \
+             patch("price_monitor.fetch_prices") as mock_fetch, \
+             patch("price_monitor.attempt_booking", return_value=(None, None)):
+            from price_monitor import check_booking
+            check_booking(context, page, self.BOOKING)
+        mock_fetch.assert_not_called()
+
+
+class TestValidateCategory:
+    """Tests for validate_category() — cache first, search on a miss."""
+
+    def test_cached_category_needs_no_search(self, tmp_path):
+        from category_cache import CategoryCache
+        from price_monitor import validate_category
+        cache = CategoryCache(path=str(tmp_path / "categories.json"))
+        cache.update("KOA", ["Economy Car", "Standard SUV"])
+        page = MagicMock()
+
+        assert validate_category(page, "Economy Car", "KOA", cache=cache) is True
+        page.goto.assert_not_called()
+
+    def test_cache_miss_searches_and_refreshes_cache(self, tmp_path):
+        from category_cache import CategoryCache
+        from price_monitor import validate_category
+        cache = CategoryCache(path=str(tmp_path / "categories.json"))
+        page = MagicMock()
+
+        with patch("price_monitor.enter_location"), patch("price_monitor.enter_date"), \
+             patch("price_monitor.set_times"), patch("price_monitor.check_age_checkbox"), \
+             patch("price_monitor.click_search"), \
+             patch("price_monitor.wait_for_results", return_value=True), \
+             patch("price_monitor.get_available_categories", return_value={"Minivan"}):
+            assert validate_category(page, "Economy Car", "LIH", cache=cache) is False
+
+        page.goto.assert_called_once()
+        assert cache.get("LIH") == ["Minivan"]
@@ -0,0 +1,104 @@
+# test_price_stats.py
+import json
+from unittest.mock import patch
+
+from booking_storage import SqliteBookingTracker
+from booking_tracker import BookingTracker
+from price_stats import add_record, build_stats, category_trend, current_stats, main
+
+RECORDS = [
+    {"prices": {"Economy Car": 300.0, "Minivan": 450.0}},
+    {"prices": {"Minivan": 440.0}},
+    {"prices": {"Economy Car": 280.0, "Minivan": 430.0}},
+    {"prices": {"Economy Car": 290.0, "Compact SUV": 500.0}},
+]
+
+
+def _scan(records, category):
+    """The full-history computation the aggregates replace."""
+    prices = [r["prices"][category] for r in records if category in r["prices"]]
+    return {
+        "current": records[-1]["prices"].get(category),
+        "previous_price": records[-2]["prices"].get(category) if len(records) > 1 else None,
+        "lowest": min(prices),
+        "highest": max(prices),
+        "average": sum(prices) / len(prices),
+        "total_checks": len(prices),
+    }
+
+
+class TestAggregates:
+    def test_matches_full_scan_after_every_record(self):
+        stats = build_stats([])
+        for n, record in enumerate(RECORDS, 1):
+            add_record(stats, record["prices"])
+            for category in ("Economy Car", "Minivan", "Compact SUV"):
+                if any(category in r["prices"] for r in RECORDS[:n]):
+                    assert category_trend(stats, category) == _scan(RECORDS[:n], category)
+        assert stats["checks"] == len(RECORDS)
+
+    def test_unknown_category(self):
+        assert category_trend(build_stats(RECORDS), "Luxury Car") is None
+
+    def test_stale_stats_are_rebuilt(self):
+        booking = {"price_history": RECORDS[:2], "price_stats": build_stats(RECORDS[:1])}
+        assert current_stats(booking)["checks"] == 2
+        assert booking["price_stats"]["categories"]["Minivan"]["last"] == 440.0
+
+
+class TestTrackerTrends:
+    BOOKING = {"location": "KOA", "pickup_date": "04/01/2030", "dropoff_date": "04/08/2030",
+               "focus_category": "Economy Car", "holding_price": 310.0}
+    BOOKING_ID = "KOA_04012030_04082030_EconomyCar"
+
+    def _tracker(self, tmp_path):
+        return BookingTracker(history_file=str(tmp_path / "price_history.json"), price_log=True, compact_every=0)
+
+    def test_update_prices_maintains_stats(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        tracker.add_booking(**self.BOOKING)
+        for record in RECORDS:
+            tracker.update_prices(self.BOOKING_ID, record["prices"])
+
+        trends = tracker.get_price_trends(self.BOOKING_ID)["focus_category"]
+        assert trends == dict(_scan(RECORDS, "Economy Car"), holding_price=310.0)
+        stats = tracker.bookings["bookings"][self.BOOKING_ID]["price_stats"]
+        assert stats["checks"] == 4
+
+    def test_stats_survive_log_replay_and_compaction(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        tracker.add_booking(**self.BOOKING)
+        tracker.update_prices(self.BOOKING_ID, RECORDS[0]["prices"])
+        reloaded = self._tracker(tmp_path)
+        assert reloaded.bookings["bookings"][self.BOOKING_ID]["price_stats"]["checks"] == 1
+        reloaded.compact()
+        data = json.loads((tmp_path / "price_history.json").read_text())
+        assert data["bookings"][self.BOOKING_ID]["price_stats"]["categories"]["Economy Car"]["count"] == 1
+
+    def test_never_priced_focus_category(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        tracker.add_booking(**dict(self.BOOKING, focus_category="Luxury Car"))
+        tracker.update_prices("KOA_04012030_04082030_LuxuryCar", {"Economy Car": 300.0})
+        trends = tracker.get_price_trends("KOA_04012030_04082030_LuxuryCar")["focus_category"]
+        assert (trends["current"], trends["lowest"], trends["total_checks"]) == (None, float("inf"), 0)
+
+    def test_rebuild(self, tmp_path):
+        tracker = self._tracker(tmp_path)
+        tracker.add_booking(**self.BOOKING)
+        tracker.update_prices(self.BOOKING_ID, RECORDS[0]["prices"])
+        tracker.bookings["bookings"][self.BOOKING_ID]["price_stats"] = {"checks": 1, "categories": {}}
+
+        assert tracker.rebuild_price_stats() == 1
+        data = json.loads((tmp_path / "price_history.json").read_text())
+        assert data["bookings"][self.BOOKING_ID]["price_stats"] == build_stats(RECORDS[:1])
+
+    def test_rebuild_cli_on_sqlite(self, tmp_path, capsys):
+        tracker = SqliteBookingTracker(db_file=str(tmp_path / "price_history.db"), export_file=None)
+        tracker.add_booking(**self.BOOKING)
+        tracker.update_prices(self.BOOKING_ID, RECORDS[0]["prices"])
+
+        with patch("sys.argv", ["price_stats.py", "rebuild"]), \
+                patch("booking_tracker.BookingTracker.from_config", return_value=tracker):
+            main()
+        output = capsys.readouterr().out
+        assert "Nothing to rebuild" in output and "0 booking" not in output
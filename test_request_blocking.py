@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unit tests for request_blocking.py — context.route() blocking policy.
+Run: python3 -m pytest test_request_blocking.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+
+def _route(url, resource_type):
+    route = MagicMock(name="route")
+    route.request.url = url
+    route.request.resource_type = resource_type
+    return route
+
+
+def _blocker():
+    from request_blocking import RequestBlocker
+    return RequestBlocker({"image", "media", "font"}, ["costcotravel.com"])
+
+
+class TestShouldBlock:
+    """Tests for RequestBlocker.should_block(url, resource_type)."""
+
+    def test_blocks_images_on_first_party_host(self):
+        assert _blocker().should_block("https://www.costcotravel.com/img/logo.png", "image")
+
+    def test_allows_first_party_scripts_and_documents(self):
+        blocker = _blocker()
+        assert not blocker.should_block("https://www.costcotravel.com/Rental-Cars", "document")
+        assert not blocker.should_block("https://static.costcotravel.com/app.js", "script")
+
+    def test_blocks_third_party_hosts_of_any_type(self):
+        blocker = _blocker()
+        assert blocker.should_block("https://www.google-analytics.com/collect", "xhr")
+        assert blocker.should_block("https://ads.example.com/tag.js", "script")
+
+    def test_lookalike_host_is_third_party(self):
+        """notcostcotravel.com must not match the costcotravel.com allowlist entry."""
+        assert _blocker().should_block("https://notcostcotravel.com/app.js", "script")
+
+    def test_search_request_is_never_blocked(self):
+        assert not _blocker().should_block("https://cdn.example.com/rentalCarSearch.act", "xhr")
+
+    def test_non_http_urls_pass_through(self):
+        assert not _blocker().should_block("data:image/png;base64,AAAA", "image")
+
+
+class TestHandleRoute:
+    """Tests for RequestBlocker.handle_route(route) and its counters."""
+
+    def test_aborts_blocked_and_continues_allowed(self):
+        blocker = _blocker()
+        blocked = _route("https://www.costcotravel.com/a.png", "image")
+        allowed = _route("https://www.costcotravel.com/Rental-Cars", "document")
+        blocker.handle_route(blocked)
+        blocker.handle_route(allowed)
+        blocked.abort.assert_called_once()
+        allowed.continue_.assert_called_once()
+
+    def test_counts_per_search_and_run_totals(self):
+        blocker = _blocker()
+        blocker.handle_route(_route("https://www.costcotravel.com/a.png", "image"))
+        blocker.start_search()
+        blocker.handle_route(_route("https://www.costcotravel.com/b.woff2", "font"))
+        assert blocker.search["blocked"] == 1
+        assert blocker.search["by_type"] == {"font": 1}
+        assert blocker.totals["blocked"] == 2
+        assert blocker.totals["bytes_saved"] > 0
+
+
+class TestFromConfig:
+    """Tests for RequestBlocker.from_config(profile)."""
+
+    def test_off_profile_returns_none(self):
+        from request_blocking import RequestBlocker
+        assert RequestBlocker.from_config("off") is None
+
+    def test_strict_profile_blocks_stylesheets(self):
+        from request_blocking import RequestBlocker
+        blocker = RequestBlocker.from_config("strict")
+        assert "stylesheet" in blocker.blocked_types
+
+    def test_unknown_profile_raises(self):
+        from request_blocking import RequestBlocker
+        with pytest.raises(ValueError):
+            RequestBlocker.from_config("everything")
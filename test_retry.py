@@ -0,0 +1,93 @@
+# test_retry.py
+from unittest.mock import patch
+
+from retry import (
+    CircuitBreaker,
+    ExtractionError,
+    NavigationError,
+    ResultsTimeoutError,
+    RetryScheduler,
+    backoff_delay,
+    error_kind,
+    is_retryable,
+)
+
+BOOKINGS = [{"location": code, "pickup_date": "04/01/2025"} for code in ("KOA", "LIH", "OGG")]
+
+
+class TestClassification:
+    def test_kinds(self):
+        assert error_kind(NavigationError("x")) == "navigation"
+        assert error_kind(ResultsTimeoutError("x")) == "results_timeout"
+        assert error_kind(ValueError("x")) == "unexpected"
+        assert error_kind(None) is None
+
+    def test_retryable(self):
+        assert is_retryable(NavigationError("x"))
+        assert is_retryable(RuntimeError("x"))
+        assert not is_retryable(ExtractionError("x"))
+
+
+class TestBackoffDelay:
+    def test_grows_exponentially_within_jitter_band(self):
+        with patch("retry.random.uniform", side_effect=lambda low, high: high):
+            assert backoff_delay(1, base=2, cap=30) == 2
+            assert backoff_delay(2, base=2, cap=30) == 4
+            assert backoff_delay(3, base=2, cap=30) == 8
+        with patch("retry.random.uniform", side_effect=lambda low, high: low):
+            assert backoff_delay(3, base=2, cap=30) == 4
+
+    def test_capped(self):
+        assert backoff_delay(10, base=2, cap=30) <= 30
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(threshold=3)
+        assert not breaker.record_failure("navigation")
+        assert not breaker.record_failure("navigation")
+        assert breaker.record_failure("results_timeout")
+        assert breaker.open
+
+    def test_success_resets_count(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_failure("navigation")
+        breaker.record_success()
+        breaker.record_failure("navigation")
+        assert not breaker.open
+
+
+class TestRetryScheduler:
+    def _drain(self, scheduler, outcome):
+        handed_out = []
+        while True:
+            item = scheduler.next()
+            if item is None:
+                return handed_out
+            index, booking = item
+            handed_out.append(index)
+            prices, error = outcome(index, handed_out.count(index))
+            scheduler.record(index, booking, prices, error)
+
+    def test_failed_booking_requeued_once_at_end(self):
+        scheduler = RetryScheduler(BOOKINGS, breaker=CircuitBreaker(threshold=0), budget_seconds=0)
+        order = self._drain(scheduler, lambda i, n: (None, NavigationError("x")) if i == 0 else ({"A": 1}, None))
+        assert order == [0, 1, 2, 0]
+
+    def test_non_retryable_failure_is_final(self):
+        scheduler = RetryScheduler(BOOKINGS, breaker=CircuitBreaker(threshold=0), budget_seconds=0)
+        order = self._drain(scheduler, lambda i, n: (None, ExtractionError("x")) if i == 0 else ({"A": 1}, None))
+        assert order == [0, 1, 2]
+
+    def test_no_requeue_after_budget(self):
+        scheduler = RetryScheduler(BOOKINGS, breaker=CircuitBreaker(threshold=0), budget_seconds=60)
+        scheduler.deadline = 0
+        order = self._drain(scheduler, lambda i, n: (None, NavigationError("x")) if i == 0 else ({"A": 1}, None))
+        assert order == [0, 1, 2]
+
+    def test_open_breaker_stops_handing_out(self):
+        scheduler = RetryScheduler(BOOKINGS, breaker=CircuitBreaker(threshold=2), budget_seconds=0)
+        order = self._drain(scheduler, lambda i, n: (None, NavigationError("x")))
+        assert order == [0, 1]
+        assert scheduler.remaining() == 2
+        assert not scheduler.has_work()
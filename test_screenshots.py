@@ -0,0 +1,112 @@
+# test_screenshots.py
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from screenshots import Screenshotter
+
+BOOKING = {"location": "KOA"}
+
+
+class TestShouldCapture:
+    def test_off_never_captures(self):
+        shots = Screenshotter(policy="off")
+        assert not shots.should_capture(ok=True)
+        assert not shots.should_capture(ok=False)
+
+    def test_on_failure_only_captures_failures(self):
+        shots = Screenshotter(policy="on-failure")
+        assert not shots.should_capture(ok=True)
+        assert shots.should_capture(ok=False)
+
+    def test_sampled_uses_sample_rate_for_successes(self):
+        shots = Screenshotter(policy="sampled", sample_rate=0.25)
+        with patch("screenshots.random.random", return_value=0.1):
+            assert shots.should_capture(ok=True)
+        with patch("screenshots.random.random", return_value=0.9):
+            assert not shots.should_capture(ok=True)
+        assert shots.should_capture(ok=False)
+
+    def test_unknown_policy_raises(self):
+        with pytest.raises(ValueError):
+            Screenshotter(policy="sometimes")
+
+
+class TestCapture:
+    def test_jpeg_capture_written_in_background(self, tmp_path):
+        shots = Screenshotter(policy="all", fmt="jpeg", quality=55, directory=str(tmp_path))
+        page = MagicMock()
+        page.screenshot.return_value = b"jpeg-bytes"
+
+        name = shots.capture(page, BOOKING, ok=True)
+        shots.flush()
+
+        page.screenshot.assert_called_once_with(type="jpeg", quality=55)
+        assert name.startswith("results_KOA_") and name.endswith(".jpg")
+        assert (tmp_path / name).read_bytes() == b"jpeg-bytes"
+
+    def test_clip_selector_captures_element(self, tmp_path):
+        shots = Screenshotter(policy="all", fmt="png", clip_selector="#results", directory=str(tmp_path))
+        page = MagicMock()
+        element = page.locator.return_value.first
+        element.screenshot.return_value = b"png-bytes"
+
+        shots.capture(page, BOOKING, ok=False)
+        shots.flush()
+
+        page.locator.assert_called_once_with("#results")
+        page.screenshot.assert_not_called()
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_missing_clip_element_falls_back_to_page(self, tmp_path):
+        shots = Screenshotter(policy="all", fmt="png", clip_selector="#results", directory=str(tmp_path))
+        page = MagicMock()
+        page.locator.return_value.first.screenshot.side_effect = Exception("timeout")
+        page.screenshot.return_value = b"png-bytes"
+
+        shots.capture(page, BOOKING, ok=True)
+        shots.flush()
+
+        page.screenshot.assert_called_once_with(type="png")
+
+    def test_capture_failure_returns_none(self, tmp_path):
+        shots = Screenshotter(policy="all", directory=str(tmp_path))
+        page = MagicMock()
+        page.screenshot.side_effect = Exception("page closed")
+        assert shots.capture(page, BOOKING, ok=False) is None
+
+    def test_webp_falls_back_to_jpeg_without_pillow(self):
+        with patch("screenshots.webp_supported", return_value=False):
+            assert Screenshotter(fmt="webp").fmt == "jpeg"
+
+
+class TestRotate:
+    def _touch(self, directory, name, size, age_days):
+        path = directory / name
+        path.write_bytes(b"x" * size)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_removes_files_past_max_age(self, tmp_path):
+        old = self._touch(tmp_path, "old.jpg", 10, age_days=10)
+        new = self._touch(tmp_path, "new.jpg", 10, age_days=1)
+        shots = Screenshotter(directory=str(tmp_path), max_age_days=7)
+        assert shots.rotate() == 1
+        assert not old.exists() and new.exists()
+
+    def test_removes_oldest_until_under_size_cap(self, tmp_path):
+        oldest = self._touch(tmp_path, "a.jpg", 600_000, age_days=3)
+        middle = self._touch(tmp_path, "b.jpg", 600_000, age_days=2)
+        newest = self._touch(tmp_path, "c.jpg", 600_000, age_days=1)
+        shots = Screenshotter(directory=str(tmp_path), max_age_days=30, max_total_mb=1.5)
+        assert shots.rotate() == 1
+        assert not oldest.exists() and middle.exists() and newest.exists()
+
+    def test_ignores_non_image_files(self, tmp_path):
+        note = self._touch(tmp_path, "notes.txt", 10, age_days=30)
+        shots = Screenshotter(directory=str(tmp_path), max_age_days=7)
+        assert shots.rotate() == 0
+        assert note.exists()
@@ -0,0 +1,61 @@
+# test_timing.py
+import json
+
+import pytest
+
+from timing import RunTimer, timed
+
+BOOKING = {"location": "KOA", "pickup_date": "04/01/2025", "dropoff_date": "04/08/2025"}
+
+
+class TestRunTimer:
+    def test_span_records_stage_and_booking(self):
+        timer = RunTimer(path="", run_id="r1")
+        with timer.span("navigate", BOOKING):
+            pass
+        entry = timer.records[0]
+        assert entry["run_id"] == "r1"
+        assert entry["stage"] == "navigate"
+        assert entry["booking"] == "KOA 04/01/2025-04/08/2025"
+        assert entry["ok"] is True
+        assert entry["seconds"] >= 0
+
+    def test_span_marks_failure_and_reraises(self):
+        timer = RunTimer(path="")
+        with pytest.raises(ValueError):
+            with timer.span("search"):
+                raise ValueError("boom")
+        assert timer.records[0]["ok"] is False
+
+    def test_records_are_appended_as_jsonl(self, tmp_path):
+        path = tmp_path / "timings.jsonl"
+        timer = RunTimer(path=str(path))
+        timer.record("navigate", 1.5, BOOKING)
+        timer.record("search", 2.0, BOOKING)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["stage"] for line in lines] == ["navigate", "search"]
+
+    def test_summary_aggregates_per_stage(self):
+        timer = RunTimer(path="")
+        for seconds in (1.0, 2.0, 3.0, 4.0):
+            timer.record("search", seconds)
+        timer.record("navigate", 0.5)
+        summary = timer.summary()
+        assert list(summary) == ["search", "navigate"]
+        assert summary["search"]["count"] == 4
+        assert summary["search"]["mean"] == 2.5
+        assert summary["search"]["p50"] == 2.0
+        assert summary["search"]["p95"] == 4.0
+        assert summary["search"]["total"] == 10.0
+
+
+class TestTimed:
+    def test_no_timer_is_a_no_op(self):
+        with timed(None, "navigate", BOOKING):
+            pass
+
+    def test_delegates_to_timer(self):
+        timer = RunTimer(path="")
+        with timed(timer, "navigate", BOOKING):
+            pass
+        assert timer.records[0]["stage"] == "navigate"
@@ -0,0 +1,112 @@
+# timing.py
+#
+# Lightweight per-stage timing for price check runs. Stages are wrapped in
+# spans; each finished span is appended to TIMING_FILE as one JSON line
+#   {"run_id", "ts", "booking", "stage", "seconds", "ok"}
+# so runs can be aggregated later, and a per-stage summary table is printed
+# at the end of run_price_checks.
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from config import TIMING_FILE
+
+
+def booking_label(booking):
+    """Short booking identifier used in timing records."""
+    if booking is None:
+        return None
+    return f"{booking['location']} {booking['pickup_date']}-{booking['dropoff_date']}"
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RunTimer:
+    """Collects stage spans for one run. Safe to share across worker threads."""
+
+    def __init__(self, path=None, run_id=None):
+        self.path = TIMING_FILE if path is None else path
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.records = []
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, booking=None, ok=True):
+        entry = {
+            "run_id": self.run_id,
+            "ts": datetime.now().isoformat(),
+            "booking": booking_label(booking),
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "ok": ok,
+        }
+        with self._lock:
+            self.records.append(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"Could not write timing record: {str(e)}")
+        return entry
+
+    @contextmanager
+    def span(self, stage, booking=None):
+        """Time the enclosed block; a raised exception is recorded as ok=False."""
+        started = time.perf_counter()
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, booking, ok)
+
+    def summary(self):
+        """Return {stage: {"count", "mean", "p50", "p95", "max", "total"}} in first-seen order."""
+        by_stage = {}
+        for entry in self.records:
+            by_stage.setdefault(entry["stage"], []).append(entry["seconds"])
+        return {
+            stage: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": max(values),
+                "total": sum(values),
+            }
+            for stage, values in by_stage.items()
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\nStage timings (seconds):")
+        header = f"{'Stage':<22}{'count':>6}{'mean':>8}{'p50':>8}{'p95':>8}{'max':>8}{'total':>9}"
+        print(header)
+        print("-" * len(header))
+        for stage, s in summary.items():
+            print(
+                f"{stage:<22}{s['count']:>6}{s['mean']:>8.2f}{s['p50']:>8.2f}"
+                f"{s['p95']:>8.2f}{s['max']:>8.2f}{s['total']:>9.1f}"
+            )
+        if self.path:
+            print(f"(run {self.run_id} appended to {self.path})")
+
+
+def timed(timer, stage, booking=None):
+    """timer.span(stage, booking), or a no-op when timing is not enabled."""
+    if timer is None:
+        return nullcontext()
+    return timer.span(stage, booking)